@@ -17,6 +17,7 @@ from ui.layout import AppLayout, DynamicInstructions
 from ui.hide_pages import HideDataPages
 from ui.recover_pages import RecoverDataPages
 from ui.image_utils import ResultDisplay
+from ui.components import get_session_backup
 
 def main():
     """Funzione principale dell'applicazione"""
@@ -30,26 +31,29 @@ def main():
         # Mostra istruzioni dinamiche
         DynamicInstructions.show_instructions(mode, data_type)
         
-        # Routing verso le pagine appropriate
-        if mode == "Nascondere dati":
-            hide_pages = HideDataPages()
+        # Parametri di occultamento separati per ogni sessione utente
+        from src.steganografia import backup_session
+        with backup_session(get_session_backup()):
+            # Routing verso le pagine appropriate
+            if mode == "Nascondere dati":
+                hide_pages = HideDataPages()
             
-            if data_type == "Stringhe":
-                hide_pages.hide_string_page()
-            elif data_type == "Immagini":
-                hide_pages.hide_image_page()
-            else:  # File binari
-                hide_pages.hide_binary_page()
+                if data_type == "Stringhe":
+                    hide_pages.hide_string_page()
+                elif data_type == "Immagini":
+                    hide_pages.hide_image_page()
+                else:  # File binari
+                    hide_pages.hide_binary_page()
                 
-        else:  # Recuperare dati
-            recover_pages = RecoverDataPages()
+            else:  # Recuperare dati
+                recover_pages = RecoverDataPages()
             
-            if data_type == "Stringhe":
-                recover_pages.recover_string_page()
-            elif data_type == "Immagini":
-                recover_pages.recover_image_page()
-            else:  # File binari
-                recover_pages.recover_binary_page()
+                if data_type == "Stringhe":
+                    recover_pages.recover_string_page()
+                elif data_type == "Immagini":
+                    recover_pages.recover_image_page()
+                else:  # File binari
+                    recover_pages.recover_binary_page()
         
         # Footer
         AppLayout.display_footer()
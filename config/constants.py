@@ -8,6 +8,26 @@ class CompressionMode:
     FILE = 1
     DIR = 2
 
+# Codec di compressione dei payload FILE e DIR (metodi zip), dal più veloce
+# al più compatto; AUTO sceglie quello che minimizza n
+class CompressionCodec:
+    STORED = "stored"
+    DEFLATE_FAST = "deflate-1"
+    DEFLATE = "deflate"
+    DEFLATE_BEST = "deflate-9"
+    BZIP2 = "bz2"
+    LZMA = "lzma"
+    DEFLATE_STORE = "deflate-0"  # deflate senza compressione, usato per STORED in DIR
+    AUTO = "auto"
+    DEFAULT = DEFLATE  # usato per FILE e DIR quando non ne viene indicato uno
+    ALL = (STORED, DEFLATE_FAST, DEFLATE, DEFLATE_BEST, BZIP2, LZMA, DEFLATE_STORE)
+
+# Scelta automatica del codec
+class CodecConfig:
+    SAMPLE_SIZE = 256 * 1024  # byte del payload compressi per la stima
+    SAMPLE_BLOCK = 16 * 1024  # byte contigui per ogni punto di campionamento
+    TIME_BUDGET = 5.0  # secondi stimati massimi per comprimere il payload
+
 # Validazione parametri
 class ValidationLimits:
     MIN_LSB = 0
@@ -18,6 +38,23 @@ class ValidationLimits:
     MAX_N = 8
     MIN_DIV = 0.0
 
+# Elaborazione a blocchi dei payload
+class StreamingConfig:
+    CHUNK_SIZE = 1024 * 1024  # byte letti/scritti per blocco
+    BAND_ROWS = 256  # righe dell'host per banda nella modalità a bande
+    MIN_SEGMENT_GROUPS = 1 << 16  # gruppi minimi per segmento parallelo
+    SPOOL_SIZE = 64 * 1024 * 1024  # byte di payload compresso tenuti in memoria
+
+# Formato dei file di backup dei parametri (JSON lines)
+class BackupFormat:
+    NAME = "steganografia-backup"
+    VERSION = 1
+
+# Indice persistente dei parametri (SQLite)
+class ParamIndexConfig:
+    ENV_VAR = "STEGANOGRAFIA_PARAM_INDEX"  # percorso del database, se impostato
+    CACHE_SIZE = 4096  # record tenuti nella cache LRU in memoria
+
 # Configurazioni UI
 class UIConfig:
     PAGE_TITLE = "Steganografia App"
@@ -45,9 +82,19 @@ class ErrorMessages:
     INVALID_MSB = "Il valore di MSB deve essere compreso tra 1 e 8 oppure 0 per la modalità automatica"
     INVALID_N = "Il valore di N deve essere compreso tra 1 e 8, oppure 0 per la modalità automatica"
     INVALID_ZIP_MODE = "La modalità di compressione deve essere 0 (nessuna), 1 (file) o 2 (directory)"
+    INVALID_CODEC = "Codec di compressione non valido: {codec}. Usa uno tra {codecs} oppure auto, con modalità FILE o DIR"
     LSB_GREATER_MSB = "Il valore di LSB deve essere minore di MSB"
     DIV_EXCESSIVE = "Il valore di DIV ({div}) è eccessivo. Prova con 0 per il calcolo automatico"
     PARAMS_MISSING = "Parametri mancanti per il recupero. Fornisci un file backup (.dat) o inserisci i parametri manualmente"
     NO_MESSAGE_FOUND = "Nessun messaggio valido trovato nell'immagine"
     DECODE_FAILED = "Impossibile decodificare il messaggio dall'immagine. Verifica che contenga davvero un messaggio nascosto"
+    INVALID_ARRAY = "L'array deve avere forma (H, W, C) con dtype uint8 e C in {channels}"
+    UNSUPPORTED_HOST_FORMAT = "Formato host non supportato ({reason}). Usa PPM binario (P6), BMP non compresso a 24/32 bit o file raw con dimensioni indicate"
+    INVALID_WORKERS = "Il numero di worker deve essere almeno 1"
+    ARRAY_NOT_WRITABLE = "L'array deve essere contiguo e modificabile per l'occultamento sul posto"
+    BACKUP_LOAD_FAILED = "Errore nel caricamento backup: {error}"
+    ARCHIVE_CORRUPTED = "Archivio nascosto non valido: {reason}. Verifica i parametri di recupero"
+    ARCHIVE_REQUIRED = "L'accesso ai singoli file richiede un payload compresso (modalità FILE o DIR)"
+    MEMBER_NOT_FOUND = "File non presente nell'archivio nascosto: {name}"
+    UNSUPPORTED_BACKUP_VERSION = "Versione del file di backup non supportata: {version}"
     IMAGE_RECONSTRUCTION_FAILED = "Impossibile ricostruire l'immagine nascosta. Verifica i parametri di recupero. Errore: {error}"
\ No newline at end of file
@@ -1,22 +1,40 @@
 # Steganografia Core Module
 
-from .backup import backup_system
+from .backup import ParameterBackup, backup_session, backup_system, current_backup
 from .binary_operations import BinarySteganography
+from .capacity import CapacityPlanner
 from .core import (
     DIR,
     FILE,
     NO_ZIP,
     get_bin_file,
+    get_bin_file_array,
+    get_bin_file_memmap,
+    get_bin_member,
+    get_bin_member_memmap,
     get_image,
+    get_image_array,
+    get_image_memmap,
     get_last_params,
     get_message,
+    get_message_array,
     hide_bin_file,
+    hide_bin_file_array,
+    hide_bin_file_memmap,
     hide_image,
+    hide_image_array,
+    hide_image_memmap,
     hide_message,
+    hide_message_array,
+    list_bin_members,
+    list_bin_members_memmap,
     load_backup_data,
+    load_backup_records,
+    migrate_backup_file,
     save_image,
 )
 from .image_operations import ImageSteganography
+from .member_access import BinaryMembers
 from .string_operations import StringSteganography
 
 __all__ = [
@@ -26,8 +44,24 @@ __all__ = [
     "get_image",
     "hide_bin_file",
     "get_bin_file",
+    "hide_message_array",
+    "get_message_array",
+    "hide_image_array",
+    "get_image_array",
+    "hide_image_memmap",
+    "get_image_memmap",
+    "hide_bin_file_array",
+    "get_bin_file_array",
+    "hide_bin_file_memmap",
+    "get_bin_file_memmap",
+    "list_bin_members",
+    "get_bin_member",
+    "list_bin_members_memmap",
+    "get_bin_member_memmap",
     "save_image",
     "load_backup_data",
+    "load_backup_records",
+    "migrate_backup_file",
     "get_last_params",
     "NO_ZIP",
     "FILE",
@@ -35,5 +69,10 @@ __all__ = [
     "StringSteganography",
     "ImageSteganography",
     "BinarySteganography",
+    "BinaryMembers",
+    "CapacityPlanner",
     "backup_system",
+    "backup_session",
+    "current_backup",
+    "ParameterBackup",
 ]
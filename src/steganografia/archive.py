@@ -0,0 +1,446 @@
+"""
+Archivi zip dei payload prodotti e letti in streaming
+
+DirectoryPacker percorre la directory e comprime i file man mano che il
+consumatore legge i byte dell'archivio, senza scriverlo su disco; i file sono
+compressi con deflate, bzip2 o LZMA (o solo memorizzati) secondo il codec.
+DirectoryUnpacker (CompressionMode.DIR) e FileUnpacker (CompressionMode.FILE)
+ricevono i byte recuperati dall'immagine e scrivono ogni file mentre il suo
+contenuto arriva, leggendo solo le intestazioni locali: la
+directory centrale in fondo all'archivio non serve e viene ignorata.
+"""
+
+import abc
+import bz2
+import contextlib
+import lzma
+import os
+import struct
+import sys
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from config.constants import ErrorMessages, StreamingConfig
+
+# Intestazione locale: firma, versione, flag, metodo, ora, data, CRC,
+# dimensione compressa, dimensione originale, lunghezza nome e campo extra
+_LOCAL_HEADER = struct.Struct("<4s5HL2L2H")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+# Firme che seguono l'ultimo file: directory centrale e record di fine archivio
+_END_SIGNATURES = (b"PK\x01\x02", b"PK\x05\x06", b"PK\x06\x06")
+_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+
+_FLAG_ENCRYPTED = 0x01
+_FLAG_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_ZIP64_EXTRA = 0x0001
+_METHODS = (
+    zipfile.ZIP_STORED,
+    zipfile.ZIP_DEFLATED,
+    zipfile.ZIP_BZIP2,
+    zipfile.ZIP_LZMA,
+)
+_ZIP64_MARKER = 0xFFFFFFFF
+
+
+def walk_files(path: str) -> Iterator[Tuple[str, str]]:
+    """Percorso e nome nell'archivio di ogni file della directory"""
+    for root, _, files in os.walk(path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            yield file_path, os.path.relpath(file_path, path)
+
+
+class _Sink:
+    """Destinazione non posizionabile che accumula i byte scritti da ZipFile"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self.data += data
+        return len(data)
+
+    def flush(self) -> None:
+        """Nessuna operazione: i byte restano nel buffer fino alla lettura"""
+
+
+class DirectoryPacker:
+    """Stream in sola lettura con l'archivio zip di una directory"""
+
+    def __init__(
+        self,
+        path: str,
+        compress_type: int = zipfile.ZIP_DEFLATED,
+        compresslevel: Optional[int] = None,
+    ):
+        """
+        Args:
+            path: Directory da comprimere
+            compress_type: Metodo zip dei file (ZIP_STORED, ZIP_DEFLATED,
+                ZIP_BZIP2 o ZIP_LZMA)
+            compresslevel: Livello di compressione (None = predefinito)
+        """
+        if compress_type == zipfile.ZIP_STORED:
+            # I file memorizzati seguiti da data descriptor non si possono
+            # delimitare in lettura: deflate di livello 0 non comprime ma
+            # segna la fine dei dati (resolve_codec registra DEFLATE_STORE)
+            compress_type, compresslevel = zipfile.ZIP_DEFLATED, 0
+        self._sink = _Sink()
+        self._steps = self._pack(path, compress_type, compresslevel)
+        self._done = False
+
+    def _pack(
+        self, path: str, compress_type: int, compresslevel: Optional[int]
+    ) -> Iterator[None]:
+        """Comprime un blocco alla volta; ogni passo produce nuovi byte nel sink"""
+        # Con una destinazione non posizionabile ZipFile scrive le dimensioni
+        # di ogni file in un data descriptor dopo i dati compressi
+        with zipfile.ZipFile(
+            self._sink, "w", compress_type, compresslevel=compresslevel
+        ) as zf:
+            for file_path, arcname in walk_files(path):
+                large = os.path.getsize(file_path) > zipfile.ZIP64_LIMIT
+                with open(file_path, "rb") as src, zf.open(
+                    arcname, "w", force_zip64=large
+                ) as dest:
+                    while block := src.read(StreamingConfig.CHUNK_SIZE):
+                        dest.write(block)
+                        yield
+                yield
+
+    def read(self, size: int = -1) -> bytes:
+        """Restituisce fino a size byte dell'archivio (tutti i rimanenti se size < 0)"""
+        data = self._sink.data
+        while not self._done and (size < 0 or len(data) < size):
+            try:
+                next(self._steps)
+            except StopIteration:
+                self._done = True
+
+        if size < 0:
+            size = len(data)
+        chunk = bytes(data[:size])
+        del data[:size]
+        return chunk
+
+
+def _member_path(output_path: str, name: str) -> str:
+    """Percorso di destinazione di un membro, senza uscire da output_path"""
+    # Stesse regole di ZipFile.extract: niente unità, radice, "." o ".."
+    name = name.replace("/", os.path.sep)
+    if os.path.altsep:
+        name = name.replace(os.path.altsep, os.path.sep)
+    name = os.path.splitdrive(name)[1]
+    parts = [p for p in name.split(os.path.sep) if p not in ("", ".", "..")]
+    return os.path.join(output_path, *parts)
+
+
+def _zip64_sizes(extra: bytes, csize: int, usize: int) -> Tuple[int, int, bool]:
+    """Legge le dimensioni a 64 bit dal campo extra, se presente"""
+    pos = 0
+    while pos + 4 <= len(extra):
+        tag, length = struct.unpack_from("<HH", extra, pos)
+        if tag == _ZIP64_EXTRA:
+            values = list(struct.unpack_from(f"<{length // 8}Q", extra, pos + 4))
+            if usize == _ZIP64_MARKER and values:
+                usize = values.pop(0)
+            if csize == _ZIP64_MARKER and values:
+                csize = values.pop(0)
+            return csize, usize, True
+        pos += 4 + length
+    return csize, usize, False
+
+
+def _corrupted(reason: str) -> ValueError:
+    """Errore per un archivio recuperato non valido"""
+    return ValueError(ErrorMessages.ARCHIVE_CORRUPTED.format(reason=reason))
+
+
+def _lzma_decompressor(props: bytes) -> "lzma.LZMADecompressor":
+    """Decompressore LZMA1 grezzo dalle proprietà scritte nel file zip"""
+    if len(props) < 5:
+        raise _corrupted("proprietà LZMA non valide")
+    lc_lp_pb, dict_size = props[0], struct.unpack_from("<I", props, 1)[0]
+    lp_pb, lc = divmod(lc_lp_pb, 9)
+    pb, lp = divmod(lp_pb, 5)
+    lzma_filter = {
+        "id": lzma.FILTER_LZMA1,
+        "dict_size": dict_size,
+        "lc": lc,
+        "lp": lp,
+        "pb": pb,
+    }
+    return lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=[lzma_filter])
+
+
+@dataclass
+class _MemberInfo:
+    """Dati dell'intestazione locale di un file dell'archivio"""
+
+    path: str
+    method: int
+    crc: int
+    zip64: bool
+
+
+class _Member:
+    """File dell'archivio in corso di estrazione"""
+
+    def __init__(self, info: _MemberInfo):
+        self.info = info
+        self.actual_crc = 0
+        # Per LZMA il decompressore nasce dopo le proprietà all'inizio dei dati
+        self._lzma_header = bytearray()
+        self.inflater = None
+        if info.method == zipfile.ZIP_DEFLATED:
+            self.inflater = zlib.decompressobj(-15)
+        elif info.method == zipfile.ZIP_BZIP2:
+            self.inflater = bz2.BZ2Decompressor()
+        # Il file resta aperto tra una chiamata a feed e l'altra
+        self._stack = contextlib.ExitStack()
+        self.file = None
+        path = info.path
+        if path.endswith(os.path.sep):
+            os.makedirs(path, exist_ok=True)
+        else:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.file = self._stack.enter_context(open(path, "wb"))
+
+    @property
+    def eof(self) -> bool:
+        """True quando il flusso compresso è terminato"""
+        return self.inflater is not None and self.inflater.eof
+
+    def feed(self, data: bytes) -> bytes:
+        """Decomprime e scrive data; restituisce i byte oltre la fine del flusso"""
+        method = self.info.method
+        if method == zipfile.ZIP_STORED:
+            self._write(data)
+            return b""
+
+        if method == zipfile.ZIP_LZMA and self.inflater is None:
+            # Versione (2 byte), lunghezza delle proprietà (2 byte), proprietà
+            header = self._lzma_header
+            header += data
+            if len(header) < 4:
+                return b""
+            end = 4 + struct.unpack_from("<H", header, 2)[0]
+            if len(header) < end:
+                return b""
+            self.inflater = _lzma_decompressor(bytes(header[4:end]))
+            data = bytes(header[end:])
+
+        inflater = self.inflater
+        self._write(inflater.decompress(data, StreamingConfig.CHUNK_SIZE))
+        if method == zipfile.ZIP_DEFLATED:
+            while inflater.unconsumed_tail:
+                self._write(
+                    inflater.decompress(
+                        inflater.unconsumed_tail, StreamingConfig.CHUNK_SIZE
+                    )
+                )
+        else:
+            while not inflater.eof and not inflater.needs_input:
+                self._write(inflater.decompress(b"", StreamingConfig.CHUNK_SIZE))
+        return inflater.unused_data if inflater.eof else b""
+
+    def finish(self, crc: Optional[int] = None) -> None:
+        """Chiude il file e verifica il CRC (quello del data descriptor, se dato)"""
+        if self.info.method == zipfile.ZIP_DEFLATED:
+            self._write(self.inflater.flush())
+        self.close()
+        if (self.info.crc if crc is None else crc) != self.actual_crc:
+            raise _corrupted(f"CRC errato per {self.info.path}")
+
+    def close(self) -> None:
+        """Chiude il file di destinazione"""
+        self._stack.close()
+        self.file = None
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self.actual_crc = zlib.crc32(data, self.actual_crc)
+            if self.file is not None:
+                self.file.write(data)
+
+
+class _ArchiveReader(abc.ABC):
+    """
+    Stream in sola scrittura che estrae un archivio zip man mano che riceve i
+    byte; le sottoclassi decidono dove scrivere ogni file (_target_path)
+    """
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.files: List[str] = []
+        self._buffer = bytearray()
+        self._member: Optional[_Member] = None
+        self._remaining: Optional[int] = None
+        self._finished = False
+
+    def __enter__(self) -> "_ArchiveReader":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._member is not None:
+            self._member.close()
+
+    def write(self, data: bytes) -> int:
+        """Riceve i prossimi byte dell'archivio ed estrae i file completati"""
+        if not self._finished:
+            self._buffer += data
+            while not self._finished and self._step():
+                pass
+        return len(data)
+
+    def close(self) -> None:
+        """Verifica che l'archivio ricevuto sia completo"""
+        if not self._finished:
+            if self._member is not None:
+                self._member.close()
+            raise _corrupted("archivio troncato")
+
+    def _step(self) -> bool:
+        """Avanza di un'intestazione o di un blocco di dati; False se servono byte"""
+        if self._member is None:
+            return self._start_member()
+        if self._remaining is not None:
+            return self._feed_sized()
+        return self._feed_until_eof()
+
+    def _start_member(self) -> bool:
+        """Legge l'intestazione locale del prossimo file"""
+        buffer = self._buffer
+        if len(buffer) < 4:
+            return False
+        signature = bytes(buffer[:4])
+        if signature in _END_SIGNATURES:
+            self._finished = True
+            buffer.clear()
+            return False
+        if signature != _LOCAL_SIGNATURE:
+            raise _corrupted("intestazione di un file non valida")
+        if len(buffer) < _LOCAL_HEADER.size:
+            return False
+
+        fields = _LOCAL_HEADER.unpack_from(buffer)
+        flags, method, crc, csize, usize, name_len, extra_len = (
+            fields[2],
+            fields[3],
+            fields[6],
+            fields[7],
+            fields[8],
+            fields[9],
+            fields[10],
+        )
+        end = _LOCAL_HEADER.size + name_len + extra_len
+        if len(buffer) < end:
+            return False
+        raw_name = bytes(buffer[_LOCAL_HEADER.size : _LOCAL_HEADER.size + name_len])
+        extra = bytes(buffer[_LOCAL_HEADER.size + name_len : end])
+        del buffer[:end]
+
+        if flags & _FLAG_ENCRYPTED:
+            raise _corrupted("file cifrati non supportati")
+        if method not in _METHODS:
+            raise _corrupted(f"metodo di compressione {method} non supportato")
+        descriptor = bool(flags & _FLAG_DESCRIPTOR)
+        if descriptor and method == zipfile.ZIP_STORED:
+            raise _corrupted("file non compresso senza dimensione")
+
+        csize, _, zip64 = _zip64_sizes(extra, csize, usize)
+        name = raw_name.decode("utf-8" if flags & _FLAG_UTF8 else "cp437")
+        self._member = _Member(_MemberInfo(self._target_path(name), method, crc, zip64))
+        self._remaining = None if descriptor else csize
+        return True
+
+    @abc.abstractmethod
+    def _target_path(self, name: str) -> str:
+        """Percorso in cui scrivere il membro name (con separatore finale se cartella)"""
+
+    def _feed_sized(self) -> bool:
+        """Dati di un file con dimensione compressa nell'intestazione"""
+        assert self._member is not None and self._remaining is not None
+        data = bytes(self._buffer[: self._remaining])
+        del self._buffer[: len(data)]
+        self._remaining -= len(data)
+        self._member.feed(data)
+        if self._remaining:
+            return False
+        self._complete()
+        return True
+
+    def _feed_until_eof(self) -> bool:
+        """Dati di un file seguiti dal data descriptor"""
+        member = self._member
+        assert member is not None
+        if not member.eof:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            self._buffer += member.feed(data)
+            if not member.eof:
+                return False
+
+        # Data descriptor: firma facoltativa, CRC e due dimensioni
+        skip = 4 if self._buffer[:4] == _DESCRIPTOR_SIGNATURE else 0
+        length = skip + 4 + (16 if member.info.zip64 else 8)
+        if len(self._buffer) < length:
+            return False
+        (crc,) = struct.unpack_from("<L", self._buffer, skip)
+        del self._buffer[:length]
+        self._complete(crc)
+        return True
+
+    def _complete(self, crc: Optional[int] = None) -> None:
+        """Chiude il file corrente dopo averne verificato il CRC"""
+        assert self._member is not None
+        member, self._member = self._member, None
+        member.finish(crc)
+        if not member.info.path.endswith(os.path.sep):
+            self.files.append(member.info.path)
+
+
+class DirectoryUnpacker(_ArchiveReader):
+    """
+    Stream in sola scrittura che estrae un archivio zip in output_path man mano
+    che riceve i byte; da usare come context manager
+    """
+
+    def __init__(self, output_path: str):
+        """
+        Args:
+            output_path: Directory di destinazione (creata se non esiste)
+        """
+        super().__init__(output_path)
+        os.makedirs(output_path, exist_ok=True)
+
+    def _target_path(self, name: str) -> str:
+        path = _member_path(self.output_path, name)
+        return os.path.join(path, "") if name.endswith("/") else path
+
+
+class FileUnpacker(_ArchiveReader):
+    """
+    Come DirectoryUnpacker per un archivio con un solo file (CompressionMode.FILE):
+    il contenuto viene scritto direttamente in output_path, qualunque sia il
+    nome memorizzato nell'archivio
+    """
+
+    def _target_path(self, name: str) -> str:
+        if self.files or name.endswith("/"):
+            raise _corrupted("l'archivio deve contenere un solo file")
+        return self.output_path
+
+    def close(self) -> None:
+        """Verifica che l'archivio sia completo e contenga il file"""
+        super().close()
+        if not self.files:
+            raise _corrupted("archivio vuoto")
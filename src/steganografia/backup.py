@@ -1,5 +1,18 @@
 """
 Sistema di backup e recupero dei parametri di steganografia
+
+I file di backup sono in formato JSON lines: la prima riga indica formato e
+versione, ogni riga successiva è un record {"type": ..., "params": {...}}.
+Un file può contenere molti record; i vecchi backup pickle vengono ancora letti,
+senza eseguire codice, e si possono convertire con migrate_backup_file.
+
+Se è attivo un indice (open_index o variabile d'ambiente
+ParamIndexConfig.ENV_VAR) ogni occultamento vi registra i parametri con chiave
+l'hash dei pixel del risultato, e il recupero li ritrova da quell'hash.
+
+Le operazioni usano current_backup(): dentro un blocco `with backup_session()`
+ogni thread o task asyncio ha il proprio ParameterBackup, altrimenti si usa
+l'istanza globale backup_system. Ogni istanza protegge il proprio stato con un lock.
 """
 
 import os
@@ -7,68 +20,308 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
+import json
 import pickle
-from os.path import exists
-from typing import Any, Dict, Optional
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os.path import exists, getsize
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+
+from config.constants import BackupFormat, DataType, ErrorMessages, ParamIndexConfig
+
+from .param_index import ParamIndex
+
+# Primo byte dei pickle con protocollo >= 2 (i vecchi file .dat)
+_PICKLE_PREFIX = b"\x80"
+
+
+class _SafeUnpickler(pickle.Unpickler):
+    """Unpickler che accetta solo i tipi di base (dict, list, tuple, str, numeri)"""
+
+    def find_class(self, module: str, name: str) -> Any:
+        raise pickle.UnpicklingError(f"Tipo non consentito nel backup: {module}.{name}")
+
+
+def _to_json(value: Any) -> Any:
+    """Converte gli scalari NumPy nei tipi Python equivalenti"""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Valore non serializzabile nel backup: {value!r}")
+
 
-from config.constants import DataType
+def _header_line() -> str:
+    """Prima riga di un file di backup"""
+    return json.dumps(
+        {"format": BackupFormat.NAME, "version": BackupFormat.VERSION},
+        separators=(",", ":"),
+    )
+
+
+def _record_line(data_type: str, params: Dict[str, Any]) -> str:
+    """Riga JSON di un record"""
+    return json.dumps(
+        {"type": data_type, "params": params},
+        default=_to_json,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def _check_header(line: bytes) -> None:
+    """Verifica formato e versione della prima riga"""
+    header = json.loads(line)
+    if not isinstance(header, dict) or header.get("format") != BackupFormat.NAME:
+        raise ValueError("intestazione del file di backup non valida")
+    if header.get("version") != BackupFormat.VERSION:
+        raise ValueError(
+            ErrorMessages.UNSUPPORTED_BACKUP_VERSION.format(
+                version=header.get("version")
+            )
+        )
+
+
+def _last_line(f: BinaryIO, block: int = 4096) -> bytes:
+    """Legge l'ultima riga non vuota partendo dalla fine del file"""
+    end = f.seek(0, os.SEEK_END)
+    data = b""
+    while end > 0:
+        start = max(0, end - block)
+        f.seek(start)
+        data = f.read(end - start) + data
+        end = start
+        stripped = data.rstrip()
+        if b"\n" in stripped or start == 0:
+            return stripped.rsplit(b"\n", 1)[-1]
+    return data
 
 
 class ParameterBackup:
     """Gestione del backup e recupero dei parametri"""
 
-    def __init__(self):
+    def __init__(self, index: Optional[ParamIndex] = None):
+        """
+        Args:
+            index: Indice dei parametri condiviso con altre istanze (None = nessuno)
+        """
         self._last_string_params: Optional[Dict[str, Any]] = None
         self._last_image_params: Optional[Dict[str, Any]] = None
         self._last_binary_params: Optional[Dict[str, Any]] = None
+        self._lock = threading.RLock()
+        self.index = index
+        self._owns_index = False
+
+    def open_index(self, path: Optional[str]) -> None:
+        """Attiva l'indice dei parametri nel database indicato (None = disattiva)"""
+        with self._lock:
+            # Un indice condiviso resta aperto per le altre istanze
+            if self.index is not None and self._owns_index:
+                self.index.close()
+            self.index = ParamIndex(path) if path else None
+            self._owns_index = self.index is not None
+
+    def index_params(
+        self, data_type: str, params: Dict[str, Any], key: Callable[[], str]
+    ) -> None:
+        """
+        Registra i parametri nell'indice, se attivo
+
+        Args:
+            data_type: Tipo di dato nascosto
+            params: Parametri per il recupero
+            key: Funzione che calcola l'hash dei pixel del risultato (chiamata
+                solo se l'indice è attivo)
+        """
+        if self.index is None:
+            return
+        self.index.put(key(), data_type, _record_line(data_type, params))
+
+    def lookup_params(
+        self,
+        data_type: str,
+        key: Callable[[], str],
+        verify: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cerca nell'indice i parametri dell'immagine con l'hash calcolato da key
+
+        Args:
+            data_type: Tipo di dato nascosto
+            key: Funzione che calcola l'hash dei pixel
+            verify: Funzione che riceve i parametri trovati e restituisce False
+                se i dati letti con quei parametri non hanno il CRC registrato;
+                in quel caso il record viene ignorato
+        """
+        if self.index is None:
+            return None
+        record = self.index.get(key(), data_type)
+        if record is None:
+            return None
+        backup_data = json.loads(record)
+        if verify is not None and not verify(backup_data["params"]):
+            print("Parametri nell'indice ignorati: il CRC dei dati non corrisponde")
+            return None
+        print("Parametri trovati nell'indice")
+        return backup_data
 
     def save_backup_data(
-        self, data_type: str, params: Dict[str, Any], backup_file: Optional[str] = None
+        self,
+        data_type: str,
+        params: Dict[str, Any],
+        backup_file: Optional[str] = None,
+        append: bool = False,
     ) -> None:
-        """Salva i parametri di occultamento in un file binario e nelle variabili locali"""
+        """
+        Salva i parametri di occultamento in un file di backup e nelle variabili
+        locali; con append=True il record viene aggiunto in fondo al file
+        """
 
         # Salva nelle variabili locali per uso immediato
-        if data_type == DataType.STRING:
-            self._last_string_params = params
-        elif data_type == DataType.IMAGE:
-            self._last_image_params = params
-        elif data_type == DataType.BINARY:
-            self._last_binary_params = params
+        with self._lock:
+            if data_type == DataType.STRING:
+                self._last_string_params = params
+            elif data_type == DataType.IMAGE:
+                self._last_image_params = params
+            elif data_type == DataType.BINARY:
+                self._last_binary_params = params
 
         # Salva su file se specificato
         if backup_file:
             try:
-                with open(backup_file, "wb") as f:
-                    backup_data = {"type": data_type, "params": params}
-                    pickle.dump(backup_data, f)
+                new_file = not append or not exists(backup_file)
+                if not new_file and getsize(backup_file) == 0:
+                    new_file = True
+                elif not new_file:
+                    with open(backup_file, "rb") as f:
+                        _check_header(f.readline())
+
+                record = _record_line(data_type, params)
+                with self._lock, open(
+                    backup_file, "w" if new_file else "a", encoding="utf-8"
+                ) as f:
+                    if new_file:
+                        f.write(_header_line() + "\n")
+                    f.write(record + "\n")
                 print(f"Parametri salvati in {backup_file}")
             except Exception as e:
                 raise ValueError(f"Errore nel salvataggio backup: {e}")
 
+    def iter_backup_records(self, backup_file: str) -> Iterator[Dict[str, Any]]:
+        """
+        Legge in ordine tutti i record di un file di backup, riga per riga
+
+        Returns:
+            Iteratore su dizionari {"type": ..., "params": {...}}; un vecchio
+            backup pickle produce un solo record
+        """
+        with open(backup_file, "rb") as f:
+            if f.read(1) == _PICKLE_PREFIX:
+                f.seek(0)
+                yield _SafeUnpickler(f).load()
+                return
+
+            f.seek(0)
+            _check_header(f.readline())
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def load_backup_records(self, backup_file: str) -> List[Dict[str, Any]]:
+        """Carica tutti i record di un file di backup"""
+        try:
+            return list(self.iter_backup_records(backup_file))
+        except Exception as e:
+            raise ValueError(ErrorMessages.BACKUP_LOAD_FAILED.format(error=e))
+
     def load_backup_data(self, backup_file: str) -> Optional[Dict[str, Any]]:
-        """Carica i parametri di occultamento da un file binario"""
+        """Carica i parametri più recenti (l'ultimo record) da un file di backup"""
         try:
             if exists(backup_file):
                 with open(backup_file, "rb") as f:
-                    backup_data = pickle.load(f)
+                    if f.read(1) == _PICKLE_PREFIX:
+                        f.seek(0)
+                        backup_data = _SafeUnpickler(f).load()
+                    else:
+                        f.seek(0)
+                        _check_header(f.readline())
+                        # Con la sola intestazione l'ultima riga non è un record
+                        last = json.loads(_last_line(f))
+                        backup_data = last if "params" in last else None
                 print(f"Parametri caricati da {backup_file}")
                 return backup_data
 
             print(f"File backup {backup_file} non trovato")
             return None
         except Exception as e:
-            raise ValueError(f"Errore nel caricamento backup: {e}")
+            raise ValueError(ErrorMessages.BACKUP_LOAD_FAILED.format(error=e))
+
+    def migrate_backup_file(
+        self, backup_file: str, output_file: Optional[str] = None
+    ) -> int:
+        """
+        Converte un backup (anche pickle) nel formato JSON lines
+
+        Args:
+            backup_file: File da convertire
+            output_file: File di destinazione (None = sovrascrive backup_file)
+
+        Returns:
+            Numero di record scritti
+        """
+        records = self.load_backup_records(backup_file)
+        lines = [_header_line()]
+        lines.extend(_record_line(r["type"], r["params"]) for r in records)
+        with open(output_file or backup_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return len(records)
 
     def get_last_params(self, data_type: str) -> Optional[Dict[str, Any]]:
         """Ottiene gli ultimi parametri usati per il tipo di dato specificato"""
-        if data_type == DataType.STRING:
-            return self._last_string_params
-        if data_type == DataType.IMAGE:
-            return self._last_image_params
-        if data_type == DataType.BINARY:
-            return self._last_binary_params
-        return None
+        with self._lock:
+            if data_type == DataType.STRING:
+                return self._last_string_params
+            if data_type == DataType.IMAGE:
+                return self._last_image_params
+            if data_type == DataType.BINARY:
+                return self._last_binary_params
+            return None
 
 
-# Istanza globale del sistema di backup
+# Istanza globale del sistema di backup, usata fuori da backup_session
 backup_system = ParameterBackup()
+if os.environ.get(ParamIndexConfig.ENV_VAR):
+    backup_system.open_index(os.environ[ParamIndexConfig.ENV_VAR])
+
+_current_backup: ContextVar[Optional[ParameterBackup]] = ContextVar(
+    "current_backup", default=None
+)
+
+
+def current_backup() -> ParameterBackup:
+    """Sistema di backup della sessione attiva nel contesto corrente, o quello globale"""
+    backup = _current_backup.get()
+    return backup if backup is not None else backup_system
+
+
+@contextmanager
+def backup_session(
+    backup: Optional[ParameterBackup] = None,
+) -> Iterator[ParameterBackup]:
+    """
+    Usa backup come sistema di backup del contesto corrente per la durata del
+    blocco with; i thread e i task asyncio con un contesto diverso non lo vedono
+
+    Args:
+        backup: Istanza da attivare (None = nuova istanza che condivide
+            l'indice dei parametri di quella attiva)
+
+    Returns:
+        Context manager che restituisce l'istanza attiva
+    """
+    if backup is None:
+        backup = ParameterBackup(current_backup().index)
+    token = _current_backup.set(backup)
+    try:
+        yield backup
+    finally:
+        _current_backup.reset(token)
@@ -0,0 +1,297 @@
+"""
+Esecuzione in parallelo di molte operazioni di occultamento
+
+Un manifest elenca i job (un oggetto JSON per riga, oppure una lista JSON):
+
+    {"host": "a.png", "payload": "logo.png", "mode": "image",
+     "output": "out/a.png", "params": {"msb": 4}}
+
+mode può essere "string" (payload = file di testo, oppure "message"),
+"image" (payload = immagine segreta) o "binary" (payload = file o cartella).
+I job vengono eseguiti da un ProcessPoolExecutor; ogni risultato riporta i
+parametri scelti, il percorso di output e il tempo impiegato, e un job fallito
+non interrompe gli altri.
+
+Uso da riga di comando (dalla cartella src):
+
+    python -m steganografia.batch manifest.jsonl --workers 8 --results out.jsonl
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from PIL import Image
+
+from config.constants import DataType
+
+from .backup import backup_session, current_backup
+from .core import hide_bin_file, hide_image, hide_message
+
+# Chiavi di params accettate per ciascuna modalità
+_MODE_PARAMS = {
+    DataType.STRING: (),
+    DataType.IMAGE: ("lsb", "msb", "div", "workers", "header"),
+    DataType.BINARY: (
+        "compression_mode",
+        "n",
+        "div",
+        "workers",
+        "header",
+        "codec",
+    ),
+}
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """Legge un manifest JSON (lista) o JSON lines (un job per riga)"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    if content.lstrip().startswith("["):
+        jobs = json.loads(content)
+    else:
+        jobs = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    # I percorsi relativi sono riferiti alla cartella del manifest
+    base = os.path.dirname(os.path.abspath(path))
+    return [_resolve_paths(job, base) for job in jobs]
+
+
+def _resolve_paths(job: Dict[str, Any], base: str) -> Dict[str, Any]:
+    """Rende assoluti i percorsi del job"""
+    job = dict(job)
+    for key in ("host", "payload", "output", "backup_file"):
+        if job.get(key):
+            job[key] = os.path.join(base, job[key])
+    return job
+
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Esegue un singolo job e restituisce il risultato senza sollevare eccezioni
+
+    Args:
+        job: Dizionario con host, payload (o message), mode, output e params
+
+    Returns:
+        Dizionario con index, status ("ok" o "error"), output, params, seconds
+        ed eventualmente error
+    """
+    start = time.perf_counter()
+    result: Dict[str, Any] = {
+        "index": job.get("index"),
+        "host": job.get("host"),
+        "output": job.get("output"),
+    }
+
+    try:
+        # I parametri restano in una sessione di backup propria; i messaggi
+        # di avanzamento non vengono stampati
+        with contextlib.redirect_stdout(io.StringIO()), backup_session():
+            result["params"] = _hide(job)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def _hide(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Esegue l'occultamento descritto dal job e salva l'immagine risultato"""
+    mode = job.get("mode")
+    if mode not in _MODE_PARAMS:
+        raise ValueError(f"Modalità non valida: {mode}")
+    if not job.get("host") or not job.get("output"):
+        raise ValueError("Il job deve indicare host e output")
+
+    params = dict(job.get("params") or {})
+    unknown = set(params) - set(_MODE_PARAMS[mode])
+    if unknown:
+        raise ValueError(f"Parametri non validi per {mode}: {sorted(unknown)}")
+
+    backup_file = job.get("backup_file")
+    with Image.open(job["host"]) as host_img:
+        if mode == DataType.STRING:
+            message = job.get("message")
+            if message is None:
+                with open(job["payload"], "r", encoding="utf-8") as f:
+                    message = f.read()
+            result_img = hide_message(host_img, message, backup_file)
+            chosen: Dict[str, Any] = {"length": len(message)}
+
+        elif mode == DataType.IMAGE:
+            with Image.open(job["payload"]) as secret_img:
+                result_img, lsb, msb, div, width, height = hide_image(
+                    host_img, secret_img, backup_file=backup_file, **params
+                )
+            chosen = {
+                "lsb": lsb,
+                "msb": msb,
+                "div": div,
+                "width": width,
+                "height": height,
+            }
+
+        else:
+            result_img, n, div, size = hide_bin_file(
+                host_img, job["payload"], backup_file=backup_file, **params
+            )
+            chosen = {
+                "n": n,
+                "div": div,
+                "size": size,
+                "compression_mode": params.get("compression_mode", 0),
+            }
+            # Il codec effettivo (anche quello scelto in automatico) è nei
+            # parametri salvati nella sessione di backup del job
+            last_params = current_backup().get_last_params(DataType.BINARY) or {}
+            if last_params.get("codec"):
+                chosen["codec"] = last_params["codec"]
+
+    output_dir = os.path.dirname(job["output"])
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    result_img.save(job["output"])
+    return chosen
+
+
+def run_batch(
+    jobs: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Esegue i job su un pool di processi restituendo i risultati man mano
+
+    Se un processo del pool termina bruscamente (crash, OOM, os._exit) il pool
+    diventa inutilizzabile: ne viene creato uno nuovo e i job che erano in
+    corso vengono ritentati una volta, uno alla volta; un job che fa cadere il
+    pool anche al secondo tentativo produce un risultato con status "error"
+
+    Args:
+        jobs: Job da eseguire (anche un generatore)
+        workers: Numero di processi (None = numero di CPU)
+        max_in_flight: Job inviati al pool non ancora completati
+            (None = 2 * workers); limita la memoria usata dalla coda
+
+    Returns:
+        Iteratore sui risultati di run_job, nell'ordine di completamento; i job
+        senza un risultato proprio hanno status "error" e seconds None
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max(1, max_in_flight or 2 * workers)
+    queue = (dict(job, index=index) for index, job in enumerate(jobs))
+    retries: List[Dict[str, Any]] = []
+    # future -> (job, tentativo, pool che lo esegue)
+    pending: Dict[Future, Tuple[Dict[str, Any], int, ProcessPoolExecutor]] = {}
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while len(pending) < max_in_flight:
+                # I tentativi ripetuti vengono eseguiti da soli, così un job
+                # che fa cadere di nuovo il pool non coinvolge gli altri
+                retrying = any(attempt for _, attempt, _ in pending.values())
+                if retrying or (retries and pending):
+                    break
+                attempt = 1 if retries else 0
+                job = retries.pop(0) if retries else next(queue, None)
+                if job is None:
+                    break
+                try:
+                    future = executor.submit(run_job, job)
+                except BrokenProcessPool:
+                    executor = _restart(executor, workers)
+                    future = executor.submit(run_job, job)
+                pending[future] = (job, attempt, executor)
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, attempt, owner = pending.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool as e:
+                    if owner is executor:
+                        executor = _restart(executor, workers)
+                    if attempt == 0:
+                        retries.append(job)
+                    else:
+                        yield _error_result(job, e)
+                except Exception as e:
+                    yield _error_result(job, e)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _restart(executor: ProcessPoolExecutor, workers: int) -> ProcessPoolExecutor:
+    """Sostituisce un pool con un processo caduto con uno nuovo"""
+    executor.shutdown(wait=False)
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _error_result(job: Dict[str, Any], error: BaseException) -> Dict[str, Any]:
+    """
+    Risultato di un job che non ha prodotto un risultato proprio; seconds è
+    None perché la durata del job nel processo caduto non è nota
+    """
+    return {
+        "index": job.get("index"),
+        "host": job.get("host"),
+        "output": job.get("output"),
+        "status": "error",
+        "error": f"{type(error).__name__}: {error}",
+        "seconds": None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point di `python -m steganografia.batch`"""
+    parser = argparse.ArgumentParser(
+        prog="python -m steganografia.batch",
+        description="Occulta payload in molte immagini host in parallelo",
+    )
+    parser.add_argument("manifest", help="Manifest JSON o JSON lines dei job")
+    parser.add_argument("--workers", type=int, default=None, help="Processi")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=None, help="Job in coda al pool"
+    )
+    parser.add_argument(
+        "--results", default=None, help="File JSON lines dei risultati (default stdout)"
+    )
+    args = parser.parse_args(argv)
+
+    jobs = load_manifest(args.manifest)
+    failures = 0
+    with contextlib.ExitStack() as stack:
+        out = sys.stdout
+        if args.results:
+            out = stack.enter_context(open(args.results, "w", encoding="utf-8"))
+        for result in run_batch(jobs, args.workers, args.max_in_flight):
+            failures += result["status"] != "ok"
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+
+    print(
+        f"Job completati: {len(jobs) - failures}/{len(jobs)}, falliti: {failures}",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
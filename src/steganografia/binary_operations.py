@@ -3,27 +3,155 @@ Operazioni di steganografia per i file binari
 """
 
 import os
+import shutil
 import sys
-import zipfile
-from os.path import getsize
-from typing import Optional, Tuple
+from functools import partial
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import numpy as np
 from PIL import Image
 
-from config.constants import CompressionMode, DataType, ErrorMessages
-
-from .backup import backup_system
-from .bit_operations import set_last_n_bits, string_to_bytes
-from .file_utils import cleanup_temp_files, compress_file, find_div
+from config.constants import CompressionMode, DataType, ErrorMessages, StreamingConfig
+
+from .archive import DirectoryUnpacker, FileUnpacker
+from .backup import current_backup
+from .bit_operations import (
+    get_low_bits,
+    group_targets,
+    pack_groups,
+    position_at,
+    set_low_bits,
+    unpack_groups,
+)
+from .buffers import array_to_image, flat_view, image_to_array
+from .capacity import CapacityPlanner
+from .compression import resolve_codec
+from .file_utils import open_payload
+from .header import HEADER_SAMPLES, read_header, write_header
+from .memmap_host import open_memmap_host
+from .parallel import gather_low_bits, scatter_low_bits
+from .param_index import ChecksumStream, array_key, memmap_key
 from .validator import ParameterValidator
 
+# Conversione da posizioni logiche a indici del buffer effettivo
+IndexMap = Callable[[np.ndarray], np.ndarray]
+
+# Host da cui leggere un payload: (buffer, index_map, intestazione, chiave indice)
+PayloadSource = Tuple[
+    np.ndarray, Optional[IndexMap], Optional[Dict[str, Any]], Callable[[], str]
+]
+
+
+def _identity(indices: np.ndarray) -> np.ndarray:
+    """Posizioni logiche e indici del buffer coincidono"""
+    return indices
+
+
+def _shift(index_map: IndexMap, offset: int) -> IndexMap:
+    """Salta i primi offset campioni logici (ad esempio l'intestazione)"""
+    return lambda indices: index_map(indices + offset)
+
 
 class BinarySteganography:
     """Classe per operazioni di steganografia su file binari"""
 
+    @staticmethod
+    def _embed_stream(
+        arr: np.ndarray,
+        stream: BinaryIO,
+        n: int,
+        div: float,
+        index_map: Optional[IndexMap] = None,
+        workers: int = 1,
+    ) -> None:
+        """
+        Nasconde il contenuto di uno stream in arr leggendolo a blocchi.
+        Il gruppo k di n bit finisce negli ultimi n bit di arr[round(ind_k)],
+        dove ind_k è il cursore accumulato sommando div; tra un blocco e il
+        successivo si conservano solo il cursore e gli eventuali bit avanzati.
+        index_map, se indicata, converte le posizioni logiche in indici di arr;
+        con workers > 1 ogni blocco è diviso in segmenti scritti in parallelo
+        """
+        index_map = index_map or _identity
+        leftover = np.zeros(0, dtype=np.uint8)
+        ind = 0.0
+
+        while block := stream.read(StreamingConfig.CHUNK_SIZE):
+            bits = np.unpackbits(np.frombuffer(block, dtype=np.uint8))
+            if len(leftover):
+                bits = np.concatenate((leftover, bits))
+            groups = len(bits) // n
+            leftover = bits[groups * n :]
+            if groups == 0:
+                continue
+
+            values = pack_groups(bits[: groups * n], n)
+            scatter_low_bits(
+                arr,
+                values,
+                n,
+                partial(group_targets, div, base=ind),
+                workers,
+                index_map,
+            )
+            ind = position_at(div, groups, ind)
+
+        # Gestisci bit rimanenti: si modificano solo gli ultimi len(leftover) bit
+        if len(leftover):
+            rest = len(leftover)
+            target = index_map(np.array([round(ind)], dtype=np.int64))
+            set_low_bits(arr, target, pack_groups(leftover, rest), rest)
+
+    @staticmethod
+    def _extract_stream(
+        arr: np.ndarray,
+        stream: BinaryIO,
+        n: int,
+        div: float,
+        size: int,
+        index_map: Optional[IndexMap] = None,
+        workers: int = 1,
+    ) -> None:
+        """
+        Estrae size byte da arr e li scrive su uno stream a blocchi.
+        Ogni blocco legge i campioni nelle posizioni round(ind_k), ne prende gli
+        ultimi n bit e li riorganizza in byte; l'ultimo gruppo, se il payload
+        non è multiplo di n bit, contiene solo i diff bit rimanenti.
+        Con workers > 1 i segmenti di ogni blocco vengono letti in parallelo
+        """
+        index_map = index_map or _identity
+        total_groups, diff = divmod(size * 8, n)
+        block_groups = max(8, StreamingConfig.CHUNK_SIZE * 8 // n)
+        pending = np.zeros(0, dtype=np.uint8)
+        ind = 0.0
+        done = 0
+
+        while done < total_groups:
+            count = min(block_groups, total_groups - done)
+            samples = gather_low_bits(
+                arr,
+                count,
+                n,
+                partial(group_targets, div, base=ind),
+                workers,
+                index_map,
+            )
+            bits = np.concatenate((pending, unpack_groups(samples, n)))
+
+            whole = len(bits) // 8 * 8
+            stream.write(np.packbits(bits[:whole]).tobytes())
+            pending = bits[whole:]
+            ind = position_at(div, count, ind)
+            done += count
+
+        # Gestisci l'ultimo gruppo parziale
+        if diff:
+            target = index_map(np.array([round(ind)], dtype=np.int64))
+            tail = unpack_groups(get_low_bits(arr, target, diff), diff)
+            stream.write(np.packbits(np.concatenate((pending, tail))).tobytes())
+
     @staticmethod
     def hide_binary_file(
         img: Image.Image,
@@ -32,6 +160,9 @@ class BinarySteganography:
         n: int = 0,
         div: float = 0,
         backup_file: Optional[str] = None,
+        workers: int = 1,
+        header: bool = False,
+        codec: Optional[str] = None,
     ) -> Tuple[Image.Image, int, float, int]:
         """
         Nasconde un file binario o una cartella in un'immagine
@@ -43,119 +174,270 @@ class BinarySteganography:
             n: Numero di bit da modificare per pixel
             div: Divisore per la distribuzione
             backup_file: File dove salvare i parametri
+            workers: Thread usati per scrivere il payload; il risultato è
+                identico a quello sequenziale
+            header: Se True scrive i parametri in un'intestazione nei primi
+                campioni dell'immagine, così il recupero non richiede backup
+            codec: Codec di compressione per FILE e DIR (CompressionCodec;
+                None = predefinito della modalità, "auto" = quello che
+                minimizza n secondo una stima su un campione del payload)
 
         Returns:
             Tupla con (immagine_risultato, n_finale, div_finale, dimensione_file)
         """
+        # Converte in RGB se necessario (RGBA mantiene il canale alfa)
+        if img.mode not in ["RGB", "RGBA"]:
+            img = img.convert("RGB")
+
+        # Un solo buffer modificabile, usato anche per l'immagine risultato
+        pixels = image_to_array(img, writable=True)
+        _, params = BinarySteganography.hide_binary_file_array(
+            pixels,
+            file_path,
+            compression_mode,
+            n,
+            div,
+            in_place=True,
+            backup_file=backup_file,
+            workers=workers,
+            header=header,
+            codec=codec,
+        )
+
+        # Crea immagine risultato
+        result_img = array_to_image(pixels)
+        return (result_img, params["n"], params["div"], params["size"])
+
+    @staticmethod
+    def hide_binary_file_array(
+        arr: np.ndarray,
+        file_path: str,
+        compression_mode: int = CompressionMode.NO_ZIP,
+        n: int = 0,
+        div: float = 0,
+        in_place: bool = False,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+        header: bool = False,
+        codec: Optional[str] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Nasconde un file binario o una cartella in un array NumPy
+
+        Args:
+            arr: Array (H, W, C) uint8 con C = 3 o 4
+            file_path: Percorso del file da nascondere
+            compression_mode, n, div, workers, header, codec: Parametri come in
+                hide_binary_file
+            in_place: Se True modifica arr direttamente, altrimenti ne usa una copia
+            backup_file: File dove salvare i parametri
+
+        Returns:
+            Tupla con (array_risultato, parametri) dove i parametri contengono anche
+            capacity_bits e payload_bits
+        """
         # Validazione parametri
+        ParameterValidator.validate_pixel_array(arr, (3, 4))
         ParameterValidator.validate_n(n)
         ParameterValidator.validate_compression_mode(compression_mode)
+        ParameterValidator.validate_codec(codec, compression_mode)
+        ParameterValidator.validate_workers(workers)
 
         # Determina canali
-        channels = 3
-        if img.mode == "RGBA":
-            channels = 4
-        if img.mode not in ["RGB", "RGBA"]:
-            img = img.convert("RGB")
-
-        # Comprimi file se richiesto
-        working_file = compress_file(file_path, compression_mode)
-
-        try:
-            # Ottieni dimensione file
-            total_bytes = getsize(working_file)
-
-            # Calcolo automatico di n se necessario
-            if n == 0:
-                n = 1
-                while (img.width * img.height) * channels * n < total_bytes * 8:
-                    n += 1
-                    if n > 8:
-                        raise ValueError(
-                            ErrorMessages.IMAGE_TOO_SMALL_FILE.format(
-                                file_size=total_bytes,
-                                width=img.width,
-                                height=img.height,
-                            )
-                        )
-
-            # Verifica dimensioni
-            ParameterValidator.validate_image_size_for_file(
-                img, total_bytes, n, channels
+        height, width, channels = arr.shape
+
+        # Comprimi file in memoria se richiesto
+        reserved = HEADER_SAMPLES if header else 0
+        capacity = width * height * channels - reserved
+        codec = resolve_codec(codec, file_path, compression_mode, capacity, n)
+        payload = open_payload(file_path, compression_mode, codec)
+        with payload as (stream, total_bytes):
+            n, div = BinarySteganography._plan_hide(
+                width, height, channels, total_bytes, n, div, reserved
             )
 
-            # Converte immagine in array
-            arr = np.array(img).flatten().copy()
-            total_pixels_ch = len(arr)
-
-            # Calcola o valida DIV
-            if div == 0:
-                div = find_div(total_pixels_ch, working_file, n)
+            if in_place:
+                ParameterValidator.validate_writable_array(arr)
             else:
-                ParameterValidator.validate_div_for_file(
-                    div, total_pixels_ch, total_bytes, n
-                )
+                arr = arr.copy()
 
             # Inizia a nascondere il file
             print("Nascondendo file...")
-            rsv = ""
-            ind, pos = 0.0, 0
-
-            # Leggi file
-            with open(working_file, "rb") as f:
-                f.seek(0)
-                for _ in range(total_bytes):
-                    byte = f.read(1)
-                    bits = format(ord(byte), "08b")
-                    bits = rsv + bits
-                    rsv = ""
-                    while len(bits) >= n:
-                        tmp = bits[:n]
-                        bits = bits[n:]
-                        # Setta gli ultimi n bit del pixel
-                        arr[pos] = set_last_n_bits(arr[pos], tmp, n)
-                        ind += div
-                        pos = round(ind)
-                    if len(bits) > 0:
-                        rsv = bits
-
-            # Gestisci bit rimanenti
-            while len(rsv) > 0:
-                tmp = rsv[:n]
-                rsv = rsv[n:]
-                arr[pos] = set_last_n_bits(arr[pos], tmp, n)
-                ind += div
-                pos = round(ind)
-
-            percentage = format(
-                ((total_bytes * 8) / ((img.width * img.height) * channels * n)) * 100,
-                ".2f",
+            checksum = ChecksumStream(stream)
+            BinarySteganography._embed_stream(
+                flat_view(arr)[reserved:], checksum, n, div, workers=workers
             )
-            print(
-                f"TERMINATO - Percentuale di pixel usati con n={n} e div={div}: {percentage}%"
+
+        metadata = BinarySteganography._finish_hide(
+            (width, height, channels),
+            n,
+            div,
+            total_bytes,
+            compression_mode,
+            file_path,
+            backup_file,
+            codec,
+        )
+        if header:
+            write_header(flat_view(arr), DataType.BINARY, metadata)
+        current_backup().index_params(
+            DataType.BINARY, dict(metadata, crc=checksum.crc), partial(array_key, arr)
+        )
+        return arr, metadata
+
+    @staticmethod
+    def hide_binary_file_memmap(
+        host_path: str,
+        file_path: str,
+        compression_mode: int = CompressionMode.NO_ZIP,
+        n: int = 0,
+        div: float = 0,
+        output_path: Optional[str] = None,
+        raw_shape: Optional[Tuple[int, int, int]] = None,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+        header: bool = False,
+        codec: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Nasconde un file in un host non compresso (PPM, BMP o raw) senza caricarlo
+        in memoria: vengono letti e scritti solo i byte nelle posizioni round(ind)
+
+        Args:
+            host_path: File host da modificare
+            file_path: Percorso del file da nascondere
+            compression_mode, n, div, workers, header, codec: Parametri come in
+                hide_binary_file
+            output_path: Se indicato, l'host viene prima copiato qui e si modifica
+                la copia; altrimenti host_path viene modificato sul posto
+            raw_shape: (height, width, channels) se host_path è un file raw
+            backup_file: File dove salvare i parametri
+
+        Returns:
+            Parametri dell'occultamento, con capacity_bits, payload_bits e host_path
+        """
+        ParameterValidator.validate_n(n)
+        ParameterValidator.validate_compression_mode(compression_mode)
+        ParameterValidator.validate_codec(codec, compression_mode)
+        ParameterValidator.validate_workers(workers)
+
+        if output_path is not None:
+            shutil.copyfile(host_path, output_path)
+            host_path = output_path
+        host = open_memmap_host(host_path, raw_shape, writable=True)
+
+        # Comprimi file in memoria se richiesto
+        reserved = HEADER_SAMPLES if header else 0
+        capacity = len(host) - reserved
+        codec = resolve_codec(codec, file_path, compression_mode, capacity, n)
+        payload = open_payload(file_path, compression_mode, codec)
+        with payload as (stream, total_bytes):
+            n, div = BinarySteganography._plan_hide(
+                host.width, host.height, host.channels, total_bytes, n, div, reserved
             )
 
-            # Crea immagine risultato
-            result_img = Image.fromarray(arr.reshape(img.height, img.width, channels))
+            print("Nascondendo file nell'host mappato in memoria...")
+            checksum = ChecksumStream(stream)
+            BinarySteganography._embed_stream(
+                host.buffer,
+                checksum,
+                n,
+                div,
+                index_map=_shift(host.translate, reserved),
+                workers=workers,
+            )
 
-            # Salva i parametri per il recupero
-            params = {
-                "n": n,
-                "div": div,
-                "size": total_bytes,
-                "zipMode": compression_mode,
-                "method": "binary",
-                "original_file": file_path,
-                "channels": channels,
-            }
-            backup_system.save_backup_data(DataType.BINARY, params, backup_file)
+        metadata = BinarySteganography._finish_hide(
+            (host.width, host.height, host.channels),
+            n,
+            div,
+            total_bytes,
+            compression_mode,
+            file_path,
+            backup_file,
+            codec,
+        )
+        if header:
+            write_header(host.buffer, DataType.BINARY, metadata, host.translate)
+        host.flush()
+        current_backup().index_params(
+            DataType.BINARY, dict(metadata, crc=checksum.crc), partial(memmap_key, host)
+        )
+        return dict(metadata, host_path=host_path)
+
+    @staticmethod
+    def _plan_hide(
+        width: int,
+        height: int,
+        channels: int,
+        total_bytes: int,
+        n: int,
+        div: float,
+        reserved: int = 0,
+    ) -> Tuple[int, float]:
+        """
+        Calcola n e div automatici per un payload di total_bytes byte e verifica
+        la capacità; reserved è il numero di campioni iniziali riservati
+        all'intestazione
+        """
+        # n minimo in forma chiusa (e verifica della capacità)
+        plan = CapacityPlanner.plan_file(
+            width, height, channels, total_bytes, n, reserved
+        )
+        n = plan["n"]
+
+        # Calcola o valida DIV
+        if div == 0:
+            div = plan["div"]
+        else:
+            ParameterValidator.validate_div_for_file(
+                div,
+                CapacityPlanner.file_samples(width, height, channels, reserved),
+                total_bytes,
+                n,
+            )
+        return n, div
 
-            return (result_img, n, div, total_bytes)
+    @staticmethod
+    def _finish_hide(
+        shape: Tuple[int, int, int],
+        n: int,
+        div: float,
+        total_bytes: int,
+        compression_mode: int,
+        file_path: str,
+        backup_file: Optional[str],
+        codec: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Stampa il riepilogo, salva i parametri e restituisce i metadati"""
+        width, height, channels = shape
+        percentage = format(
+            ((total_bytes * 8) / ((width * height) * channels * n)) * 100,
+            ".2f",
+        )
+        print(
+            f"TERMINATO - Percentuale di pixel usati con n={n} e div={div}: {percentage}%"
+        )
 
-        finally:
-            # Pulizia file temporanei
-            if compression_mode != CompressionMode.NO_ZIP:
-                cleanup_temp_files()
+        # Salva i parametri per il recupero
+        params = {
+            "n": n,
+            "div": div,
+            "size": total_bytes,
+            "zipMode": compression_mode,
+            "method": "binary",
+            "original_file": file_path,
+            "channels": channels,
+        }
+        if codec is not None:
+            params["codec"] = codec
+        current_backup().save_backup_data(DataType.BINARY, params, backup_file)
+
+        return dict(
+            params,
+            capacity_bits=width * height * channels * n,
+            payload_bits=total_bytes * 8,
+        )
 
     @staticmethod
     def get_binary_file(
@@ -166,6 +448,7 @@ class BinarySteganography:
         div: Optional[float] = None,
         size: Optional[int] = None,
         backup_file: Optional[str] = None,
+        workers: int = 1,
     ) -> None:
         """
         Recupera un file binario da un'immagine
@@ -175,19 +458,145 @@ class BinarySteganography:
             output_path: Percorso dove salvare il file recuperato
             compression_mode, n, div, size: Parametri per il recupero
             backup_file: File di backup dei parametri
+            workers: Thread usati per leggere il payload
+
+        Se l'immagine contiene l'intestazione scritta con header=True, i parametri
+        mancanti vengono letti da lì senza consultare i backup; altrimenti si
+        cercano in backup_file, poi nell'indice dei parametri, se attivo, e
+        infine tra quelli dell'ultimo occultamento.
+        """
+        ParameterValidator.validate_workers(workers)
+        BinarySteganography._extract_file(
+            BinarySteganography.image_source(img),
+            output_path,
+            compression_mode,
+            n,
+            div,
+            size,
+            backup_file,
+            workers,
+        )
+
+    @staticmethod
+    def get_binary_file_array(
+        arr: np.ndarray,
+        output_path: str,
+        compression_mode: Optional[int] = None,
+        n: Optional[int] = None,
+        div: Optional[float] = None,
+        size: Optional[int] = None,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+    ) -> None:
+        """
+        Recupera un file binario da un array NumPy
+
+        Args:
+            arr: Array (H, W, C) uint8 con C = 3 o 4
+            output_path: Percorso dove salvare il file recuperato
+            compression_mode, n, div, size, workers: Parametri come in get_binary_file
+            backup_file: File di backup dei parametri
         """
+        ParameterValidator.validate_pixel_array(arr, (3, 4))
+        ParameterValidator.validate_workers(workers)
+        arr = np.ascontiguousarray(arr)
+        flat = flat_view(arr)
+        header_data = read_header(flat, DataType.BINARY)
+        if header_data:
+            flat = flat[HEADER_SAMPLES:]
+        BinarySteganography._extract_file(
+            (flat, None, header_data, partial(array_key, arr)),
+            output_path,
+            compression_mode,
+            n,
+            div,
+            size,
+            backup_file,
+            workers,
+        )
+
+    @staticmethod
+    def get_binary_file_memmap(
+        host_path: str,
+        output_path: str,
+        compression_mode: Optional[int] = None,
+        n: Optional[int] = None,
+        div: Optional[float] = None,
+        size: Optional[int] = None,
+        raw_shape: Optional[Tuple[int, int, int]] = None,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+    ) -> None:
+        """
+        Recupera un file da un host non compresso (PPM, BMP o raw) leggendo solo
+        i byte nelle posizioni round(ind)
+
+        Args:
+            host_path: File host che contiene il file
+            output_path: Percorso dove salvare il file recuperato
+            compression_mode, n, div, size, workers: Parametri come in get_binary_file
+            raw_shape: (height, width, channels) se host_path è un file raw
+            backup_file: File di backup dei parametri
+        """
+        ParameterValidator.validate_workers(workers)
+        BinarySteganography._extract_file(
+            BinarySteganography.memmap_source(host_path, raw_shape),
+            output_path,
+            compression_mode,
+            n,
+            div,
+            size,
+            backup_file,
+            workers,
+        )
+
+    @staticmethod
+    def resolve_params(
+        source: PayloadSource,
+        compression_mode: Optional[int],
+        n: Optional[int],
+        div: Optional[float],
+        size: Optional[int],
+        backup_file: Optional[str],
+        workers: int = 1,
+    ) -> Tuple[int, int, float, int]:
+        """
+        Completa e valida i parametri di recupero; quelli mancanti vengono presi,
+        nell'ordine, dall'intestazione dell'host source, da backup_file,
+        dall'indice dei parametri per l'hash dell'host e infine dall'ultimo
+        occultamento. Un record dell'indice viene usato solo se il payload letto
+        con i suoi parametri ha il CRC registrato (la verifica legge il payload
+        una volta, con workers thread)
+
+        Returns:
+            (compression_mode, n, div, size)
+        """
+        _, _, header_data, index_key = source
         # Recupera parametri automaticamente se non forniti
         if any(param is None for param in [compression_mode, n, div, size]):
-            print("Alcuni parametri mancanti, cercando nei backup...")
+            backup_data = header_data
+            if backup_data:
+                print("Usando parametri dall'intestazione nell'immagine")
+            else:
+                print("Alcuni parametri mancanti, cercando nei backup...")
 
-            # Controlla se esistono parametri di backup
-            backup_data = None
-            if backup_file:
-                backup_data = backup_system.load_backup_data(backup_file)
+            # Un file di backup indicato esplicitamente prevale sull'indice
+            if not backup_data and backup_file:
+                backup_data = current_backup().load_backup_data(backup_file)
+
+            # Controlla l'indice dei parametri
+            if not backup_data:
+                backup_data = current_backup().lookup_params(
+                    DataType.BINARY,
+                    index_key,
+                    partial(
+                        BinarySteganography.payload_matches, source, workers=workers
+                    ),
+                )
 
             # Se non ci sono backup file, controlla le variabili locali
             if not backup_data:
-                recent_params = backup_system.get_last_params(DataType.BINARY)
+                recent_params = current_backup().get_last_params(DataType.BINARY)
                 if recent_params:
                     print(
                         "Usando parametri dall'ultima operazione di occultamento file binari"
@@ -225,77 +634,108 @@ class BinarySteganography:
         ParameterValidator.validate_n(n)
         ParameterValidator.validate_compression_mode(compression_mode)
 
-        print("Cercando file...")
-
-        # Inizia recupero file
-        arr = np.array(img).flatten().copy()
-        bits, res = "", ""
-        ind, pos = 0.0, 0
-        diff = size * 8
-        err = round(size * 8 / n)
-
-        # Gestione file compresso
-        working_output = output_path
-        if compression_mode != CompressionMode.NO_ZIP:
-            res = output_path
-            working_output = "tmp.zip"
-
-        with open(working_output, "wb") as file:
-            for _ in range(err):
-                if diff < n:
-                    bits += format(arr[pos], "08b")[-diff:]
-                else:
-                    bits += format(arr[pos], "08b")[-n:]
-
-                if len(bits) >= 1024:
-                    wr = bits[:1024]
-                    wr = string_to_bytes(wr)
-                    file.write(wr)
-                    bits = bits[1024:]
-
-                ind += div
-                pos = round(ind)
-
-            if bits:
-                bits = string_to_bytes(bits)
-                file.write(bits)
-
-        # Gestione decompressione
-        if compression_mode == CompressionMode.NO_ZIP:
-            print(f"FILE TROVATO - File salvato come {working_output}")
-        elif compression_mode == CompressionMode.FILE:
-            BinarySteganography._decompress_file(working_output, res)
-        else:  # CompressionMode.DIR
-            BinarySteganography._decompress_directory(working_output, res)
+        return compression_mode, n, div, size
 
     @staticmethod
-    def _decompress_file(zip_path: str, output_path: str) -> None:
-        """Decomprime un file singolo"""
-        print("Decompressione file...")
+    def payload_matches(
+        source: PayloadSource, params: Dict[str, Any], workers: int = 1
+    ) -> bool:
+        """
+        Verifica che il payload letto da source con i parametri params abbia la
+        dimensione e il CRC-32 registrati nell'indice; i record senza CRC o con
+        parametri non validi per l'host non vengono accettati
+        """
+        buffer, index_map, _, _ = source
+        if "crc" not in params:
+            return False
+        checksum = ChecksumStream()
         try:
-            with zipfile.ZipFile(zip_path, "r") as zf:
-                old_path = zf.namelist()[0]
-                file_data = zf.read(old_path)
-            os.remove(zip_path)
+            ParameterValidator.validate_recovery_params(
+                params.get("n"), params.get("div"), params.get("size")
+            )
+            ParameterValidator.validate_n(params["n"])
+            BinarySteganography._extract_stream(
+                buffer,
+                checksum,
+                params["n"],
+                params["div"],
+                params["size"],
+                index_map,
+                workers,
+            )
+        except (ValueError, IndexError):
+            return False
+        return checksum.size == params["size"] and checksum.crc == params["crc"]
+
+    @staticmethod
+    def _extract_file(
+        source: PayloadSource,
+        output_path: str,
+        compression_mode: Optional[int],
+        n: Optional[int],
+        div: Optional[float],
+        size: Optional[int],
+        backup_file: Optional[str],
+        workers: int = 1,
+    ) -> None:
+        """
+        Recupera il file nascosto nell'host descritto da source; i parametri
+        mancanti vengono completati da resolve_params
+        """
+        compression_mode, n, div, size = BinarySteganography.resolve_params(
+            source, compression_mode, n, div, size, backup_file, workers
+        )
+        buffer, index_map, _, _ = source
+        extract = partial(
+            BinarySteganography._extract_stream,
+            buffer,
+            index_map=index_map,
+            workers=workers,
+        )
 
-            with zipfile.ZipFile(zip_path, "w") as zf:
-                zf.writestr(output_path, file_data)
+        print("Cercando file...")
+
+        # Le directory vengono estratte mentre il payload viene letto
+        if compression_mode == CompressionMode.DIR:
+            print("Decompressione directory...")
+            with DirectoryUnpacker(output_path) as unpacker:
+                extract(unpacker, n, div, size)
+            print(f"DIRECTORY TROVATA - Directory salvata come {output_path}")
+            return
 
-            with zipfile.ZipFile(zip_path, "r") as zf:
-                zf.extractall()
-            os.remove(zip_path)
+        # Il singolo file compresso viene decompresso direttamente in output_path
+        if compression_mode == CompressionMode.FILE:
+            print("Decompressione file...")
+            with FileUnpacker(output_path) as unpacker:
+                extract(unpacker, n, div, size)
             print(f"FILE TROVATO - File salvato come {output_path}")
-        except Exception as e:
-            raise ValueError(f"Errore durante l'estrazione del file: {e}")
+            return
+
+        with open(output_path, "wb") as file:
+            extract(file, n, div, size)
+        print(f"FILE TROVATO - File salvato come {output_path}")
 
     @staticmethod
-    def _decompress_directory(zip_path: str, output_path: str) -> None:
-        """Decomprime una directory"""
-        print("Decompressione directory...")
-        try:
-            with zipfile.ZipFile(zip_path, "r") as zf:
-                zf.extractall(output_path)
-            os.remove(zip_path)
-            print(f"DIRECTORY TROVATA - Directory salvata come {output_path}")
-        except Exception as e:
-            raise ValueError(f"Errore durante l'estrazione della directory: {e}")
+    def image_source(img: Image.Image) -> PayloadSource:
+        """Campioni dell'immagine dopo l'eventuale intestazione"""
+        pixels = image_to_array(img)
+        flat = flat_view(pixels)
+        header_data = read_header(flat, DataType.BINARY)
+        if header_data:
+            flat = flat[HEADER_SAMPLES:]
+        return flat, None, header_data, partial(array_key, pixels)
+
+    @staticmethod
+    def memmap_source(
+        host_path: str, raw_shape: Optional[Tuple[int, int, int]]
+    ) -> PayloadSource:
+        """Host mappato in memoria, letto solo nelle posizioni richieste"""
+        host = open_memmap_host(host_path, raw_shape)
+        header_data = read_header(host.buffer, DataType.BINARY, host.translate)
+        offset = HEADER_SAMPLES if header_data else 0
+        return (
+            host.buffer,
+            _shift(host.translate, offset),
+            header_data,
+            partial(memmap_key, host),
+        )
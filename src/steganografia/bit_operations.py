@@ -2,6 +2,141 @@
 Operazioni core per la manipolazione dei bit nella steganografia
 """
 
+import math
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+# Indici accettati dai kernel: array di posizioni oppure slice
+Indices = Union[np.ndarray, slice]
+
+
+# Kernel vettoriali su buffer np.uint8 e array di bit
+
+
+def accumulate_positions(div: float, count: int, start: float = 0.0) -> np.ndarray:
+    """
+    Restituisce count valori del cursore start, start + div, start + 2div, ...
+    accumulati in sequenza. np.cumsum somma un elemento alla volta, quindi
+    riproduce esattamente gli arrotondamenti del cursore float `ind += div`
+    """
+    positions = np.full(count, div, dtype=np.float64)
+    if count > 0:
+        positions[0] = start
+        np.cumsum(positions, out=positions)
+    return positions
+
+
+def position_at(div: float, count: int, start: float = 0.0) -> float:
+    """
+    Restituisce il valore del cursore dopo count somme `ind += div` partendo da
+    start, identico bit per bit a quello ottenuto sommando in sequenza.
+
+    Finché il cursore resta nello stesso intervallo [2^e, 2^(e+1)) ogni somma
+    aggiunge la stessa quantità d (multiplo dell'ulp u): il primo passo porta il
+    cursore su un multiplo pari di u nel caso di pareggio dell'arrotondamento,
+    il secondo misura d, poi si salta direttamente all'ultimo passo che non
+    esce dall'intervallo. Il costo è proporzionale al numero di intervalli
+    attraversati, non a count
+    """
+    ind = float(start)
+    while count > 0:
+        if ind <= 0.0 or ind < div:
+            ind += div
+            count -= 1
+            continue
+
+        _, exponent = math.frexp(ind)
+        ulp = math.ldexp(1.0, exponent - 53)
+        top = 1 << 53  # 2^exponent in unità di ulp
+
+        # Due passi reali: il secondo misura il passo costante dell'intervallo
+        first = ind + div
+        count -= 1
+        if count == 0 or math.frexp(first)[1] != exponent:
+            ind = first
+            continue
+        second = first + div
+        count -= 1
+        step = round((second - first) / ulp)
+        ind = second
+        if count == 0 or math.frexp(second)[1] != exponent:
+            continue
+        if step == 0:
+            # div è trascurabile rispetto al cursore, che non cambia più
+            return ind
+
+        units = round(ind / ulp)
+        jumps = min(count, (top - units - 1) // step)
+        ind = math.ldexp(float(units + jumps * step), exponent - 53)
+        count -= jumps
+    return ind
+
+
+def group_targets(
+    div: float,
+    start: int,
+    stop: int,
+    base: float = 0.0,
+    rounding: Callable[[np.ndarray], np.ndarray] = np.rint,
+    limit: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Posizioni intere dei gruppi [start, stop): rounding(ind_k), con ind_k il
+    cursore che parte da base e cresce di div (np.rint per round(ind) dei file,
+    np.floor per int(ind) delle immagini); con limit restano solo i gruppi
+    con ind_k < limit
+    """
+    positions = accumulate_positions(div, stop - start, position_at(div, start, base))
+    if limit is not None:
+        positions = positions[: int(np.searchsorted(positions, limit, side="left"))]
+    return rounding(positions).astype(np.int64)
+
+
+def set_low_bits(
+    buffer: np.ndarray, indices: Indices, values: np.ndarray, n: int
+) -> None:
+    """Sostituisce gli ultimi n bit di buffer[indices] con values"""
+    keep_mask = np.uint8((0xFF << n) & 0xFF)
+    low_mask = np.uint8((1 << n) - 1)
+    buffer[indices] = (buffer[indices] & keep_mask) | (values & low_mask)
+
+
+def get_low_bits(buffer: np.ndarray, indices: Indices, n: int) -> np.ndarray:
+    """Restituisce gli ultimi n bit di buffer[indices]"""
+    return buffer[indices] & np.uint8((1 << n) - 1)
+
+
+def unpack_groups(values: np.ndarray, k: int) -> np.ndarray:
+    """Espande valori da k bit in un array di bit (il più significativo prima)"""
+    values = np.asarray(values, dtype=np.uint8)
+    return np.unpackbits(values.reshape(-1, 1), axis=1)[:, 8 - k :].reshape(-1)
+
+
+def pack_groups(bits: np.ndarray, m: int) -> np.ndarray:
+    """Raggruppa un array di bit (lunghezza multipla di m) in valori da m bit"""
+    return np.packbits(bits.reshape(-1, m), axis=1)[:, 0] >> (8 - m)
+
+
+def regroup_bits(values: np.ndarray, k: int, m: int) -> np.ndarray:
+    """
+    Converte un flusso di valori da k bit in valori da m bit;
+    l'ultimo gruppo incompleto viene completato con zeri a destra
+    """
+    bits = unpack_groups(values, k)
+    padding = -len(bits) % m
+    if padding:
+        bits = np.concatenate((bits, np.zeros(padding, dtype=np.uint8)))
+    return pack_groups(bits, m)
+
+
+def bits_from_string(bit_string: str) -> np.ndarray:
+    """Converte una stringa di '0'/'1' in un array di bit"""
+    return np.frombuffer(bit_string.encode("ascii"), dtype=np.uint8) - ord("0")
+
+
+# Helper su stringhe mantenuti per compatibilità
+
 
 def binary_convert(text: str) -> str:
     """Converte una stringa di testo in una stringa binaria (carattere per carattere)"""
@@ -10,27 +145,20 @@ def binary_convert(text: str) -> str:
 
 def binary_convert_back(text: str) -> str:
     """Converte una stringa binaria in una stringa di testo (8-bit)"""
-    return "".join(chr(int(text[i * 8 : i * 8 + 8], 2)) for i in range(len(text) // 8))
+    return string_to_bytes(text).decode("latin-1")
 
 
 def set_last_bit(value: int, bit: str) -> int:
     """Setta l'ultimo bit di un numero"""
-    value_str = format(
-        value, "08b"
-    )  # converte un intero in una stringa di 8 caratteri (byte)
-    value_str = value_str[:7] + bit  # cambia l'ultimo bit
-    result = int(value_str, 2)  # riconverte la stringa in un numero
-    result = min(255, max(0, result))  # controlla se il numero è fuori range
-    return result
+    return set_last_n_bits(value, bit, 1)
 
 
 def set_last_n_bits(value: int, bits: str, n: int) -> int:
     """Setta gli ultimi n bits di un numero"""
-    value_str = format(value, "08b")
     n = min(n, len(bits))
-    value_str = value_str[:-n] + bits
-    result = int(value_str, 2)
-    result = min(255, max(0, result))
+    prefix = value >> n if n else 0
+    result = (prefix << len(bits)) | int(bits, 2)
+    result = min(255, max(0, result))  # controlla se il numero è fuori range
     return result
 
 
@@ -47,9 +175,5 @@ def set_color_component(mat, i: int, j: int, color: int, channel: int):
 
 def string_to_bytes(bit_string: str) -> bytearray:
     """Converte una stringa di bit in bytes"""
-    byte_array = bytearray()
-    for i in range(0, len(bit_string), 8):
-        byte = bit_string[i : i + 8]
-        if len(byte) == 8:
-            byte_array.append(int(byte, 2))
-    return byte_array
+    whole = len(bit_string) // 8 * 8
+    return bytearray(np.packbits(bits_from_string(bit_string[:whole])).tobytes())
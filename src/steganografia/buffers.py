@@ -0,0 +1,35 @@
+"""
+Gestione dei buffer NumPy delle immagini senza copie superflue
+"""
+
+import numpy as np
+from PIL import Image
+
+
+def image_to_array(img: Image.Image, writable: bool = False) -> np.ndarray:
+    """
+    Restituisce i pixel di un'immagine come array (H, W, C) di np.uint8
+
+    Args:
+        img: Immagine PIL
+        writable: Se True l'array restituito è modificabile (una sola copia esplicita)
+
+    Returns:
+        Array dei pixel; senza writable è una vista in sola lettura
+    """
+    arr = np.asarray(img)
+    if writable and not arr.flags.writeable:
+        arr = arr.copy()
+    return arr
+
+
+def flat_view(arr: np.ndarray) -> np.ndarray:
+    """Vista monodimensionale di un array contiguo (nessuna copia)"""
+    if not arr.flags.c_contiguous:
+        raise ValueError("Il buffer dell'immagine deve essere contiguo in memoria")
+    return arr.reshape(-1)
+
+
+def array_to_image(arr: np.ndarray) -> Image.Image:
+    """Crea un'immagine PIL da un array (H, W, C) senza ulteriori copie NumPy"""
+    return Image.fromarray(np.ascontiguousarray(arr))
@@ -0,0 +1,239 @@
+"""
+Pianificazione della capacità dell'host in forma chiusa
+
+Un host con S campioni disponibili porta S * n bit, quindi il minimo n per un
+payload di B bit è max(1, ceil(B / S)) (al massimo 8); per le immagini il
+minimo lsb è max(1, ceil(msb * L / S)) con L campioni dell'immagine segreta.
+Ogni piano riporta anche div, la frazione di campioni che ricevono dati, la
+frazione attesa di campioni modificati (un campione cambia se almeno uno dei
+suoi n bit bassi è diverso: 1 - 2^-n per dati casuali) e i bit ancora liberi.
+
+I metodi plan_file e plan_image valutano un solo host con interi Python,
+con gli stessi n, lsb e div usati dall'occultamento; plan_files e plan_images
+valutano in blocco molti host candidati con NumPy, ad esempio per scegliere
+l'host migliore di un insieme prima di toccare i pixel.
+"""
+
+import os
+import sys
+from typing import Any, Dict, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+
+from config.constants import ErrorMessages, ValidationLimits
+
+
+def _ceil_div(a: int, b: int) -> int:
+    """ceil(a / b) per interi con b > 0"""
+    return -(-a // b)
+
+
+class CapacityPlanner:
+    """Calcolo di n/lsb minimi, div e margine di capacità dell'host"""
+
+    @staticmethod
+    def file_samples(width: int, height: int, channels: int, reserved: int = 0) -> int:
+        """Campioni dell'host disponibili per un file"""
+        return width * height * channels - reserved
+
+    @staticmethod
+    def image_samples(width: int, height: int, reserved: int = 0) -> int:
+        """Campioni dell'host RGB disponibili per un'immagine"""
+        return width * height * 3 - reserved
+
+    @staticmethod
+    def min_n(samples: int, payload_bits: int) -> int:
+        """
+        Minimo numero di bit per campione per payload_bits bit in samples
+        campioni (0 se non bastano nemmeno 8 bit per campione)
+        """
+        if samples <= 0:
+            return 0
+        n = max(1, _ceil_div(payload_bits, samples))
+        return n if n <= ValidationLimits.MAX_N else 0
+
+    @staticmethod
+    def plan_file(
+        width: int,
+        height: int,
+        channels: int,
+        size: int,
+        n: int = 0,
+        reserved: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Piano di occultamento di un file di size byte
+
+        Args:
+            width, height, channels: Dimensioni dell'host
+            size: Byte del payload (già compresso se richiesto)
+            n: Bit per campione (0 = minimo necessario)
+            reserved: Campioni iniziali riservati all'intestazione
+
+        Returns:
+            Dizionario con n, div, used_fraction, modified_fraction e
+            headroom_bits (bit ancora disponibili con questo n)
+        """
+        samples = CapacityPlanner.file_samples(width, height, channels, reserved)
+        bits = size * 8
+        if n == 0:
+            n = CapacityPlanner.min_n(samples, bits)
+        if n == 0 or samples * n < bits:
+            raise ValueError(
+                ErrorMessages.IMAGE_TOO_SMALL_FILE.format(
+                    file_size=size, width=width, height=height
+                )
+            )
+
+        groups = _ceil_div(bits, n)
+        return {
+            "n": n,
+            # Un payload vuoto non occupa campioni e qualsiasi div va bene; se
+            # il payload arriva all'ultimo campione div resta 1, altrimenti due
+            # gruppi cadrebbero nello stesso campione
+            "div": max(1.0, (samples * n - n) / bits) if bits else 0.0,
+            "used_fraction": groups / samples,
+            "modified_fraction": groups / samples * (1 - 2.0**-n),
+            "headroom_bits": samples * n - bits,
+        }
+
+    @staticmethod
+    def plan_image(
+        host_size: Tuple[int, int],
+        secret_size: Tuple[int, int],
+        msb: int = 8,
+        lsb: int = 0,
+        reserved: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Piano di occultamento dei msb bit più significativi di un'immagine RGB
+
+        Args:
+            host_size: (width, height) dell'host
+            secret_size: (width, height) dell'immagine segreta
+            msb: Bit più significativi nascosti per canale
+            lsb: Bit per campione dell'host (0 = minimo necessario)
+            reserved: Campioni iniziali riservati all'intestazione
+
+        Returns:
+            Dizionario con lsb, div, used_fraction, modified_fraction e
+            headroom_bits (bit ancora disponibili con questo lsb)
+        """
+        host_width, host_height = host_size
+        secret_width, secret_height = secret_size
+        samples = CapacityPlanner.image_samples(host_width, host_height, reserved)
+        secret_len = secret_width * secret_height * 3
+        bits = secret_len * msb
+        if lsb == 0:
+            lsb = CapacityPlanner.min_n(samples, bits)
+        if lsb == 0 or samples * lsb < bits:
+            raise ValueError(
+                ErrorMessages.IMAGE_TOO_SMALL_IMAGE.format(
+                    host_width=host_width,
+                    host_height=host_height,
+                    secret_width=secret_width,
+                    secret_height=secret_height,
+                )
+            )
+
+        groups = _ceil_div(bits, lsb)
+        return {
+            "lsb": lsb,
+            "div": (samples * lsb) / bits,
+            "used_fraction": groups / samples,
+            "modified_fraction": groups / samples * (1 - 2.0**-lsb),
+            "headroom_bits": samples * lsb - bits,
+        }
+
+    @staticmethod
+    def _plan_many(
+        samples: np.ndarray, bits: int, name: str, spare: int
+    ) -> Dict[str, np.ndarray]:
+        """
+        Versione vettoriale dei piani: name è la chiave del numero di bit per
+        campione, div = max(1, (samples - spare) * n / bits). Dove l'host non basta
+        name vale 0, fits è False, div e le frazioni sono nan
+        """
+        samples = np.asarray(samples, dtype=np.int64)
+        positive = samples > 0
+        safe = np.where(positive, samples, 1)
+        n = np.maximum(1, -(-bits // safe))
+        fits = positive & (n <= ValidationLimits.MAX_N)
+        n = np.where(fits, n, 0)
+
+        groups = -(-bits // np.where(fits, n, 1))
+        used = np.where(fits, groups / safe, np.nan)
+        if bits:
+            div = np.maximum(1.0, (samples - spare) * n / np.float64(bits))
+            div = np.where(fits, div, np.nan)
+        else:
+            div = np.where(fits, 0.0, np.nan)
+        return {
+            name: n,
+            "fits": fits,
+            "div": div,
+            "used_fraction": used,
+            "modified_fraction": used * (1 - np.exp2(-n.astype(np.float64))),
+            "headroom_bits": np.where(fits, samples * n - bits, 0),
+        }
+
+    @staticmethod
+    def plan_files(
+        widths: np.ndarray,
+        heights: np.ndarray,
+        channels: np.ndarray,
+        size: int,
+        reserved: int = 0,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Valuta in blocco gli host candidati per un file di size byte
+
+        Args:
+            widths, heights, channels: Dimensioni degli host (array o scalari
+                compatibili per broadcasting)
+            size: Byte del payload
+            reserved: Campioni riservati all'intestazione
+
+        Returns:
+            Dizionario di array: n (0 se l'host è troppo piccolo), fits, div,
+            used_fraction, modified_fraction e headroom_bits
+        """
+        samples = (
+            np.asarray(widths, dtype=np.int64)
+            * np.asarray(heights, dtype=np.int64)
+            * np.asarray(channels, dtype=np.int64)
+            - reserved
+        )
+        return CapacityPlanner._plan_many(samples, size * 8, "n", 1)
+
+    @staticmethod
+    def plan_images(
+        host_widths: np.ndarray,
+        host_heights: np.ndarray,
+        secret_size: Tuple[int, int],
+        msb: int = 8,
+        reserved: int = 0,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Valuta in blocco gli host RGB candidati per un'immagine segreta
+
+        Args:
+            host_widths, host_heights: Dimensioni degli host
+            secret_size: (width, height) dell'immagine segreta
+            msb: Bit più significativi nascosti per canale
+            reserved: Campioni riservati all'intestazione
+
+        Returns:
+            Dizionario di array: lsb (0 se l'host è troppo piccolo), fits, div,
+            used_fraction, modified_fraction e headroom_bits
+        """
+        samples = (
+            np.asarray(host_widths, dtype=np.int64)
+            * np.asarray(host_heights, dtype=np.int64)
+            * 3
+            - reserved
+        )
+        bits = secret_size[0] * secret_size[1] * 3 * msb
+        return CapacityPlanner._plan_many(samples, bits, "lsb", 0)
@@ -0,0 +1,207 @@
+"""
+Codec di compressione dei payload binari
+
+Ogni codec corrisponde a un metodo zip con il suo livello, così i payload
+FILE e DIR restano archivi zip standard e il recupero legge il metodo di ogni
+file dall'archivio stesso; il codec scelto viene comunque registrato nei
+parametri di recupero.
+
+Con CompressionCodec.AUTO il codec viene scelto prima dell'occultamento:
+un campione del payload viene compresso con ogni candidato per stimare la
+dimensione finale e il tempo necessario, e vince il codec che richiede il
+minimo n (a parità di n, il payload più piccolo) tra quelli che restano entro
+CodecConfig.TIME_BUDGET.
+"""
+
+import bz2
+import lzma
+import math
+import os
+import sys
+import time
+import zipfile
+import zlib
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from config.constants import CodecConfig, CompressionCodec, CompressionMode
+
+from .archive import walk_files
+
+# Metodo zip e livello di ciascun codec (None = livello predefinito)
+_ZIP_METHODS: Dict[str, Tuple[int, Optional[int]]] = {
+    CompressionCodec.STORED: (zipfile.ZIP_STORED, None),
+    CompressionCodec.DEFLATE_FAST: (zipfile.ZIP_DEFLATED, 1),
+    CompressionCodec.DEFLATE: (zipfile.ZIP_DEFLATED, 6),
+    CompressionCodec.DEFLATE_BEST: (zipfile.ZIP_DEFLATED, 9),
+    CompressionCodec.BZIP2: (zipfile.ZIP_BZIP2, 9),
+    CompressionCodec.LZMA: (zipfile.ZIP_LZMA, None),
+    CompressionCodec.DEFLATE_STORE: (zipfile.ZIP_DEFLATED, 0),
+}
+
+# Compressione di un campione con lo stesso algoritmo usato nell'archivio
+_SAMPLE_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    CompressionCodec.STORED: bytes,
+    CompressionCodec.DEFLATE_FAST: lambda data: _deflate(data, 1),
+    CompressionCodec.DEFLATE: lambda data: _deflate(data, 6),
+    CompressionCodec.DEFLATE_BEST: lambda data: _deflate(data, 9),
+    CompressionCodec.BZIP2: lambda data: bz2.compress(data, 9),
+    CompressionCodec.LZMA: lambda data: lzma.compress(
+        data, lzma.FORMAT_RAW, filters=[{"id": lzma.FILTER_LZMA1}]
+    ),
+    CompressionCodec.DEFLATE_STORE: lambda data: _deflate(data, 0),
+}
+
+# Byte per file fuori dai dati compressi: intestazione locale (30), data
+# descriptor (16), voce della directory centrale (46) e due copie del nome
+_ENTRY_OVERHEAD = 30 + 16 + 46
+_END_OVERHEAD = 22
+
+
+def _deflate(data: bytes, level: int) -> bytes:
+    """Deflate grezzo, come nei file zip"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def zip_method(codec: str) -> Tuple[int, Optional[int]]:
+    """Metodo zip e livello di compressione del codec"""
+    return _ZIP_METHODS[codec]
+
+
+def payload_files(file_path: str, compression_mode: int) -> List[Tuple[str, str]]:
+    """Percorso e nome nell'archivio dei file che compongono il payload"""
+    if compression_mode == CompressionMode.FILE:
+        return [(file_path, os.path.basename(file_path))]
+    return list(walk_files(file_path))
+
+
+def _read_sample(files: List[Tuple[str, str]], sizes: List[int]) -> bytes:
+    """
+    Legge fino a CodecConfig.SAMPLE_SIZE byte da punti equidistanti del
+    payload, considerato come la concatenazione dei file
+    """
+    total = sum(sizes)
+    if total <= CodecConfig.SAMPLE_SIZE:
+        offsets = [0]
+        block = total
+    else:
+        count = max(1, CodecConfig.SAMPLE_SIZE // CodecConfig.SAMPLE_BLOCK)
+        block = CodecConfig.SAMPLE_SIZE // count
+        step = (total - block) / max(1, count - 1)
+        offsets = [int(i * step) for i in range(count)]
+
+    starts = [0, *accumulate(sizes)]
+    parts = []
+    for offset in offsets:
+        remaining = block
+        index = bisect_right(starts, offset) - 1
+        # Un blocco può proseguire nei file successivi
+        while remaining > 0 and index < len(files):
+            with open(files[index][0], "rb") as f:
+                f.seek(offset - starts[index])
+                data = f.read(remaining)
+            parts.append(data)
+            remaining -= len(data)
+            index += 1
+            if index < len(starts):
+                offset = starts[index]
+    return b"".join(parts)
+
+
+def estimate_codecs(
+    file_path: str, compression_mode: int
+) -> Dict[str, Tuple[int, float]]:
+    """
+    Stima dimensione compressa e tempo di compressione per ogni codec
+
+    Args:
+        file_path: File o directory da nascondere
+        compression_mode: CompressionMode.FILE o CompressionMode.DIR
+
+    Returns:
+        Dizionario codec -> (byte stimati dell'archivio, secondi stimati)
+    """
+    files = payload_files(file_path, compression_mode)
+    sizes = [os.path.getsize(path) for path, _ in files]
+    total = sum(sizes)
+    sample = _read_sample(files, sizes)
+    overhead = _END_OVERHEAD + sum(
+        _ENTRY_OVERHEAD + 2 * len(name.encode()) for _, name in files
+    )
+
+    estimates = {}
+    for codec, compress in _SAMPLE_COMPRESSORS.items():
+        start = time.perf_counter()
+        compressed = len(compress(sample))
+        elapsed = time.perf_counter() - start
+        scale = total / len(sample) if sample else 0.0
+        estimates[codec] = (
+            math.ceil(compressed * scale) + overhead,
+            elapsed * scale,
+        )
+    return estimates
+
+
+def choose_codec(
+    file_path: str, compression_mode: int, capacity: int, n: int = 0
+) -> str:
+    """
+    Sceglie il codec che minimizza n entro CodecConfig.TIME_BUDGET
+
+    Args:
+        file_path: File o directory da nascondere
+        compression_mode: CompressionMode.FILE o CompressionMode.DIR
+        capacity: Campioni dell'host disponibili per il payload
+        n: Bit per campione se già fissato (0 = automatico); in tal caso
+            vince il payload stimato più piccolo
+
+    Returns:
+        Identificativo del codec scelto
+    """
+    estimates = estimate_codecs(file_path, compression_mode)
+
+    def cost(codec: str) -> Tuple[int, int]:
+        size = estimates[codec][0]
+        needed = n or max(1, math.ceil(size * 8 / max(1, capacity)))
+        return needed, size
+
+    # STORED non comprime nulla e rientra sempre nel tempo disponibile
+    candidates = [
+        codec
+        for codec, (_, seconds) in estimates.items()
+        if seconds <= CodecConfig.TIME_BUDGET or codec == CompressionCodec.STORED
+    ]
+    codec = min(candidates, key=cost)
+    print(f"Codec scelto automaticamente: {codec}")
+    return codec
+
+
+def resolve_codec(
+    codec: Optional[str],
+    file_path: str,
+    compression_mode: int,
+    capacity: int,
+    n: int = 0,
+) -> Optional[str]:
+    """
+    Codec effettivo per l'occultamento
+
+    Returns:
+        None senza compressione, CompressionCodec.DEFAULT se codec
+        è None, quello scelto da choose_codec per CompressionCodec.AUTO;
+        STORED in modalità DIR diventa DEFLATE_STORE, il codec che
+        DirectoryPacker applica davvero
+    """
+    if compression_mode == CompressionMode.NO_ZIP:
+        return None
+    if codec is None:
+        return CompressionCodec.DEFAULT
+    if codec == CompressionCodec.AUTO:
+        codec = choose_codec(file_path, compression_mode, capacity, n)
+    if codec == CompressionCodec.STORED and compression_mode == CompressionMode.DIR:
+        return CompressionCodec.DEFLATE_STORE
+    return codec
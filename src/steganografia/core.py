@@ -4,18 +4,20 @@ API principale per le operazioni di steganografia
 
 import os
 import sys
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
+import numpy as np
 from PIL import Image
 
 from config.constants import CompressionMode
 
-from .backup import backup_system
+from .backup import current_backup
 from .binary_operations import BinarySteganography
 from .file_utils import _save_image
 from .image_operations import ImageSteganography
+from .member_access import BinaryMembers
 from .string_operations import StringSteganography
 
 # Esporta le costanti per compatibilità
@@ -37,6 +39,21 @@ def get_message(img: Image.Image, backup_file: Optional[str] = None) -> str:
     return StringSteganography.get_message(img, backup_file)
 
 
+def hide_message_array(
+    arr: np.ndarray,
+    message: str,
+    in_place: bool = False,
+    backup_file: Optional[str] = None,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Nasconde una stringa in un array (H, W, C) uint8"""
+    return StringSteganography.hide_message_array(arr, message, in_place, backup_file)
+
+
+def get_message_array(arr: np.ndarray, backup_file: Optional[str] = None) -> str:
+    """Recupera una stringa da un array (H, W, C) uint8"""
+    return StringSteganography.get_message_array(arr, backup_file)
+
+
 # API per le immagini
 def hide_image(
     host_img: Image.Image,
@@ -45,10 +62,12 @@ def hide_image(
     msb: int = 8,
     div: float = 0,
     backup_file: Optional[str] = None,
+    workers: int = 1,
+    header: bool = False,
 ) -> Tuple[Image.Image, int, int, float, int, int]:
     """Nasconde un'immagine in un'altra"""
     return ImageSteganography.hide_image(
-        host_img, secret_img, lsb, msb, div, backup_file
+        host_img, secret_img, lsb, msb, div, backup_file, workers, header
     )
 
 
@@ -61,10 +80,98 @@ def get_image(
     width: Optional[int] = None,
     height: Optional[int] = None,
     backup_file: Optional[str] = None,
+    workers: int = 1,
 ) -> Image.Image:
     """Recupera un'immagine da un'altra"""
     return ImageSteganography.get_image(
-        img, output_path, lsb, msb, div, width, height, backup_file
+        img, output_path, lsb, msb, div, width, height, backup_file, workers
+    )
+
+
+def hide_image_array(
+    host: np.ndarray,
+    secret: np.ndarray,
+    lsb: int = 0,
+    msb: int = 8,
+    div: float = 0,
+    in_place: bool = False,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+    header: bool = False,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Nasconde un array immagine (H, W, 3) in un altro"""
+    return ImageSteganography.hide_image_array(
+        host, secret, lsb, msb, div, in_place, backup_file, workers, header
+    )
+
+
+def get_image_array(
+    arr: np.ndarray,
+    lsb: Optional[int] = None,
+    msb: Optional[int] = None,
+    div: Optional[float] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+) -> np.ndarray:
+    """Recupera un array immagine (height, width, 3) da un altro"""
+    return ImageSteganography.get_image_array(
+        arr, lsb, msb, div, width, height, backup_file, workers
+    )
+
+
+def hide_image_memmap(
+    host_path: str,
+    secret_img: Image.Image,
+    lsb: int = 0,
+    msb: int = 8,
+    div: float = 0,
+    output_path: Optional[str] = None,
+    raw_shape: Optional[Tuple[int, int, int]] = None,
+    backup_file: Optional[str] = None,
+    band_rows: int = 0,
+    header: bool = False,
+) -> Dict[str, Any]:
+    """Nasconde un'immagine in un host PPM/BMP/raw elaborato a bande"""
+    return ImageSteganography.hide_image_memmap(
+        host_path,
+        secret_img,
+        lsb,
+        msb,
+        div,
+        output_path,
+        raw_shape,
+        backup_file,
+        band_rows,
+        header,
+    )
+
+
+def get_image_memmap(
+    host_path: str,
+    output_path: str,
+    lsb: Optional[int] = None,
+    msb: Optional[int] = None,
+    div: Optional[float] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    raw_shape: Optional[Tuple[int, int, int]] = None,
+    backup_file: Optional[str] = None,
+    band_rows: int = 0,
+) -> Image.Image:
+    """Recupera un'immagine da un host PPM/BMP/raw letto a bande"""
+    return ImageSteganography.get_image_memmap(
+        host_path,
+        output_path,
+        lsb,
+        msb,
+        div,
+        width,
+        height,
+        raw_shape,
+        backup_file,
+        band_rows,
     )
 
 
@@ -76,10 +183,21 @@ def hide_bin_file(
     n: int = 0,
     div: float = 0,
     backup_file: Optional[str] = None,
+    workers: int = 1,
+    header: bool = False,
+    codec: Optional[str] = None,
 ) -> Tuple[Image.Image, int, float, int]:
     """Nasconde un file binario in un'immagine"""
     return BinarySteganography.hide_binary_file(
-        img, file_path, compression_mode, n, div, backup_file
+        img,
+        file_path,
+        compression_mode,
+        n,
+        div,
+        backup_file,
+        workers,
+        header,
+        codec,
     )
 
 
@@ -91,22 +209,212 @@ def get_bin_file(
     div: Optional[float] = None,
     size: Optional[int] = None,
     backup_file: Optional[str] = None,
+    workers: int = 1,
 ) -> None:
     """Recupera un file binario da un'immagine"""
     BinarySteganography.get_binary_file(
-        img, output_path, compression_mode, n, div, size, backup_file
+        img,
+        output_path,
+        compression_mode,
+        n,
+        div,
+        size,
+        backup_file,
+        workers,
+    )
+
+
+def hide_bin_file_array(
+    arr: np.ndarray,
+    file_path: str,
+    compression_mode: int = NO_ZIP,
+    n: int = 0,
+    div: float = 0,
+    in_place: bool = False,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+    header: bool = False,
+    codec: Optional[str] = None,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Nasconde un file binario in un array (H, W, C) uint8"""
+    return BinarySteganography.hide_binary_file_array(
+        arr,
+        file_path,
+        compression_mode,
+        n,
+        div,
+        in_place,
+        backup_file,
+        workers,
+        header,
+        codec,
+    )
+
+
+def get_bin_file_array(
+    arr: np.ndarray,
+    output_path: str,
+    compression_mode: Optional[int] = None,
+    n: Optional[int] = None,
+    div: Optional[float] = None,
+    size: Optional[int] = None,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+) -> None:
+    """Recupera un file binario da un array (H, W, C) uint8"""
+    BinarySteganography.get_binary_file_array(
+        arr, output_path, compression_mode, n, div, size, backup_file, workers
+    )
+
+
+def hide_bin_file_memmap(
+    host_path: str,
+    file_path: str,
+    compression_mode: int = NO_ZIP,
+    n: int = 0,
+    div: float = 0,
+    output_path: Optional[str] = None,
+    raw_shape: Optional[Tuple[int, int, int]] = None,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+    header: bool = False,
+    codec: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Nasconde un file binario in un host PPM/BMP/raw mappato in memoria"""
+    return BinarySteganography.hide_binary_file_memmap(
+        host_path,
+        file_path,
+        compression_mode,
+        n,
+        div,
+        output_path,
+        raw_shape,
+        backup_file,
+        workers,
+        header,
+        codec,
+    )
+
+
+def get_bin_file_memmap(
+    host_path: str,
+    output_path: str,
+    compression_mode: Optional[int] = None,
+    n: Optional[int] = None,
+    div: Optional[float] = None,
+    size: Optional[int] = None,
+    raw_shape: Optional[Tuple[int, int, int]] = None,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+) -> None:
+    """Recupera un file binario da un host PPM/BMP/raw mappato in memoria"""
+    BinarySteganography.get_binary_file_memmap(
+        host_path,
+        output_path,
+        compression_mode,
+        n,
+        div,
+        size,
+        raw_shape,
+        backup_file,
+        workers,
+    )
+
+
+def list_bin_members(
+    img: Image.Image,
+    compression_mode: Optional[int] = None,
+    n: Optional[int] = None,
+    div: Optional[float] = None,
+    size: Optional[int] = None,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+) -> List[str]:
+    """Elenca i file dell'archivio nascosto in un'immagine"""
+    return BinaryMembers.list_binary_members(
+        img, compression_mode, n, div, size, backup_file, workers
+    )
+
+
+def get_bin_member(
+    img: Image.Image,
+    member: str,
+    output_path: str,
+    compression_mode: Optional[int] = None,
+    n: Optional[int] = None,
+    div: Optional[float] = None,
+    size: Optional[int] = None,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+) -> None:
+    """Recupera un solo file dall'archivio nascosto in un'immagine"""
+    BinaryMembers.get_binary_member(
+        img, member, output_path, compression_mode, n, div, size, backup_file, workers
+    )
+
+
+def list_bin_members_memmap(
+    host_path: str,
+    compression_mode: Optional[int] = None,
+    n: Optional[int] = None,
+    div: Optional[float] = None,
+    size: Optional[int] = None,
+    raw_shape: Optional[Tuple[int, int, int]] = None,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+) -> List[str]:
+    """Elenca i file dell'archivio nascosto in un host PPM/BMP/raw mappato in memoria"""
+    return BinaryMembers.list_binary_members_memmap(
+        host_path, compression_mode, n, div, size, raw_shape, backup_file, workers
+    )
+
+
+def get_bin_member_memmap(
+    host_path: str,
+    member: str,
+    output_path: str,
+    compression_mode: Optional[int] = None,
+    n: Optional[int] = None,
+    div: Optional[float] = None,
+    size: Optional[int] = None,
+    raw_shape: Optional[Tuple[int, int, int]] = None,
+    backup_file: Optional[str] = None,
+    workers: int = 1,
+) -> None:
+    """Recupera un solo file dall'archivio nascosto in un host mappato in memoria"""
+    BinaryMembers.get_binary_member_memmap(
+        host_path,
+        member,
+        output_path,
+        compression_mode,
+        n,
+        div,
+        size,
+        raw_shape,
+        backup_file,
+        workers,
     )
 
 
 # API per il backup
 def load_backup_data(backup_file: str):
     """Carica i parametri da un file di backup"""
-    return backup_system.load_backup_data(backup_file)
+    return current_backup().load_backup_data(backup_file)
+
+
+def load_backup_records(backup_file: str):
+    """Carica tutti i record di parametri da un file di backup"""
+    return current_backup().load_backup_records(backup_file)
+
+
+def migrate_backup_file(backup_file: str, output_file: Optional[str] = None) -> int:
+    """Converte un vecchio backup pickle nel formato JSON lines"""
+    return current_backup().migrate_backup_file(backup_file, output_file)
 
 
 def get_last_params(data_type: str):
     """Ottiene gli ultimi parametri usati"""
-    return backup_system.get_last_params(data_type)
+    return current_backup().get_last_params(data_type)
 
 
 def save_image(img: Image.Image, file_path: str) -> bool:
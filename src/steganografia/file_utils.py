@@ -7,60 +7,85 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
+import shutil
+import tempfile
 import zipfile
-from os import remove, walk
-from os.path import exists, getsize, join, relpath
+from contextlib import contextmanager
+from os import SEEK_END
+from os.path import getsize
+from typing import BinaryIO, Iterator, Optional, Tuple
 
-from config.constants import CompressionMode
+from config.constants import CompressionCodec, CompressionMode, StreamingConfig
 
+from .archive import DirectoryPacker
+from .compression import zip_method
 
-def find_div(dim: int, file_path: str, n: int) -> float:
-    """Calcola il valore di divisione per la distribuzione dei bit"""
-    image_dim = dim * n
-    div = (image_dim - n) / (getsize(file_path) * 8)
-    return div
 
-
-def zip_directory(path: str, ziph: zipfile.ZipFile) -> None:
-    """Comprime una directory"""
-    for root, _, files in walk(path):
-        for file in files:
-            file_path = join(root, file)
-            arcname = relpath(file_path, path)
-            ziph.write(file_path, arcname)
-
-
-def compress_file(file_path: str, compression_mode: int) -> str:
+def write_archive(
+    target: BinaryIO,
+    file_path: str,
+    compression_mode: int,
+    codec: Optional[str] = None,
+) -> None:
     """
-    Comprime un file o directory secondo la modalità specificata
+    Scrive l'archivio zip di un file (FILE) o di una directory (DIR)
 
     Args:
+        target: File binario aperto in scrittura
         file_path: Percorso del file o directory da comprimere
-        compression_mode: Modalità di compressione (NO_ZIP, FILE, DIR)
-
-    Returns:
-        Percorso del file risultante (originale o compresso)
+        compression_mode: CompressionMode.FILE o CompressionMode.DIR
+        codec: Codec di compressione (None = CompressionCodec.DEFAULT)
     """
-    if compression_mode == CompressionMode.NO_ZIP:
-        return file_path
+    compress_type, compresslevel = zip_method(codec or CompressionCodec.DEFAULT)
     if compression_mode == CompressionMode.FILE:
         print("Compressione file...")
-        with zipfile.ZipFile("tmp.zip", "w") as zf:
-            zf.write(file_path)
+        with zipfile.ZipFile(
+            target, "w", compress_type, compresslevel=compresslevel
+        ) as zf:
+            # Solo il nome: il recupero scrive il contenuto in output_path
+            zf.write(file_path, os.path.basename(file_path))
         print("File compresso")
-        return "tmp.zip"
+        return
 
+    # La directory viene compressa file per file durante la visita
     print("Compressione directory...")
-    with zipfile.ZipFile("tmp.zip", "w", zipfile.ZIP_DEFLATED) as zipf:
-        zip_directory(file_path, zipf)
+    shutil.copyfileobj(
+        DirectoryPacker(file_path, compress_type, compresslevel),
+        target,
+        StreamingConfig.CHUNK_SIZE,
+    )
     print("Directory compressa")
-    return "tmp.zip"
 
 
-def cleanup_temp_files() -> None:
-    """Rimuove i file temporanei di compressione"""
-    if exists("tmp.zip"):
-        remove("tmp.zip")
+@contextmanager
+def open_payload(
+    file_path: str, compression_mode: int, codec: Optional[str] = None
+) -> Iterator[Tuple[BinaryIO, int]]:
+    """
+    Apre il payload da nascondere come stream, già compresso se richiesto
+
+    L'archivio viene scritto in un buffer in memoria (su disco solo oltre
+    StreamingConfig.SPOOL_SIZE byte), così la dimensione è nota prima
+    dell'occultamento e il payload non viene riletto da un file temporaneo.
+
+    Args:
+        file_path: Percorso del file o directory da nascondere
+        compression_mode: Modalità di compressione (NO_ZIP, FILE, DIR)
+        codec: Codec di compressione (None = CompressionCodec.DEFAULT)
+
+    Returns:
+        Context manager che restituisce (stream posizionato all'inizio, byte)
+    """
+    if compression_mode == CompressionMode.NO_ZIP:
+        with open(file_path, "rb") as f:
+            yield f, getsize(file_path)
+        return
+
+    with tempfile.SpooledTemporaryFile(max_size=StreamingConfig.SPOOL_SIZE) as buffer:
+        write_archive(buffer, file_path, compression_mode, codec)
+        size = buffer.seek(0, SEEK_END)
+        buffer.seek(0)
+        yield buffer, size
 
 
 def _save_image(img, file_path: str) -> bool:
@@ -0,0 +1,135 @@
+"""
+Intestazione dei parametri nascosta nell'immagine host
+
+L'intestazione occupa l'ultimo bit dei primi HEADER_SAMPLES campioni del buffer
+piatto, quindi si legge senza conoscere lsb/n; il payload viene scritto subito
+dopo. Contiene tutti i parametri necessari al recupero, protetti da un CRC32.
+
+Formato (big endian):
+    magic "SQ" | versione | modalità | lsb o n | msb | zipMode | codec |
+    div (float64) | size (uint64) | width | height (uint32) | CRC32
+
+Il codec è la posizione in CompressionCodec.ALL più uno (0 = non indicato).
+"""
+
+import os
+import struct
+import sys
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+
+from config.constants import CompressionCodec, DataType
+
+from .bit_operations import get_low_bits, set_low_bits
+
+HEADER_MAGIC = b"SQ"
+HEADER_VERSION = 1
+
+_FIELDS = struct.Struct(">2sBBBBBBdQII")
+_CRC = struct.Struct(">I")
+HEADER_SIZE = _FIELDS.size + _CRC.size
+# Campioni riservati all'intestazione (un bit per campione)
+HEADER_SAMPLES = HEADER_SIZE * 8
+
+_MODES = {DataType.IMAGE: 1, DataType.BINARY: 2}
+
+
+def pack_header(data_type: str, params: Dict[str, Any]) -> bytes:
+    """Serializza i parametri di recupero nell'intestazione binaria"""
+    codec = 0
+    if data_type == DataType.IMAGE:
+        fields = (params["lsb"], params["msb"], 0, 0)
+        dims = (params["width"], params["height"])
+    else:
+        fields = (params["n"], 0, params["zipMode"], params["size"])
+        dims = (0, 0)
+        if params.get("codec") in CompressionCodec.ALL:
+            codec = CompressionCodec.ALL.index(params["codec"]) + 1
+
+    body = _FIELDS.pack(
+        HEADER_MAGIC,
+        HEADER_VERSION,
+        _MODES[data_type],
+        fields[0],
+        fields[1],
+        fields[2],
+        codec,
+        float(params["div"]),
+        fields[3],
+        *dims,
+    )
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def unpack_header(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decodifica un'intestazione
+
+    Returns:
+        Dizionario {"type": ..., "params": {...}} come quello dei backup, oppure
+        None se magic, versione o CRC non sono validi
+    """
+    if len(data) < HEADER_SIZE:
+        return None
+    body, crc = data[: _FIELDS.size], data[_FIELDS.size : HEADER_SIZE]
+    if _CRC.unpack(crc)[0] != zlib.crc32(body):
+        return None
+
+    magic, version, mode, bits, msb, zip_mode, codec, div, size, width, height = (
+        _FIELDS.unpack(body)
+    )
+    if magic != HEADER_MAGIC or version != HEADER_VERSION:
+        return None
+
+    if mode == _MODES[DataType.IMAGE]:
+        params = {"lsb": bits, "msb": msb, "div": div, "width": width, "height": height}
+        return {"type": DataType.IMAGE, "params": params}
+    if mode == _MODES[DataType.BINARY]:
+        params = {"n": bits, "div": div, "size": size, "zipMode": zip_mode}
+        if 0 < codec <= len(CompressionCodec.ALL):
+            params["codec"] = CompressionCodec.ALL[codec - 1]
+        return {"type": DataType.BINARY, "params": params}
+    return None
+
+
+def write_header(
+    buffer: np.ndarray,
+    data_type: str,
+    params: Dict[str, Any],
+    index_map: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> None:
+    """Scrive l'intestazione nell'ultimo bit dei primi HEADER_SAMPLES campioni"""
+    bits = np.unpackbits(np.frombuffer(pack_header(data_type, params), np.uint8))
+    indices = np.arange(HEADER_SAMPLES, dtype=np.int64)
+    if index_map is not None:
+        indices = index_map(indices)
+    set_low_bits(buffer, indices, bits, 1)
+
+
+def read_header(
+    buffer: np.ndarray,
+    data_type: str,
+    index_map: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Legge l'intestazione dai primi HEADER_SAMPLES campioni
+
+    Returns:
+        Dati come in unpack_header se l'intestazione è valida e del tipo
+        richiesto, altrimenti None
+    """
+    if len(buffer) < HEADER_SAMPLES:
+        return None
+    indices = np.arange(HEADER_SAMPLES, dtype=np.int64)
+    if index_map is not None:
+        indices = index_map(indices)
+    data = np.packbits(get_low_bits(buffer, indices, 1)).tobytes()
+
+    header = unpack_header(data)
+    if header is None or header["type"] != data_type:
+        return None
+    return header
@@ -3,8 +3,11 @@ Operazioni di steganografia per le immagini
 """
 
 import os
+import shutil
 import sys
-from typing import Optional, Tuple
+import zlib
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
@@ -13,8 +16,21 @@ from PIL import Image
 
 from config.constants import DataType, ErrorMessages
 
-from .backup import backup_system
-from .bit_operations import set_last_n_bits
+from .backup import current_backup
+from .bit_operations import group_targets, regroup_bits
+from .buffers import array_to_image, flat_view, image_to_array
+from .capacity import CapacityPlanner
+from .header import HEADER_SAMPLES, read_header, write_header
+from .memmap_host import MemmapHost, open_memmap_host
+from .parallel import gather_low_bits, scatter_low_bits
+from .param_index import array_key, memmap_key
+from .tiles import (
+    GroupCursor,
+    SecretImageSink,
+    SecretImageSource,
+    embed_bands,
+    extract_bands,
+)
 from .validator import ParameterValidator
 
 
@@ -29,6 +45,8 @@ class ImageSteganography:
         msb: int = 8,
         div: float = 0,
         backup_file: Optional[str] = None,
+        workers: int = 1,
+        header: bool = False,
     ) -> Tuple[Image.Image, int, int, float, int, int]:
         """
         Nasconde un'immagine in un'altra
@@ -40,102 +58,256 @@ class ImageSteganography:
             msb: Numero di bit più significativi di secret_img da nascondere
             div: Divisore per la distribuzione
             backup_file: File dove salvare i parametri
+            workers: Thread usati per scrivere i gruppi di bit; il risultato è
+                identico a quello sequenziale
+            header: Se True scrive i parametri in un'intestazione nei primi
+                campioni dell'host, così il recupero non richiede backup
 
         Returns:
             Tupla con (immagine_risultato, lsb_finale, msb_finale, div_finale, width, height)
         """
-        # Validazione parametri
-        ParameterValidator.validate_lsb(lsb)
-        ParameterValidator.validate_msb(msb)
-        ParameterValidator.validate_lsb_msb_relationship(lsb, msb)
-
-        # Determina LSB automatico se necessario
-        if lsb == 0:
-            lsb = 1
-            while (lsb * host_img.width * host_img.height * 3) < (
-                msb * secret_img.width * secret_img.height * 3
-            ):
-                lsb += 1
-                if lsb > 8:
-                    raise ValueError(
-                        ErrorMessages.IMAGE_TOO_SMALL_IMAGE.format(
-                            host_width=host_img.width,
-                            host_height=host_img.height,
-                            secret_width=secret_img.width,
-                            secret_height=secret_img.height,
-                        )
-                    )
-
-        # Verifica dimensioni
-        ParameterValidator.validate_image_size_for_image(host_img, secret_img, lsb, msb)
-
         # Converte immagini in RGB
         if host_img.mode != "RGB":
             host_img = host_img.convert("RGB")
         if secret_img.mode != "RGB":
             secret_img = secret_img.convert("RGB")
 
+        # Un solo buffer modificabile per l'host; secret_img viene solo letta
+        host_pixels = image_to_array(host_img, writable=True)
+        _, params = ImageSteganography.hide_image_array(
+            host_pixels,
+            image_to_array(secret_img),
+            lsb,
+            msb,
+            div,
+            in_place=True,
+            backup_file=backup_file,
+            workers=workers,
+            header=header,
+        )
+
+        result_img = array_to_image(host_pixels)
+        return (
+            result_img,
+            params["lsb"],
+            params["msb"],
+            params["div"],
+            params["width"],
+            params["height"],
+        )
+
+    @staticmethod
+    def hide_image_array(
+        host: np.ndarray,
+        secret: np.ndarray,
+        lsb: int = 0,
+        msb: int = 8,
+        div: float = 0,
+        in_place: bool = False,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+        header: bool = False,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Nasconde un'immagine in un'altra lavorando direttamente su array NumPy
+
+        Args:
+            host: Array (H, W, 3) uint8 che nasconde
+            secret: Array (H, W, 3) uint8 da nascondere
+            lsb, msb, div, workers, header: Parametri come in hide_image
+            in_place: Se True modifica host direttamente, altrimenti ne usa una copia
+            backup_file: File dove salvare i parametri
+
+        Returns:
+            Tupla con (array_risultato, parametri) dove i parametri contengono anche
+            capacity_bits e payload_bits
+        """
+        # Validazione parametri
+        ParameterValidator.validate_pixel_array(host, (3,))
+        ParameterValidator.validate_pixel_array(secret, (3,))
+        ParameterValidator.validate_workers(workers)
+
+        host_height, host_width = host.shape[:2]
+        secret_height, secret_width = secret.shape[:2]
+        reserved = HEADER_SAMPLES if header else 0
+        lsb, div = ImageSteganography._plan_hide(
+            (host_width, host_height),
+            (secret_width, secret_height),
+            lsb,
+            msb,
+            div,
+            reserved,
+        )
+
+        if in_place:
+            ParameterValidator.validate_writable_array(host)
+        else:
+            host = host.copy()
+
         # Inizia a nascondere l'immagine
         print("Nascondendo immagine...")
-        arr1 = np.array(host_img).flatten().copy()
-        arr2 = np.array(secret_img).flatten().copy()
+        arr1 = flat_view(host)
+        arr2 = flat_view(np.ascontiguousarray(secret))
+
+        # Algoritmo per nascondere l'immagine: i msb bit più significativi di ogni
+        # canale di secret formano un flusso che viene diviso in gruppi di lsb bit
+        # (l'ultimo gruppo è completato con zeri a destra)
+        chunks = regroup_bits(arr2 >> (8 - msb), msb, lsb)
+
+        # Il gruppo k finisce in int(pos_k), con pos_k accumulata sommando div,
+        # dopo gli eventuali campioni dell'intestazione
+        payload = arr1[reserved:]
+        scatter_low_bits(
+            payload,
+            chunks,
+            lsb,
+            partial(group_targets, div, rounding=np.floor, limit=len(payload)),
+            workers,
+        )
 
-        if div == 0:
-            div = (len(arr1) * lsb) / (len(arr2) * msb)
-        else:
-            ParameterValidator.validate_div_for_images(
-                div, len(arr1), len(arr2), lsb, msb
-            )
+        metadata = ImageSteganography._finish_hide(
+            (host_width, host_height),
+            (secret_width, secret_height),
+            lsb,
+            msb,
+            div,
+            backup_file,
+        )
+        if header:
+            write_header(arr1, DataType.IMAGE, metadata)
+        current_backup().index_params(
+            DataType.IMAGE,
+            dict(metadata, crc=ImageSteganography._secret_crc(arr2, msb)),
+            partial(array_key, host),
+        )
+        return host, metadata
 
-        # Algoritmo per nascondere l'immagine
-        pos_in_img1 = 0.0
-        bit_buffer = ""
-
-        for i in range(0, len(arr2), 3):  # Processa ogni pixel di secret_img (RGB)
-            if i + 2 >= len(arr2):
-                break
-
-            # Estrai i bit più significativi da ogni canale di secret_img
-            r_bits = format(arr2[i], "08b")[:msb]
-            g_bits = format(arr2[i + 1], "08b")[:msb]
-            b_bits = format(arr2[i + 2], "08b")[:msb]
-
-            # Aggiungi tutti i bit al buffer
-            bit_buffer += r_bits + g_bits + b_bits
-
-            # Inserisci i bit in host_img quando ne abbiamo abbastanza
-            while len(bit_buffer) >= lsb and pos_in_img1 < len(arr1):
-                # Prendi lsb bit dal buffer
-                bits_to_hide = bit_buffer[:lsb]
-                bit_buffer = bit_buffer[lsb:]
-
-                # Nascondili nel pixel corrente di host_img
-                pixel_pos = int(pos_in_img1)
-                if pixel_pos < len(arr1):
-                    arr1[pixel_pos] = set_last_n_bits(
-                        arr1[pixel_pos], bits_to_hide, lsb
-                    )
+    @staticmethod
+    def hide_image_memmap(
+        host_path: str,
+        secret_img: Image.Image,
+        lsb: int = 0,
+        msb: int = 8,
+        div: float = 0,
+        output_path: Optional[str] = None,
+        raw_shape: Optional[Tuple[int, int, int]] = None,
+        backup_file: Optional[str] = None,
+        band_rows: int = 0,
+        header: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Nasconde un'immagine in un host RGB non compresso (PPM, BMP o raw)
+        elaborandolo a bande: oltre all'immagine segreta resta in memoria solo
+        una banda dell'host, qualunque sia la sua dimensione
 
-                # Avanza nella posizione di host_img
-                pos_in_img1 += div
+        Args:
+            host_path: File host da modificare
+            secret_img: Immagine da nascondere
+            lsb, msb, div, header: Parametri come in hide_image
+            output_path: Se indicato, l'host viene prima copiato qui e si modifica
+                la copia; altrimenti host_path viene modificato sul posto
+            raw_shape: (height, width, 3) se host_path è un file raw
+            backup_file: File dove salvare i parametri
+            band_rows: Righe dell'host per banda (0 = StreamingConfig.BAND_ROWS)
 
-        # Gestisci eventuali bit rimanenti nel buffer
-        if bit_buffer and pos_in_img1 < len(arr1):
-            # Padda i bit rimanenti con zeri a destra per raggiungere lsb bit
-            while len(bit_buffer) < lsb:
-                bit_buffer += "0"
+        Returns:
+            Parametri dell'occultamento, con capacity_bits, payload_bits e host_path
+        """
+        if secret_img.mode != "RGB":
+            secret_img = secret_img.convert("RGB")
+        if output_path is not None:
+            shutil.copyfile(host_path, output_path)
+            host_path = output_path
+        host = open_memmap_host(host_path, raw_shape, writable=True)
+        ImageSteganography._check_memmap_host(host)
+
+        host_size = (host.width, host.height)
+        reserved = HEADER_SAMPLES if header else 0
+        lsb, div = ImageSteganography._plan_hide(
+            host_size, secret_img.size, lsb, msb, div, reserved
+        )
+
+        print("Nascondendo immagine a bande nell'host mappato in memoria...")
+        secret = flat_view(image_to_array(secret_img))
+        embed_bands(
+            host,
+            GroupCursor(div, -(-len(secret) * msb // lsb), np.floor, reserved),
+            SecretImageSource(secret, msb, lsb),
+            band_rows,
+        )
+
+        metadata = ImageSteganography._finish_hide(
+            host_size, secret_img.size, lsb, msb, div, backup_file
+        )
+        if header:
+            write_header(host.buffer, DataType.IMAGE, metadata, host.translate)
+        host.flush()
+        current_backup().index_params(
+            DataType.IMAGE,
+            dict(metadata, crc=ImageSteganography._secret_crc(secret, msb)),
+            partial(memmap_key, host),
+        )
+        return dict(metadata, host_path=host_path)
 
-            pixel_pos = int(pos_in_img1)
-            if pixel_pos < len(arr1):
-                arr1[pixel_pos] = set_last_n_bits(
-                    arr1[pixel_pos], bit_buffer[:lsb], lsb
+    @staticmethod
+    def _check_memmap_host(host: MemmapHost) -> None:
+        """Verifica che l'host mappato sia RGB, come richiesto per le immagini"""
+        if host.channels != 3:
+            raise ValueError(
+                ErrorMessages.UNSUPPORTED_HOST_FORMAT.format(
+                    reason="per le immagini l'host deve avere 3 canali"
                 )
+            )
+
+    @staticmethod
+    def _plan_hide(
+        host_size: Tuple[int, int],
+        secret_size: Tuple[int, int],
+        lsb: int,
+        msb: int,
+        div: float,
+        reserved: int = 0,
+    ) -> Tuple[int, float]:
+        """
+        Valida i parametri e calcola lsb e div automatici se richiesti;
+        reserved è il numero di campioni iniziali dell'host riservati all'intestazione
+        """
+        ParameterValidator.validate_lsb(lsb)
+        ParameterValidator.validate_msb(msb)
+        ParameterValidator.validate_lsb_msb_relationship(lsb, msb)
+
+        # lsb minimo in forma chiusa (e verifica della capacità)
+        plan = CapacityPlanner.plan_image(host_size, secret_size, msb, lsb, reserved)
+        lsb = plan["lsb"]
+
+        if div == 0:
+            div = plan["div"]
+        else:
+            ParameterValidator.validate_div_for_images(
+                div,
+                CapacityPlanner.image_samples(*host_size, reserved),
+                secret_size[0] * secret_size[1] * 3,
+                lsb,
+                msb,
+            )
+        return lsb, div
+
+    @staticmethod
+    def _finish_hide(
+        host_size: Tuple[int, int],
+        secret_size: Tuple[int, int],
+        lsb: int,
+        msb: int,
+        div: float,
+        backup_file: Optional[str],
+    ) -> Dict[str, Any]:
+        """Stampa il riepilogo, salva i parametri e restituisce i metadati"""
+        host_width, host_height = host_size
+        secret_width, secret_height = secret_size
 
-        # Crea immagine risultato
-        w, h = secret_img.width, secret_img.height
         percentage = format(
-            (msb * secret_img.width * secret_img.height * 3)
-            / (lsb * host_img.width * host_img.height * 3)
+            (msb * secret_width * secret_height * 3)
+            / (lsb * host_width * host_height * 3)
             * 100,
             ".2f",
         )
@@ -143,22 +315,24 @@ class ImageSteganography:
             f"TERMINATO - Percentuale di pixel usati con lsb={lsb}, msb={msb} e div={div:.2f}: {percentage}%"
         )
 
-        result_img = Image.fromarray(arr1.reshape(host_img.height, host_img.width, 3))
-
         # Salva i parametri per il recupero
         params = {
             "lsb": lsb,
             "msb": msb,
             "div": div,
-            "width": w,
-            "height": h,
+            "width": secret_width,
+            "height": secret_height,
             "method": "image",
-            "original_img1_size": (host_img.width, host_img.height),
-            "original_img2_size": (secret_img.width, secret_img.height),
+            "original_img1_size": host_size,
+            "original_img2_size": secret_size,
         }
-        backup_system.save_backup_data(DataType.IMAGE, params, backup_file)
+        current_backup().save_backup_data(DataType.IMAGE, params, backup_file)
 
-        return (result_img, lsb, msb, div, w, h)
+        return dict(
+            params,
+            capacity_bits=host_width * host_height * 3 * lsb,
+            payload_bits=secret_width * secret_height * 3 * msb,
+        )
 
     @staticmethod
     def get_image(
@@ -170,6 +344,7 @@ class ImageSteganography:
         width: Optional[int] = None,
         height: Optional[int] = None,
         backup_file: Optional[str] = None,
+        workers: int = 1,
     ) -> Image.Image:
         """
         Recupera un'immagine nascosta da un'altra
@@ -179,24 +354,282 @@ class ImageSteganography:
             output_path: Percorso dove salvare l'immagine recuperata
             lsb, msb, div, width, height: Parametri per il recupero
             backup_file: File di backup dei parametri
+            workers: Thread usati per leggere i gruppi di bit
+
+        Se l'immagine contiene l'intestazione scritta con header=True, i parametri
+        mancanti vengono letti da lì senza consultare i backup; altrimenti si
+        cercano in backup_file, poi nell'indice dei parametri, se attivo, e
+        infine tra quelli dell'ultimo occultamento.
+
+        Returns:
+            Immagine recuperata
+        """
+        ParameterValidator.validate_workers(workers)
+        res = ImageSteganography._extract_image(
+            image_to_array(img),
+            lsb,
+            msb,
+            div,
+            width,
+            height,
+            backup_file,
+            workers,
+        )
+        return ImageSteganography._save_recovered(res, output_path)
+
+    @staticmethod
+    def get_image_memmap(
+        host_path: str,
+        output_path: str,
+        lsb: Optional[int] = None,
+        msb: Optional[int] = None,
+        div: Optional[float] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        raw_shape: Optional[Tuple[int, int, int]] = None,
+        backup_file: Optional[str] = None,
+        band_rows: int = 0,
+    ) -> Image.Image:
+        """
+        Recupera un'immagine nascosta in un host RGB non compresso (PPM, BMP o
+        raw) leggendolo a bande; le bande senza gruppi non vengono lette
+
+        Args:
+            host_path: File host che contiene l'immagine nascosta
+            output_path: Percorso dove salvare l'immagine recuperata
+            lsb, msb, div, width, height: Parametri per il recupero
+            raw_shape: (height, width, 3) se host_path è un file raw
+            backup_file: File di backup dei parametri
+            band_rows: Righe dell'host per banda (0 = StreamingConfig.BAND_ROWS)
 
         Returns:
             Immagine recuperata
         """
+        host = open_memmap_host(host_path, raw_shape)
+        ImageSteganography._check_memmap_host(host)
+        header_data = read_header(host.buffer, DataType.IMAGE, host.translate)
+        reserved = HEADER_SAMPLES if header_data else 0
+        read = partial(ImageSteganography._read_bands, host, reserved, band_rows)
+        lsb, msb, div, width, height = ImageSteganography._resolve_params(
+            lsb,
+            msb,
+            div,
+            width,
+            height,
+            backup_file,
+            header_data,
+            partial(memmap_key, host),
+            read,
+        )
+        return ImageSteganography._save_recovered(
+            read(lsb, msb, div, width, height), output_path
+        )
+
+    @staticmethod
+    def _read_bands(
+        host: MemmapHost,
+        reserved: int,
+        band_rows: int,
+        lsb: int,
+        msb: int,
+        div: float,
+        width: int,
+        height: int,
+    ) -> np.ndarray:
+        """Legge a bande i pixel dell'immagine nascosta nell'host mappato"""
+        size = width * height * 3
+        sink = SecretImageSink(size, msb, lsb)
+        extract_bands(
+            host,
+            GroupCursor(div, -(-size * msb // lsb), np.floor, reserved),
+            sink,
+            band_rows,
+        )
+        return sink.res.reshape((height, width, 3))
+
+    @staticmethod
+    def _save_recovered(res: np.ndarray, output_path: str) -> Image.Image:
+        """Converte i pixel recuperati in immagine e la salva in output_path"""
+        try:
+            res_img = array_to_image(res)
+            res_img.save(output_path)
+            print(f"IMMAGINE TROVATA - Immagine salvata come {output_path}")
+            return res_img
+        except Exception as e:
+            raise ValueError(
+                ErrorMessages.IMAGE_RECONSTRUCTION_FAILED.format(error=str(e))
+            )
+
+    @staticmethod
+    def get_image_array(
+        arr: np.ndarray,
+        lsb: Optional[int] = None,
+        msb: Optional[int] = None,
+        div: Optional[float] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+    ) -> np.ndarray:
+        """
+        Recupera un'immagine nascosta da un array NumPy
+
+        Args:
+            arr: Array (H, W, 3) uint8 che contiene l'immagine nascosta
+            lsb, msb, div, width, height: Parametri per il recupero
+            backup_file: File di backup dei parametri
+            workers: Thread usati per leggere i gruppi di bit
+
+        Returns:
+            Array (height, width, 3) dell'immagine recuperata
+        """
+        ParameterValidator.validate_pixel_array(arr, (3,))
+        ParameterValidator.validate_workers(workers)
+        return ImageSteganography._extract_image(
+            np.ascontiguousarray(arr),
+            lsb,
+            msb,
+            div,
+            width,
+            height,
+            backup_file,
+            workers,
+        )
+
+    @staticmethod
+    def _extract_image(
+        pixels: np.ndarray,
+        lsb: Optional[int],
+        msb: Optional[int],
+        div: Optional[float],
+        width: Optional[int],
+        height: Optional[int],
+        backup_file: Optional[str],
+        workers: int = 1,
+    ) -> np.ndarray:
+        """Recupera i pixel dell'immagine nascosta da un array (H, W, 3) contiguo"""
+        arr = flat_view(pixels)
+        header_data = read_header(arr, DataType.IMAGE)
+        if header_data:
+            arr = arr[HEADER_SAMPLES:]
+        read = partial(ImageSteganography._read_pixels, arr, workers=workers)
+        lsb, msb, div, width, height = ImageSteganography._resolve_params(
+            lsb,
+            msb,
+            div,
+            width,
+            height,
+            backup_file,
+            header_data,
+            partial(array_key, pixels),
+            read,
+        )
+        return read(lsb, msb, div, width, height)
+
+    @staticmethod
+    def _read_pixels(
+        arr: np.ndarray,
+        lsb: int,
+        msb: int,
+        div: float,
+        width: int,
+        height: int,
+        workers: int = 1,
+    ) -> np.ndarray:
+        """Legge i pixel dell'immagine nascosta dai campioni arr"""
+        # Recupera immagine
+        size = width * height * 3
+        res = np.zeros(size, dtype=np.uint8)
+
+        # Algoritmo per estrarre l'immagine: legge i campioni nelle stesse
+        # posizioni int(pos_k) usate per nasconderla
+        samples_needed = -(-size * msb // lsb)
+        samples = gather_low_bits(
+            arr,
+            samples_needed,
+            lsb,
+            partial(group_targets, div, rounding=np.floor, limit=len(arr)),
+            workers,
+        )
+        valid = len(samples)
+
+        # Raggruppa gli lsb bit estratti in pixel da msb bit allineati a sinistra
+        pixels_written = min(size, valid * lsb // msb)
+        pixels = regroup_bits(samples, lsb, msb)[:pixels_written]
+        res[:pixels_written] = pixels << (8 - msb)
+
+        return res.reshape((height, width, 3))
+
+    @staticmethod
+    def _secret_crc(secret: np.ndarray, msb: int) -> int:
+        """CRC-32 dei pixel recuperabili, cioè dei soli msb bit nascosti"""
+        mask = np.uint8((0xFF << (8 - msb)) & 0xFF)
+        return zlib.crc32(np.ascontiguousarray(secret & mask))
+
+    @staticmethod
+    def _pixels_match(read: Callable[..., np.ndarray], params: Dict[str, Any]) -> bool:
+        """
+        Verifica che i pixel letti con i parametri params dell'indice abbiano il
+        CRC registrato; i record senza CRC o con parametri non validi per
+        l'host non vengono accettati
+        """
+        names = ("lsb", "msb", "div", "width", "height")
+        if "crc" not in params or any(params.get(name) is None for name in names):
+            return False
+        try:
+            res = read(*(params[name] for name in names))
+        except (ValueError, IndexError):
+            return False
+        return zlib.crc32(res) == params["crc"]
+
+    @staticmethod
+    def _resolve_params(
+        lsb: Optional[int],
+        msb: Optional[int],
+        div: Optional[float],
+        width: Optional[int],
+        height: Optional[int],
+        backup_file: Optional[str],
+        header_data: Optional[Dict[str, Any]] = None,
+        index_key: Optional[Callable[[], str]] = None,
+        read: Optional[Callable[..., np.ndarray]] = None,
+    ) -> Tuple[int, int, float, int, int]:
+        """
+        Completa i parametri di recupero mancanti prendendoli, nell'ordine,
+        dall'intestazione nell'immagine (header_data), da backup_file,
+        dall'indice per l'hash calcolato da index_key e infine dall'ultimo
+        occultamento. Un record dell'indice viene usato solo se i pixel letti con
+        read(lsb, msb, div, width, height) hanno il CRC registrato
+        """
         print("Cercando immagine nascosta...")
 
         # Recupera parametri automaticamente se non forniti
         if any(param is None for param in [lsb, msb, div, width, height]):
-            print("Alcuni parametri mancanti, cercando nei backup...")
-
-            # Controlla se esistono parametri di backup
-            backup_data = None
-            if backup_file:
-                backup_data = backup_system.load_backup_data(backup_file)
+            backup_data = header_data
+            if backup_data:
+                print("Usando parametri dall'intestazione nell'immagine")
+            else:
+                print("Alcuni parametri mancanti, cercando nei backup...")
+
+            # Un file di backup indicato esplicitamente prevale sull'indice
+            if not backup_data and backup_file:
+                backup_data = current_backup().load_backup_data(backup_file)
+
+            # Controlla l'indice dei parametri
+            if not backup_data and index_key is not None:
+                backup_data = current_backup().lookup_params(
+                    DataType.IMAGE,
+                    index_key,
+                    (
+                        None
+                        if read is None
+                        else partial(ImageSteganography._pixels_match, read)
+                    ),
+                )
 
             # Se non ci sono backup file, controlla le variabili locali
             if not backup_data:
-                recent_params = backup_system.get_last_params(DataType.IMAGE)
+                recent_params = current_backup().get_last_params(DataType.IMAGE)
                 if recent_params:
                     print(
                         "Usando parametri dall'ultima operazione di occultamento immagini"
@@ -222,48 +655,4 @@ class ImageSteganography:
         # Assert per il type checker - sappiamo che i parametri non sono None dopo la validazione
         assert lsb is not None and msb is not None and div is not None
         assert width is not None and height is not None
-
-        # Recupera immagine
-        size = width * height * 3
-        arr = np.array(img).flatten().copy()
-        res = np.zeros(size, dtype=np.uint8)
-
-        # Algoritmo per estrarre l'immagine
-        pos_in_img1 = 0.0
-        bit_buffer = ""
-        pixels_written = 0
-
-        while pixels_written < size and pos_in_img1 < len(arr):
-            # Estrai lsb bit dal pixel corrente
-            pixel_pos = int(pos_in_img1)
-            if pixel_pos < len(arr):
-                extracted_bits = format(arr[pixel_pos], "08b")[-lsb:]
-                bit_buffer += extracted_bits
-
-            # Quando abbiamo abbastanza bit, ricostruisci un pixel
-            while len(bit_buffer) >= msb and pixels_written < size:
-                # Prendi msb bit dal buffer
-                pixel_bits = bit_buffer[:msb]
-                bit_buffer = bit_buffer[msb:]
-
-                # Padda a sinistra con zeri per ottenere 8 bit
-                while len(pixel_bits) < 8:
-                    pixel_bits = pixel_bits + "0"
-
-                # Converte in valore pixel e salva
-                res[pixels_written] = int(pixel_bits, 2)
-                pixels_written += 1
-
-            # Avanza nella posizione
-            pos_in_img1 += div
-
-        # Converte il risultato in immagine
-        try:
-            res_img = Image.fromarray(res.reshape((height, width, 3)))
-            res_img.save(output_path)
-            print(f"IMMAGINE TROVATA - Immagine salvata come {output_path}")
-            return res_img
-        except Exception as e:
-            raise ValueError(
-                ErrorMessages.IMAGE_RECONSTRUCTION_FAILED.format(error=str(e))
-            )
+        return lsb, msb, div, width, height
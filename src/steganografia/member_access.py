@@ -0,0 +1,214 @@
+"""
+Accesso al payload binario nascosto senza estrarlo per intero
+
+Le sorgenti di BinarySteganography (image_source e memmap_source) descrivono
+i campioni di un host, immagine PIL o file PPM/BMP/raw mappato in memoria,
+insieme all'eventuale intestazione; da queste PayloadReader legge solo i byte
+richiesti. BinaryMembers apre così l'archivio nascosto (modalità FILE o DIR)
+con zipfile, ne elenca i file e ne recupera uno solo, toccando i campioni
+della directory centrale e quelli del file scelto.
+"""
+
+import os
+import shutil
+import sys
+import zipfile
+import zlib
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from PIL import Image
+
+from config.constants import CompressionMode, ErrorMessages, StreamingConfig
+
+from .binary_operations import BinarySteganography, PayloadSource
+from .payload_reader import PayloadReader
+from .validator import ParameterValidator
+
+
+def _open_archive(
+    source: PayloadSource,
+    compression_mode: Optional[int],
+    n: Optional[int],
+    div: Optional[float],
+    size: Optional[int],
+    backup_file: Optional[str],
+    workers: int,
+) -> zipfile.ZipFile:
+    """
+    Apre l'archivio nascosto senza estrarlo: zipfile legge dal PayloadReader
+    solo la directory centrale e, in seguito, i file richiesti
+    """
+    ParameterValidator.validate_workers(workers)
+    compression_mode, n, div, size = BinarySteganography.resolve_params(
+        source, compression_mode, n, div, size, backup_file, workers
+    )
+    buffer, index_map, _, _ = source
+    if compression_mode == CompressionMode.NO_ZIP:
+        raise ValueError(ErrorMessages.ARCHIVE_REQUIRED)
+
+    reader = PayloadReader(buffer, n, div, size, index_map, workers)
+    try:
+        return zipfile.ZipFile(reader)
+    except zipfile.BadZipFile as e:
+        raise ValueError(ErrorMessages.ARCHIVE_CORRUPTED.format(reason=e))
+
+
+def _list_members(archive: zipfile.ZipFile) -> List[str]:
+    """Nomi dei file dell'archivio (le cartelle sono escluse)"""
+    with archive:
+        return [info.filename for info in archive.infolist() if not info.is_dir()]
+
+
+def _extract_member(archive: zipfile.ZipFile, member: str, output_path: str) -> None:
+    """Decomprime il solo file member dell'archivio in output_path"""
+    with archive:
+        try:
+            info = archive.getinfo(member.replace(os.sep, "/"))
+        except KeyError:
+            raise ValueError(ErrorMessages.MEMBER_NOT_FOUND.format(name=member))
+        if info.is_dir():
+            raise ValueError(ErrorMessages.MEMBER_NOT_FOUND.format(name=member))
+
+        print(f"Estrazione di {info.filename}...")
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        try:
+            with archive.open(info) as source, open(output_path, "wb") as target:
+                shutil.copyfileobj(source, target, StreamingConfig.CHUNK_SIZE)
+        except (zipfile.BadZipFile, EOFError, zlib.error) as e:
+            raise ValueError(ErrorMessages.ARCHIVE_CORRUPTED.format(reason=e))
+    print(f"FILE TROVATO - File salvato come {output_path}")
+
+
+class BinaryMembers:
+    """Elenco e recupero dei singoli file di un archivio nascosto"""
+
+    @staticmethod
+    def list_binary_members(
+        img: Image.Image,
+        compression_mode: Optional[int] = None,
+        n: Optional[int] = None,
+        div: Optional[float] = None,
+        size: Optional[int] = None,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+    ) -> List[str]:
+        """
+        Elenca i file dell'archivio nascosto (modalità FILE o DIR) leggendo
+        solo i campioni che contengono la directory centrale
+
+        Args:
+            img: Immagine che contiene l'archivio
+            compression_mode, n, div, size, backup_file, workers: Parametri
+                come in get_binary_file
+
+        Returns:
+            Nomi dei file nell'archivio, con "/" come separatore
+        """
+        return _list_members(
+            _open_archive(
+                BinarySteganography.image_source(img),
+                compression_mode,
+                n,
+                div,
+                size,
+                backup_file,
+                workers,
+            )
+        )
+
+    @staticmethod
+    def get_binary_member(
+        img: Image.Image,
+        member: str,
+        output_path: str,
+        compression_mode: Optional[int] = None,
+        n: Optional[int] = None,
+        div: Optional[float] = None,
+        size: Optional[int] = None,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+    ) -> None:
+        """
+        Recupera un solo file dall'archivio nascosto leggendo i campioni della
+        directory centrale e quelli dei byte del file, senza estrarre il resto
+
+        Args:
+            img: Immagine che contiene l'archivio
+            member: Nome del file nell'archivio (come restituito da
+                list_binary_members)
+            output_path: Percorso dove salvare il file recuperato
+            compression_mode, n, div, size, backup_file, workers: Parametri
+                come in get_binary_file
+        """
+        _extract_member(
+            _open_archive(
+                BinarySteganography.image_source(img),
+                compression_mode,
+                n,
+                div,
+                size,
+                backup_file,
+                workers,
+            ),
+            member,
+            output_path,
+        )
+
+    @staticmethod
+    def list_binary_members_memmap(
+        host_path: str,
+        compression_mode: Optional[int] = None,
+        n: Optional[int] = None,
+        div: Optional[float] = None,
+        size: Optional[int] = None,
+        raw_shape: Optional[Tuple[int, int, int]] = None,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+    ) -> List[str]:
+        """Come list_binary_members per un host PPM/BMP/raw mappato in memoria"""
+        return _list_members(
+            _open_archive(
+                BinarySteganography.memmap_source(host_path, raw_shape),
+                compression_mode,
+                n,
+                div,
+                size,
+                backup_file,
+                workers,
+            )
+        )
+
+    @staticmethod
+    def get_binary_member_memmap(
+        host_path: str,
+        member: str,
+        output_path: str,
+        compression_mode: Optional[int] = None,
+        n: Optional[int] = None,
+        div: Optional[float] = None,
+        size: Optional[int] = None,
+        raw_shape: Optional[Tuple[int, int, int]] = None,
+        backup_file: Optional[str] = None,
+        workers: int = 1,
+    ) -> None:
+        """
+        Come get_binary_member per un host PPM/BMP/raw mappato in memoria: del
+        file host vengono letti solo i byte che contengono la directory
+        centrale e il file richiesto
+        """
+        _extract_member(
+            _open_archive(
+                BinarySteganography.memmap_source(host_path, raw_shape),
+                compression_mode,
+                n,
+                div,
+                size,
+                backup_file,
+                workers,
+            ),
+            member,
+            output_path,
+        )
@@ -0,0 +1,267 @@
+"""
+Host non compressi (PPM, BMP, raw) accessibili tramite numpy.memmap
+
+Il file host non viene mai decodificato per intero: gli indici del buffer
+piatto logico (riga per riga dall'alto, canali in ordine RGB/RGBA) vengono
+tradotti negli offset del file e il sistema operativo carica solo le pagine
+effettivamente toccate.
+"""
+
+import os
+import struct
+import sys
+from typing import Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+
+from config.constants import ErrorMessages
+
+# Intestazione BMP: file header (14 byte) + inizio del DIB header
+_BMP_HEADER = struct.Struct("<2sIHHIIiiHHI")
+_BMP_BI_RGB = 0
+
+
+class MemmapHost:
+    """Pixel di un file host mappato in memoria"""
+
+    def __init__(
+        self,
+        path: str,
+        shape: Tuple[int, int, int],
+        offset: int,
+        row_stride: int,
+        bottom_up: bool = False,
+        channel_order: Tuple[int, ...] = (),
+        writable: bool = False,
+        pixel_size: int = 0,
+    ):
+        """
+        Args:
+            path: Percorso del file host
+            shape: Dimensioni logiche (height, width, channels)
+            offset: Offset in byte del primo pixel memorizzato
+            row_stride: Byte per riga nel file (padding incluso)
+            bottom_up: True se le righe sono memorizzate dal basso verso l'alto
+            channel_order: Posizione nel file di ciascun canale logico
+                (vuoto = stesso ordine)
+            writable: Se True il file viene aperto in lettura/scrittura
+            pixel_size: Byte per pixel nel file (0 = channels); maggiore di
+                channels se il file ha byte non usati, come il quarto byte
+                dei BMP a 32 bit
+        """
+        self.shape = shape
+        self.offset = offset
+        # Byte tra righe e tra pixel consecutivi nel file, come ndarray.strides
+        self.strides = (row_stride, pixel_size or shape[2])
+        self.bottom_up = bottom_up
+        self.channel_order = np.array(channel_order or range(shape[2]))
+        self.buffer = np.memmap(path, dtype=np.uint8, mode="r+" if writable else "r")
+
+        self.contiguous = (
+            not bottom_up
+            and self.pixel_size == shape[2]
+            and row_stride == shape[1] * shape[2]
+            and bool(np.all(self.channel_order == np.arange(shape[2])))
+        )
+        if offset + row_stride * shape[0] > len(self.buffer):
+            raise ValueError(
+                ErrorMessages.UNSUPPORTED_HOST_FORMAT.format(
+                    reason="file più corto delle dimensioni dichiarate"
+                )
+            )
+
+    @property
+    def height(self) -> int:
+        """Altezza in pixel"""
+        return self.shape[0]
+
+    @property
+    def width(self) -> int:
+        """Larghezza in pixel"""
+        return self.shape[1]
+
+    @property
+    def channels(self) -> int:
+        """Numero di canali (3 o 4)"""
+        return self.shape[2]
+
+    @property
+    def row_stride(self) -> int:
+        """Byte per riga nel file (padding incluso)"""
+        return self.strides[0]
+
+    @property
+    def pixel_size(self) -> int:
+        """Byte per pixel nel file"""
+        return self.strides[1]
+
+    def __len__(self) -> int:
+        """Numero di campioni del buffer piatto logico"""
+        return self.width * self.height * self.channels
+
+    def translate(self, indices: np.ndarray) -> np.ndarray:
+        """Converte indici del buffer piatto logico in offset nel file"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if self.contiguous:
+            return indices + self.offset
+
+        rows, rest = np.divmod(indices, self.width * self.channels)
+        columns, channels = np.divmod(rest, self.channels)
+        if self.bottom_up:
+            rows = self.height - 1 - rows
+        return (
+            self.offset
+            + rows * self.row_stride
+            + columns * self.pixel_size
+            + self.channel_order[channels]
+        )
+
+    def rows(self, top: int, bottom: int) -> np.ndarray:
+        """Copia delle righe [top, bottom) come array (righe, W, C) in ordine RGB(A)"""
+        shape = (bottom - top, self.width, self.channels)
+        if self.contiguous:
+            start = self.offset + top * self.row_stride
+            end = start + shape[0] * self.row_stride
+            return np.array(self.buffer[start:end]).reshape(shape)
+        row_len = self.width * self.channels
+        indices = self.translate(np.arange(top * row_len, bottom * row_len))
+        return self.buffer[indices].reshape(shape)
+
+    def write_rows(self, top: int, band: np.ndarray) -> None:
+        """Scrive band, array (righe, W, C) in ordine RGB(A), dalla riga top"""
+        values = np.ascontiguousarray(band, dtype=np.uint8).reshape(-1)
+        if self.contiguous:
+            start = self.offset + top * self.row_stride
+            self.buffer[start : start + len(values)] = values
+            return
+        first = top * self.width * self.channels
+        self.buffer[self.translate(np.arange(first, first + len(values)))] = values
+
+    def flush(self) -> None:
+        """Scrive su disco le pagine modificate"""
+        if self.buffer.mode == "r+":
+            self.buffer.flush()
+
+
+def _parse_ppm(path: str) -> Tuple[Tuple[int, int, int], int]:
+    """Legge l'intestazione di un PPM binario (P6) a 8 bit"""
+    with open(path, "rb") as f:
+        head = f.read(4096)
+
+    tokens = []
+    pos = 2
+    while len(tokens) < 3:
+        while pos < len(head) and head[pos : pos + 1].isspace():
+            pos += 1
+        if head[pos : pos + 1] == b"#":
+            pos = head.index(b"\n", pos)
+            continue
+        start = pos
+        while pos < len(head) and head[pos : pos + 1].isdigit():
+            pos += 1
+        if start == pos:
+            raise ValueError(
+                ErrorMessages.UNSUPPORTED_HOST_FORMAT.format(
+                    reason="intestazione PPM non valida"
+                )
+            )
+        tokens.append(int(head[start:pos]))
+
+    width, height, maxval = tokens[0], tokens[1], tokens[2]
+    if maxval != 255:
+        raise ValueError(
+            ErrorMessages.UNSUPPORTED_HOST_FORMAT.format(
+                reason=f"PPM con maxval {maxval}"
+            )
+        )
+    # Un solo carattere di spaziatura separa l'intestazione dai pixel
+    return (height, width, 3), pos + 1
+
+
+def _parse_bmp(path: str) -> Tuple[Tuple[int, int, int], int, int, int, bool]:
+    """
+    Legge l'intestazione di un BMP non compresso a 24 o 32 bit; come PIL, dei
+    BMP a 32 bit (BI_RGB) vengono usati solo i tre canali di colore, così la
+    numerazione dei campioni coincide con quella dell'immagine decodificata
+    """
+    with open(path, "rb") as f:
+        head = f.read(_BMP_HEADER.size)
+    if len(head) < _BMP_HEADER.size:
+        raise ValueError(
+            ErrorMessages.UNSUPPORTED_HOST_FORMAT.format(reason="BMP troncato")
+        )
+
+    fields = _BMP_HEADER.unpack(head)
+    offset, width, height, bpp, compression = (
+        fields[4],
+        fields[6],
+        fields[7],
+        fields[9],
+        fields[10],
+    )
+    if bpp not in (24, 32) or compression != _BMP_BI_RGB:
+        raise ValueError(
+            ErrorMessages.UNSUPPORTED_HOST_FORMAT.format(
+                reason=f"BMP a {bpp} bit con compressione {compression}"
+            )
+        )
+
+    row_stride = (width * bpp + 31) // 32 * 4
+    # Altezza positiva: righe memorizzate dal basso verso l'alto
+    return (abs(height), width, 3), offset, row_stride, bpp // 8, height > 0
+
+
+def open_memmap_host(
+    path: str,
+    raw_shape: Optional[Tuple[int, int, int]] = None,
+    writable: bool = False,
+) -> MemmapHost:
+    """
+    Apre un host non compresso come MemmapHost
+
+    Args:
+        path: File PPM (P6), BMP (24/32 bit, BI_RGB) o raw
+        raw_shape: (height, width, channels) per file raw senza intestazione
+        writable: Se True le modifiche vengono scritte nel file
+
+    Returns:
+        MemmapHost pronto per l'occultamento o il recupero
+    """
+    if raw_shape is not None:
+        _, width, channels = raw_shape
+        if channels not in (3, 4):
+            raise ValueError(
+                ErrorMessages.UNSUPPORTED_HOST_FORMAT.format(
+                    reason=f"raw con {channels} canali"
+                )
+            )
+        return MemmapHost(path, raw_shape, 0, width * channels, writable=writable)
+
+    with open(path, "rb") as f:
+        magic = f.read(2)
+
+    if magic == b"P6":
+        shape, offset = _parse_ppm(path)
+        return MemmapHost(path, shape, offset, shape[1] * 3, writable=writable)
+
+    if magic == b"BM":
+        shape, offset, row_stride, pixel_size, bottom_up = _parse_bmp(path)
+        # Nel file i canali sono in ordine BGR(X)
+        return MemmapHost(
+            path,
+            shape,
+            offset,
+            row_stride,
+            bottom_up,
+            (2, 1, 0),
+            writable=writable,
+            pixel_size=pixel_size,
+        )
+
+    raise ValueError(
+        ErrorMessages.UNSUPPORTED_HOST_FORMAT.format(
+            reason="intestazione non riconosciuta, indica raw_shape per i file raw"
+        )
+    )
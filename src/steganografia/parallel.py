@@ -0,0 +1,131 @@
+"""
+Suddivisione del flusso di gruppi di bit in segmenti indipendenti
+
+Il valore del cursore all'inizio di ogni segmento si calcola con position_at,
+quindi i segmenti possono essere elaborati contemporaneamente su un pool di
+thread: le operazioni NumPy sui blocchi rilasciano il GIL.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+
+from config.constants import StreamingConfig
+
+from .bit_operations import get_low_bits, set_low_bits
+
+T = TypeVar("T")
+
+# targets_for(start, stop): indici dei gruppi [start, stop) che cadono nel buffer
+TargetsFor = Callable[[int, int], np.ndarray]
+
+
+def split_segments(total: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Divide i gruppi [0, total) in al più workers intervalli contigui
+    di almeno StreamingConfig.MIN_SEGMENT_GROUPS gruppi
+    """
+    if total <= 0:
+        return []
+    segments = max(1, min(workers, total // StreamingConfig.MIN_SEGMENT_GROUPS))
+    bounds = [total * i // segments for i in range(segments + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def run_segments(func: Callable[[int, int], T], total: int, workers: int) -> List[T]:
+    """
+    Esegue func(start, stop) su ciascun segmento di [0, total)
+
+    Returns:
+        Risultati di func nell'ordine dei segmenti
+    """
+    segments = split_segments(total, workers)
+    if len(segments) <= 1:
+        return [func(start, stop) for start, stop in segments]
+
+    with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+        futures = [executor.submit(func, start, stop) for start, stop in segments]
+        return [future.result() for future in futures]
+
+
+def scatter_low_bits(
+    buffer: np.ndarray,
+    values: np.ndarray,
+    n: int,
+    targets_for: TargetsFor,
+    workers: int,
+    index_map: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> None:
+    """
+    Scrive values[k] negli ultimi n bit di buffer[target_k] in parallelo, con lo
+    stesso risultato di una sola scrittura sequenziale di tutti i gruppi.
+
+    Gli indici sono non decrescenti, quindi due segmenti possono toccare lo stesso
+    campione solo al loro confine: in quel caso la scrittura del segmento
+    successivo, che nel percorso sequenziale arriva dopo, viene ripetuta.
+    index_map, se indicata, converte gli indici logici in indici di buffer
+    """
+    index_map = index_map or (lambda indices: indices)
+
+    def write(start: int, stop: int) -> Optional[Tuple[int, int]]:
+        targets = targets_for(start, stop)
+        set_low_bits(
+            buffer, index_map(targets), values[start : start + len(targets)], n
+        )
+        if len(targets) == 0:
+            return None
+        return int(targets[0]), int(targets[-1])
+
+    segments = split_segments(len(values), workers)
+    bounds = run_segments(write, len(values), workers)
+
+    last = -1
+    for (start, stop), bound in zip(segments, bounds):
+        if bound is None:
+            continue
+        if bound[0] <= last:
+            # Riscrive, in ordine, i gruppi iniziali che ricadono sul segmento precedente
+            count = 1
+            while True:
+                targets = targets_for(start, min(stop, start + count))
+                if targets[-1] > last or start + count >= stop:
+                    break
+                count *= 2
+            overlap = int(np.searchsorted(targets, last, side="right"))
+            set_low_bits(
+                buffer,
+                index_map(targets[:overlap]),
+                values[start : start + overlap],
+                n,
+            )
+        last = max(last, bound[1])
+
+
+def gather_low_bits(
+    buffer: np.ndarray,
+    total: int,
+    n: int,
+    targets_for: TargetsFor,
+    workers: int,
+    index_map: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Legge gli ultimi n bit dei campioni dei gruppi [0, total) in parallelo
+
+    Returns:
+        Valori estratti nell'ordine dei gruppi, come una sola lettura sequenziale
+    """
+    index_map = index_map or (lambda indices: indices)
+
+    def read(start: int, stop: int) -> np.ndarray:
+        return get_low_bits(buffer, index_map(targets_for(start, stop)), n)
+
+    parts = run_segments(read, total, workers)
+    if not parts:
+        return np.zeros(0, dtype=np.uint8)
+    return np.concatenate(parts)
@@ -0,0 +1,163 @@
+"""
+Indice persistente dei parametri di occultamento
+
+Ogni occultamento registra i parametri in un database SQLite con chiave l'hash
+dei pixel dell'immagine risultato; il recupero calcola lo stesso hash e trova
+i parametri con una sola ricerca per chiave primaria. Una cache LRU in memoria
+evita di interrogare il database per le immagini usate di recente.
+
+Insieme ai parametri si registra il CRC-32 dei dati nascosti: chi consulta
+l'indice rilegge i dati con i parametri trovati e scarta il record se il CRC
+non corrisponde, così una chiave uguale per dati diversi non restituisce mai
+byte sbagliati.
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from typing import BinaryIO, Iterable, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+
+from config.constants import ParamIndexConfig, StreamingConfig
+
+from .memmap_host import MemmapHost
+from .tiles import band_ranges
+
+
+def pixel_key(shape: Tuple[int, ...], bands: Iterable[np.ndarray]) -> str:
+    """
+    Hash BLAKE2b (128 bit) dei pixel, letti a bande di righe consecutive
+
+    Args:
+        shape: Dimensioni (H, W, C) dell'immagine
+        bands: Bande di righe, dall'alto verso il basso, in ordine RGB(A)
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(repr(tuple(shape)).encode())
+    for band in bands:
+        hasher.update(np.ascontiguousarray(band, dtype=np.uint8).data)
+    return hasher.hexdigest()
+
+
+def array_key(arr: np.ndarray) -> str:
+    """Chiave di un array (H, W, C) uint8"""
+    return pixel_key(arr.shape, [arr])
+
+
+def memmap_key(host: MemmapHost) -> str:
+    """Chiave di un host mappato in memoria, uguale a quella dell'immagine decodificata"""
+    bands = (
+        host.rows(top, bottom)
+        for top, bottom in band_ranges(host.height, StreamingConfig.BAND_ROWS)
+    )
+    return pixel_key(host.shape, bands)
+
+
+class ChecksumStream:
+    """
+    CRC-32 e numero dei byte che attraversano lo stream: letti da stream, se
+    indicato, oppure scritti (senza stream i dati scritti vengono scartati)
+    """
+
+    def __init__(self, stream: Optional[BinaryIO] = None):
+        self.stream = stream
+        self.crc = 0
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Legge da stream aggiornando il CRC"""
+        assert self.stream is not None
+        data = self.stream.read(size)
+        self._update(data)
+        return data
+
+    def write(self, data: bytes) -> int:
+        """Aggiorna il CRC e inoltra i dati a stream, se presente"""
+        self._update(data)
+        if self.stream is not None:
+            return self.stream.write(data)
+        return len(data)
+
+    def _update(self, data: bytes) -> None:
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+
+
+class ParamIndex:
+    """Database dei parametri con chiave (hash dei pixel, tipo di dato)"""
+
+    def __init__(self, path: str, cache_size: int = ParamIndexConfig.CACHE_SIZE):
+        """
+        Args:
+            path: File del database SQLite (creato se non esiste)
+            cache_size: Record tenuti nella cache LRU (0 = nessuna cache)
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Una sola connessione condivisa dai thread, protetta dal lock;
+        # WAL permette letture concorrenti da altri processi
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS params ("
+            "key TEXT NOT NULL, type TEXT NOT NULL, record TEXT NOT NULL, "
+            "PRIMARY KEY (key, type)) WITHOUT ROWID"
+        )
+
+    def put(self, key: str, data_type: str, record: str) -> None:
+        """Registra (o sostituisce) il record dei parametri per la chiave"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO params (key, type, record) VALUES (?, ?, ?)",
+                (key, data_type, record),
+            )
+            self._remember((key, data_type), record)
+
+    def get(self, key: str, data_type: str) -> Optional[str]:
+        """Restituisce il record registrato per la chiave, oppure None"""
+        with self._lock:
+            cached = self._cache.get((key, data_type))
+            if cached is not None:
+                self._cache.move_to_end((key, data_type))
+                return cached
+
+            row = self._conn.execute(
+                "SELECT record FROM params WHERE key = ? AND type = ?",
+                (key, data_type),
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember((key, data_type), row[0])
+            return row[0]
+
+    def __len__(self) -> int:
+        """Numero di record nel database"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM params").fetchone()[0]
+
+    def close(self) -> None:
+        """Chiude la connessione al database"""
+        with self._lock:
+            self._conn.close()
+            self._cache.clear()
+
+    def _remember(self, cache_key: Tuple[str, str], record: str) -> None:
+        """Inserisce un record nella cache eliminando il meno usato di recente"""
+        if self.cache_size <= 0:
+            return
+        self._cache[cache_key] = record
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
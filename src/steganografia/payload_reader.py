@@ -0,0 +1,142 @@
+"""
+Accesso casuale al payload nascosto
+
+Il byte b del payload occupa i bit [8b, 8b + 8) del flusso, cioè i gruppi da
+8b // n in poi, e il gruppo k si trova nel campione round(ind_k) con ind_k
+calcolato da position_at: un intervallo di byte si legge quindi toccando solo
+i campioni che lo contengono, senza estrarre ciò che lo precede.
+
+PayloadReader espone il payload come file binario in sola lettura con seek;
+passato a zipfile.ZipFile permette di leggere la directory centrale di un
+archivio nascosto e un solo file al suo interno.
+"""
+
+import io
+import os
+import sys
+from functools import partial
+from typing import Callable, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+
+from .bit_operations import get_low_bits, group_targets, position_at, unpack_groups
+from .parallel import gather_low_bits
+
+
+def read_payload_range(
+    buffer: np.ndarray,
+    n: int,
+    div: float,
+    size: int,
+    start: int,
+    stop: int,
+    index_map: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    workers: int = 1,
+) -> bytes:
+    """
+    Legge i byte [start, stop) di un payload di size byte nascosto in buffer
+
+    Args:
+        buffer: Campioni dell'host (dopo l'eventuale intestazione)
+        n, div, size: Parametri dell'occultamento
+        start, stop: Intervallo di byte del payload (limitato a [0, size))
+        index_map: Conversione da posizioni logiche a indici di buffer
+        workers: Thread usati per leggere i campioni
+
+    Returns:
+        Byte letti
+    """
+    start, stop = max(0, start), min(size, stop)
+    if start >= stop:
+        return b""
+
+    total_groups, diff = divmod(size * 8, n)
+    first = start * 8 // n
+    last = min(-(-stop * 8 // n), total_groups)
+    bits = unpack_groups(
+        gather_low_bits(
+            buffer,
+            last - first,
+            n,
+            # I gruppi del segmento sono contati a partire da first
+            partial(group_targets, div, base=position_at(div, first)),
+            workers,
+            index_map,
+        ),
+        n,
+    )
+
+    # L'ultimo gruppo, se il payload non è multiplo di n bit, ha solo diff bit
+    if diff and stop * 8 > total_groups * n:
+        target = np.array([round(position_at(div, total_groups))], dtype=np.int64)
+        if index_map is not None:
+            target = index_map(target)
+        tail = unpack_groups(get_low_bits(buffer, target, diff), diff)
+        bits = np.concatenate((bits, tail))
+
+    offset = start * 8 - first * n
+    return np.packbits(bits[offset : offset + (stop - start) * 8]).tobytes()
+
+
+class PayloadReader(io.RawIOBase):
+    """File binario in sola lettura con seek sul payload nascosto in un host"""
+
+    def __init__(
+        self,
+        buffer: np.ndarray,
+        n: int,
+        div: float,
+        size: int,
+        index_map: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        workers: int = 1,
+    ):
+        """
+        Args:
+            buffer, n, div, size, index_map, workers: Come in read_payload_range
+        """
+        super().__init__()
+        self.buffer = buffer
+        self.n = n
+        self.div = div
+        self.size = size
+        self.index_map = index_map
+        self.workers = workers
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"whence non valido: {whence}")
+        if offset < 0:
+            raise ValueError(f"Posizione negativa: {offset}")
+        self._position = offset
+        return offset
+
+    def readinto(self, b) -> int:
+        data = read_payload_range(
+            self.buffer,
+            self.n,
+            self.div,
+            self.size,
+            self._position,
+            self._position + len(b),
+            self.index_map,
+            self.workers,
+        )
+        b[: len(data)] = data
+        self._position += len(data)
+        return len(data)
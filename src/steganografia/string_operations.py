@@ -4,27 +4,109 @@ Operazioni di steganografia per le stringhe
 
 import os
 import sys
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple, Union
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
+import numpy as np
 from PIL import Image
 
 from config.constants import DataType, ErrorMessages
 
-from .backup import backup_system
-from .bit_operations import (
-    binary_convert,
-    binary_convert_back,
-    set_color_component,
-    set_last_bit,
-)
+from .backup import current_backup
+from .bit_operations import binary_convert, bits_from_string, set_low_bits
+from .buffers import array_to_image, image_to_array
 from .validator import ParameterValidator
 
 
 class StringSteganography:
     """Classe per operazioni di steganografia su stringhe"""
 
+    # Header magico (16 bit): 1010101011110000
+    MAGIC_HEADER = "1010101011110000"
+
+    @staticmethod
+    def _build_payload(message: str, checksum: int) -> np.ndarray:
+        """
+        Costruisce il payload HEADER + LENGTH + CHECKSUM + MESSAGE + TERMINATOR
+        come array di bit (uint8 con valori 0/1)
+        """
+        if all(ord(char) < 256 for char in message):
+            packed = np.concatenate(
+                (
+                    np.array([0xAA, 0xF0], dtype=np.uint8),
+                    np.frombuffer(len(message).to_bytes(4, "big"), dtype=np.uint8),
+                    np.frombuffer(checksum.to_bytes(2, "big"), dtype=np.uint8),
+                    np.frombuffer(message.encode("latin-1"), dtype=np.uint8),
+                    np.zeros(1, dtype=np.uint8),
+                )
+            )
+            return np.unpackbits(packed)
+
+        # Caratteri fuori da latin-1: binary_convert produce gruppi di più di 8 bit,
+        # quindi si costruisce la stringa di bit per restare compatibili
+        full_payload = (
+            StringSteganography.MAGIC_HEADER
+            + format(len(message), "032b")
+            + format(checksum, "016b")
+            + binary_convert(message)
+            + "00000000"
+        )
+        return bits_from_string(full_payload)
+
+    @staticmethod
+    def _write_lsb_plane(arr: np.ndarray, bits: np.ndarray) -> None:
+        """Scrive i bit nel piano LSB di un array (H, W, 3) in ordine colonna per colonna"""
+        height, width = arr.shape[:2]
+        count = min(len(bits), width * height * 3)
+        if count == 0:
+            return
+        columns = -(-count // (height * 3))
+
+        # Vista (x, y, canale) delle sole colonne interessate
+        block = arr[:, :columns, :3].transpose(1, 0, 2).reshape(-1)
+        set_low_bits(block, slice(0, count), bits[:count], 1)
+        arr[:, :columns, :3] = block.reshape(columns, height, 3).transpose(1, 0, 2)
+
+    @staticmethod
+    def _read_lsb_bits(
+        source: Union[Image.Image, np.ndarray], start: int, stop: int
+    ) -> np.ndarray:
+        """
+        Legge i bit LSB nell'intervallo [start, stop) in ordine colonna per colonna,
+        decodificando solo le colonne dell'immagine che li contengono
+        """
+        if isinstance(source, Image.Image):
+            height = source.height
+        else:
+            height = source.shape[0]
+        column_bits = height * 3
+        first_column = start // column_bits
+        last_column = -(-stop // column_bits)
+        if isinstance(source, Image.Image):
+            block = np.asarray(source.crop((first_column, 0, last_column, height)))
+        else:
+            block = source[:, first_column:last_column, :3]
+        bits = block.transpose(1, 0, 2).reshape(-1) & 1
+        offset = first_column * column_bits
+        return bits[start - offset : stop - offset]
+
+    @staticmethod
+    def _find_header(
+        source: Union[Image.Image, np.ndarray], search_limit: int
+    ) -> Optional[int]:
+        """Cerca l'header magico nelle prime search_limit posizioni"""
+        if search_limit <= 0:
+            return None
+
+        window = StringSteganography._read_lsb_bits(source, 0, search_limit + 15)
+        header = bits_from_string(StringSteganography.MAGIC_HEADER)
+        candidates = np.lib.stride_tricks.sliding_window_view(window, len(header))
+        matches = np.flatnonzero((candidates == header).all(axis=1))
+        if len(matches) == 0:
+            return None
+        return int(matches[0])
+
     @staticmethod
     def hide_message(
         img: Image.Image, message: str, backup_file: Optional[str] = None
@@ -47,61 +129,72 @@ class StringSteganography:
         if img.mode != "RGB":
             img = img.convert("RGB")
 
-        # Inizia a nascondere
-        print("Nascondendo messaggio...")
-        img_copy = img.copy()
-        mat = img_copy.load()
-        if mat is None:
-            raise ValueError("Impossibile caricare i dati dell'immagine")
+        arr = image_to_array(img, writable=True)
+        StringSteganography.hide_message_array(
+            arr, message, in_place=True, backup_file=backup_file
+        )
+        return array_to_image(arr)
+
+    @staticmethod
+    def hide_message_array(
+        arr: np.ndarray,
+        message: str,
+        in_place: bool = False,
+        backup_file: Optional[str] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Nasconde una stringa in un array NumPy
+
+        Args:
+            arr: Array (H, W, C) uint8 con C = 3 o 4 (il canale alfa non viene usato)
+            message: Messaggio da nascondere
+            in_place: Se True modifica arr direttamente, altrimenti ne usa una copia
+            backup_file: File dove salvare i parametri di backup
 
-        # Crea il payload con header robusto
-        msg_binary = binary_convert(message)
+        Returns:
+            Tupla con (array_risultato, parametri) dove i parametri contengono anche
+            capacity_bits e payload_bits
+        """
+        # Validazione
+        ParameterValidator.validate_pixel_array(arr, (3, 4))
+        height, width = arr.shape[:2]
+        ParameterValidator.validate_dimensions_for_message(width, height, message)
 
-        # Header magico (16 bit): 1010101011110000
-        magic_header = "1010101011110000"
+        if in_place:
+            ParameterValidator.validate_writable_array(arr)
+        else:
+            arr = arr.copy()
 
-        # Lunghezza del messaggio (32 bit): per sapere esattamente quanti caratteri leggere
-        msg_length = format(len(message), "032b")
+        # Inizia a nascondere
+        print("Nascondendo messaggio...")
 
         # Calcola checksum semplice (16 bit): XOR di tutti i byte del messaggio
         checksum = 0
         for char in message:
             checksum ^= ord(char)
-        checksum_binary = format(checksum, "016b")
 
-        # Terminatore (8 bit)
-        terminator = "00000000"
+        # Crea il payload con header robusto (72 bit di header + messaggio)
+        payload_bits = StringSteganography._build_payload(message, checksum)
+        header_len = 16 + 32 + 16 + 8
 
-        # Costruisce il payload completo: HEADER + LENGTH + CHECKSUM + MESSAGE + TERMINATOR
-        full_payload = (
-            magic_header + msg_length + checksum_binary + msg_binary + terminator
-        )
-        msg_list = list(full_payload)
-
-        for i in range(img.width):
-            for j in range(img.height):
-                for z in range(3):
-                    if msg_list:
-                        bit = msg_list.pop(0)
-                        color = mat[i, j][z]
-                        color = set_last_bit(color, bit)
-                        mat = set_color_component(mat, i, j, color, z)
-                    else:
-                        break
-
-        original_len = len(full_payload)
-        percentage = format(
-            ((original_len / ((img.width * img.height) * 3)) * 100), ".2f"
-        )
+        # Scrive i bit nel piano LSB seguendo l'ordine colonna per colonna
+        # (x esterno, y interno, canale più interno)
+        StringSteganography._write_lsb_plane(arr, payload_bits)
+
+        original_len = len(payload_bits)
+        percentage = format(((original_len / ((width * height) * 3)) * 100), ".2f")
         print(
-            f"TERMINATO - Percentuale di pixel usati: {percentage}% (Header: {len(magic_header + msg_length + checksum_binary + terminator)} bit, Messaggio: {len(msg_binary)} bit)"
+            f"TERMINATO - Percentuale di pixel usati: {percentage}% (Header: {header_len} bit, Messaggio: {original_len - header_len} bit)"
         )
 
         # Salva i parametri per il recupero
         params = {"original_message": message, "method": "string"}
-        backup_system.save_backup_data(DataType.STRING, params, backup_file)
+        current_backup().save_backup_data(DataType.STRING, params, backup_file)
 
-        return img_copy
+        metadata = dict(
+            params, capacity_bits=width * height * 3, payload_bits=original_len
+        )
+        return arr, metadata
 
     @staticmethod
     def get_message(img: Image.Image, backup_file: Optional[str] = None) -> str:
@@ -115,68 +208,72 @@ class StringSteganography:
         Returns:
             Messaggio recuperato
         """
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        return StringSteganography._decode_message(
+            img, img.width, img.height, backup_file
+        )
+
+    @staticmethod
+    def get_message_array(arr: np.ndarray, backup_file: Optional[str] = None) -> str:
+        """
+        Recupera un messaggio nascosto da un array NumPy
+
+        Args:
+            arr: Array (H, W, C) uint8 con C = 3 o 4
+            backup_file: File di backup dei parametri
+
+        Returns:
+            Messaggio recuperato
+        """
+        ParameterValidator.validate_pixel_array(arr, (3, 4))
+        height, width = arr.shape[:2]
+        return StringSteganography._decode_message(arr, width, height, backup_file)
+
+    @staticmethod
+    def _decode_message(
+        source: Union[Image.Image, np.ndarray],
+        width: int,
+        height: int,
+        backup_file: Optional[str],
+    ) -> str:
+        """Decodifica il messaggio leggendo solo i bit LSB necessari"""
         # Controlla se esistono parametri di backup
         backup_data = None
         if backup_file:
-            backup_data = backup_system.load_backup_data(backup_file)
+            backup_data = current_backup().load_backup_data(backup_file)
 
         # Se non ci sono backup file, controlla le variabili locali
         if not backup_data:
-            recent_params = backup_system.get_last_params(DataType.STRING)
+            recent_params = current_backup().get_last_params(DataType.STRING)
             if recent_params:
                 print("Usando parametri dall'ultima operazione di occultamento")
                 backup_data = {"type": DataType.STRING, "params": recent_params}
 
-        if img.mode != "RGB":
-            img = img.convert("RGB")
-
-        # Inizia la procedura di recupero
-        mat = img.load()
-        if mat is None:
-            raise ValueError("Impossibile caricare i dati dell'immagine")
-
-        # Estrae tutti i bit dall'immagine
-        all_bits = []
-        for i in range(img.width):
-            for j in range(img.height):
-                for z in range(3):
-                    color = mat[i, j][z]
-                    bit = format(color, "08b")[-1]
-                    all_bits.append(bit)
-
-        # Cerca l'header magico
-        magic_header = "1010101011110000"
-        header_found = False
-        start_pos = 0
+        # Inizia la procedura di recupero: legge solo i bit necessari
+        total_bits = width * height * 3
 
         # Cerca l'header nei primi bit dell'immagine (entro i primi 1000 bit per performance)
         search_limit = min(
-            1000, len(all_bits) - 72
+            1000, total_bits - 72
         )  # 72 = header(16) + length(32) + checksum(16) + min_terminator(8)
 
-        for pos in range(search_limit):
-            if pos + 16 <= len(all_bits):
-                candidate_header = "".join(all_bits[pos : pos + 16])
-                if candidate_header == magic_header:
-                    header_found = True
-                    start_pos = pos
-                    break
-
-        if not header_found:
+        start_pos = StringSteganography._find_header(source, search_limit)
+        if start_pos is None:
             raise ValueError(ErrorMessages.NO_MESSAGE_FOUND)
 
         print(f"Header magico trovato alla posizione {start_pos}")
 
-        # Estrae la lunghezza del messaggio (32 bit dopo l'header)
+        # Estrae lunghezza (32 bit) e checksum (16 bit) dopo l'header
         length_start = start_pos + 16
-        if length_start + 32 > len(all_bits):
+        if length_start + 48 > total_bits:
             raise ValueError(ErrorMessages.DECODE_FAILED)
 
-        length_bits = "".join(all_bits[length_start : length_start + 32])
-        try:
-            message_length = int(length_bits, 2)
-        except ValueError:
-            raise ValueError(ErrorMessages.DECODE_FAILED)
+        fields = np.packbits(
+            StringSteganography._read_lsb_bits(source, length_start, length_start + 48)
+        )
+        message_length = int.from_bytes(fields[:4].tobytes(), "big")
 
         # Controllo di sanità sulla lunghezza
         if message_length <= 0 or message_length > 10000:  # Limite ragionevole
@@ -184,44 +281,30 @@ class StringSteganography:
 
         print(f"Lunghezza messaggio attesa: {message_length} caratteri")
 
-        # Estrae il checksum (16 bit dopo la lunghezza)
-        checksum_start = length_start + 32
-        if checksum_start + 16 > len(all_bits):
-            raise ValueError(ErrorMessages.DECODE_FAILED)
-
-        checksum_bits = "".join(all_bits[checksum_start : checksum_start + 16])
-        expected_checksum = int(checksum_bits, 2)
+        expected_checksum = int.from_bytes(fields[4:].tobytes(), "big")
 
-        # Estrae il messaggio (message_length * 8 bit dopo il checksum)
-        message_start = checksum_start + 16
-        message_bits_length = message_length * 8
-
-        if message_start + message_bits_length > len(all_bits):
+        # Estrae il messaggio e il terminatore (message_length * 8 + 8 bit)
+        message_start = length_start + 48
+        message_end = message_start + message_length * 8 + 8
+        if message_end > total_bits:
             raise ValueError(ErrorMessages.DECODE_FAILED)
 
-        message_bits = "".join(
-            all_bits[message_start : message_start + message_bits_length]
+        payload = np.packbits(
+            StringSteganography._read_lsb_bits(source, message_start, message_end)
         )
 
         # Verifica il terminatore (8 bit dopo il messaggio)
-        terminator_start = message_start + message_bits_length
-        if terminator_start + 8 > len(all_bits):
-            raise ValueError(ErrorMessages.DECODE_FAILED)
-
-        terminator_bits = "".join(all_bits[terminator_start : terminator_start + 8])
-        if terminator_bits != "00000000":
+        if payload[-1] != 0:
             raise ValueError(ErrorMessages.NO_MESSAGE_FOUND)
 
         # Decodifica il messaggio
         try:
-            message = binary_convert_back(message_bits)
+            message = payload[:-1].tobytes().decode("latin-1")
         except Exception as e:
             raise ValueError(ErrorMessages.DECODE_FAILED) from e
 
         # Verifica il checksum
-        calculated_checksum = 0
-        for char in message:
-            calculated_checksum ^= ord(char)
+        calculated_checksum = int(np.bitwise_xor.reduce(payload[:-1]))
 
         if calculated_checksum != expected_checksum:
             raise ValueError("Messaggio corrotto: checksum non valido")
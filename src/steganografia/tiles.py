@@ -0,0 +1,193 @@
+"""
+Elaborazione a bande orizzontali dell'immagine host
+
+Le posizioni dei gruppi di bit dipendono solo da div, quindi si possono
+calcolare banda per banda: ogni banda copre un intervallo contiguo del buffer
+piatto (riga per riga, canale più interno) e riceve solo i gruppi che vi cadono.
+
+L'host è un file non compresso mappato in memoria (MemmapHost): ogni banda
+che riceve gruppi viene letta, modificata e riscritta nel file, quindi la
+memoria di lavoro è di una banda qualunque sia la dimensione dell'host e le
+bande senza gruppi non vengono nemmeno lette.
+"""
+
+import os
+import sys
+from typing import Callable, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import numpy as np
+
+from config.constants import StreamingConfig
+
+from .bit_operations import (
+    accumulate_positions,
+    get_low_bits,
+    pack_groups,
+    set_low_bits,
+    unpack_groups,
+)
+from .buffers import flat_view
+from .memmap_host import MemmapHost
+
+Rounding = Callable[[np.ndarray], np.ndarray]
+
+
+def band_ranges(height: int, band_rows: int) -> Iterator[Tuple[int, int]]:
+    """Restituisce gli intervalli di righe [top, bottom) delle bande"""
+    band_rows = max(1, band_rows)
+    for top in range(0, height, band_rows):
+        yield top, min(height, top + band_rows)
+
+
+class GroupCursor:
+    """Scorre in ordine le posizioni dei gruppi di bit, banda dopo banda"""
+
+    def __init__(
+        self, div: float, total_groups: int, rounding: Rounding, offset: int = 0
+    ):
+        """
+        Args:
+            div: Divisore per la distribuzione
+            total_groups: Numero totale di gruppi da posizionare
+            rounding: np.floor per int(ind) oppure np.rint per round(ind)
+            offset: Campioni iniziali saltati (ad esempio l'intestazione)
+        """
+        self.div = div
+        self.remaining = total_groups
+        self.rounding = rounding
+        self.offset = offset
+        self.cursor = 0.0
+
+    def take_until(self, limit: int) -> np.ndarray:
+        """Restituisce le posizioni intere dei prossimi gruppi che sono < limit"""
+        taken: List[np.ndarray] = []
+        while self.remaining > 0:
+            span = limit - self.offset - self.cursor
+            estimate = int(span / self.div) + 1 if self.div else 1
+            block = min(self.remaining, max(1, estimate))
+            positions = accumulate_positions(self.div, block, self.cursor)
+            targets = self.rounding(positions).astype(np.int64) + self.offset
+            cut = int(np.searchsorted(targets, limit, side="left"))
+            taken.append(targets[:cut])
+            self.remaining -= cut
+            if cut < block:
+                # Riparte dal primo valore non usato: l'accumulo resta identico
+                self.cursor = float(positions[cut])
+                break
+            self.cursor = float(positions[-1]) + self.div
+        if not taken:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(taken)
+
+
+class SecretImageSource:
+    """Produce i gruppi da lsb bit formati dai msb bit di un'immagine segreta"""
+
+    def __init__(self, secret: np.ndarray, msb: int, lsb: int):
+        self.secret = secret
+        self.msb = msb
+        self.lsb = lsb
+        self.next_group = 0
+
+    def embed(self, flat: np.ndarray, targets: np.ndarray) -> None:
+        """Scrive i prossimi len(targets) gruppi nelle posizioni indicate"""
+        count = len(targets)
+        if count == 0:
+            return
+        first_bit = self.next_group * self.lsb
+        last_bit = (self.next_group + count) * self.lsb
+        first_sample = first_bit // self.msb
+        last_sample = min(len(self.secret), -(-last_bit // self.msb))
+
+        bits = unpack_groups(
+            self.secret[first_sample:last_sample] >> (8 - self.msb), self.msb
+        )
+        bits = bits[first_bit - first_sample * self.msb :]
+        padding = count * self.lsb - len(bits)
+        if padding > 0:
+            bits = np.concatenate((bits, np.zeros(padding, dtype=np.uint8)))
+        values = pack_groups(bits[: count * self.lsb], self.lsb)
+
+        set_low_bits(flat, targets, values, self.lsb)
+        self.next_group += count
+
+
+class SecretImageSink:
+    """Ricostruisce i pixel da msb bit a partire dai gruppi da lsb bit estratti"""
+
+    def __init__(self, size: int, msb: int, lsb: int):
+        self.res = np.zeros(size, dtype=np.uint8)
+        self.msb = msb
+        self.lsb = lsb
+        self.pending = np.zeros(0, dtype=np.uint8)
+        self.written = 0
+
+    def extract(self, flat: np.ndarray, targets: np.ndarray) -> None:
+        """Legge i gruppi nelle posizioni indicate e completa i pixel possibili"""
+        samples = get_low_bits(flat, targets, self.lsb)
+        bits = np.concatenate((self.pending, unpack_groups(samples, self.lsb)))
+        pixels = min(len(self.res) - self.written, len(bits) // self.msb)
+        self.res[self.written : self.written + pixels] = pack_groups(
+            bits[: pixels * self.msb], self.msb
+        ) << (8 - self.msb)
+        self.written += pixels
+        self.pending = bits[pixels * self.msb :]
+
+
+def embed_bands(
+    host: MemmapHost,
+    cursor: GroupCursor,
+    source,
+    band_rows: int = 0,
+) -> None:
+    """
+    Nasconde i gruppi di source nell'host una banda alla volta, riscrivendo
+    nel file solo le bande che ricevono gruppi
+
+    Args:
+        host: Host mappato in memoria, aperto in scrittura
+        cursor: Posizioni dei gruppi
+        source: Oggetto con metodo embed(flat, targets)
+        band_rows: Righe per banda (0 = StreamingConfig.BAND_ROWS)
+    """
+    band_rows = band_rows or StreamingConfig.BAND_ROWS
+    row_len = host.width * host.channels
+
+    for top, bottom in band_ranges(host.height, band_rows):
+        targets = cursor.take_until(bottom * row_len)
+        if len(targets) == 0:
+            if cursor.remaining == 0:
+                break
+            continue
+        band = host.rows(top, bottom)
+        source.embed(flat_view(band), targets - top * row_len)
+        host.write_rows(top, band)
+
+
+def extract_bands(
+    host: MemmapHost,
+    cursor: GroupCursor,
+    sink,
+    band_rows: int = 0,
+) -> None:
+    """
+    Estrae i gruppi nascosti nell'host una banda alla volta
+
+    Args:
+        host: Host mappato in memoria che contiene i dati
+        cursor: Posizioni dei gruppi
+        sink: Oggetto con metodo extract(flat, targets)
+        band_rows: Righe per banda (0 = StreamingConfig.BAND_ROWS)
+    """
+    band_rows = band_rows or StreamingConfig.BAND_ROWS
+    row_len = host.width * host.channels
+
+    for top, bottom in band_ranges(host.height, band_rows):
+        targets = cursor.take_until(bottom * row_len)
+        if len(targets) == 0:
+            if cursor.remaining == 0:
+                break
+            continue
+        sink.extract(flat_view(host.rows(top, bottom)), targets - top * row_len)
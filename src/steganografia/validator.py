@@ -7,9 +7,17 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
+from typing import Iterable, Optional
+
+import numpy as np
 from PIL import Image
 
-from config.constants import CompressionMode, ErrorMessages, ValidationLimits
+from config.constants import (
+    CompressionCodec,
+    CompressionMode,
+    ErrorMessages,
+    ValidationLimits,
+)
 
 
 class ParameterValidator:
@@ -43,6 +51,19 @@ class ParameterValidator:
         ]:
             raise ValueError(ErrorMessages.INVALID_ZIP_MODE)
 
+    @staticmethod
+    def validate_codec(codec: Optional[str], zip_mode: int) -> None:
+        """Valida il codec di compressione (None = predefinito della modalità)"""
+        if codec is None:
+            return
+        valid = (*CompressionCodec.ALL, CompressionCodec.AUTO)
+        if codec not in valid or zip_mode == CompressionMode.NO_ZIP:
+            raise ValueError(
+                ErrorMessages.INVALID_CODEC.format(
+                    codec=codec, codecs=", ".join(CompressionCodec.ALL)
+                )
+            )
+
     @staticmethod
     def validate_lsb_msb_relationship(lsb: int, msb: int) -> None:
         """Valida la relazione tra LSB e MSB"""
@@ -52,41 +73,43 @@ class ParameterValidator:
     @staticmethod
     def validate_image_size_for_message(img: Image.Image, message: str) -> None:
         """Valida che l'immagine sia abbastanza grande per il messaggio"""
-        if (img.width * img.height) * 3 < len(message) * 8:
+        ParameterValidator.validate_dimensions_for_message(
+            img.width, img.height, message
+        )
+
+    @staticmethod
+    def validate_dimensions_for_message(width: int, height: int, message: str) -> None:
+        """Valida che un host width x height sia abbastanza grande per il messaggio"""
+        if (width * height) * 3 < len(message) * 8:
             raise ValueError(
                 ErrorMessages.IMAGE_TOO_SMALL_MESSAGE.format(
-                    msg_len=len(message), width=img.width, height=img.height
+                    msg_len=len(message), width=width, height=height
                 )
             )
 
     @staticmethod
-    def validate_image_size_for_image(
-        host_img: Image.Image, secret_img: Image.Image, lsb: int, msb: int
-    ) -> None:
-        """Valida che l'immagine host sia abbastanza grande per l'immagine segreta"""
-        if (lsb * host_img.width * host_img.height * 3) < (
-            msb * secret_img.width * secret_img.height * 3
+    def validate_pixel_array(arr: np.ndarray, channels: Iterable[int]) -> None:
+        """Valida un array di pixel (H, W, C) di tipo uint8"""
+        channels = tuple(channels)
+        if (
+            not isinstance(arr, np.ndarray)
+            or arr.ndim != 3
+            or arr.dtype != np.uint8
+            or arr.shape[2] not in channels
         ):
-            raise ValueError(
-                ErrorMessages.IMAGE_TOO_SMALL_IMAGE.format(
-                    host_width=host_img.width,
-                    host_height=host_img.height,
-                    secret_width=secret_img.width,
-                    secret_height=secret_img.height,
-                )
-            )
+            raise ValueError(ErrorMessages.INVALID_ARRAY.format(channels=channels))
 
     @staticmethod
-    def validate_image_size_for_file(
-        img: Image.Image, file_size: int, n: int, channels: int
-    ) -> None:
-        """Valida che l'immagine sia abbastanza grande per il file"""
-        if (img.width * img.height) * channels * n < file_size * 8:
-            raise ValueError(
-                ErrorMessages.IMAGE_TOO_SMALL_FILE.format(
-                    file_size=file_size, width=img.width, height=img.height
-                )
-            )
+    def validate_writable_array(arr: np.ndarray) -> None:
+        """Valida che un array possa essere modificato sul posto"""
+        if not arr.flags.writeable or not arr.flags.c_contiguous:
+            raise ValueError(ErrorMessages.ARRAY_NOT_WRITABLE)
+
+    @staticmethod
+    def validate_workers(workers: int) -> None:
+        """Valida il numero di worker per l'elaborazione parallela"""
+        if workers < 1:
+            raise ValueError(ErrorMessages.INVALID_WORKERS)
 
     @staticmethod
     def validate_div_for_images(
@@ -83,3 +83,13 @@ def cleanup_temp_file(file_path: str) -> None:
 def create_download_button(data, filename: str, mime: str, label: str) -> None:
     """Crea un pulsante di download"""
     st.download_button(label=label, data=data, file_name=filename, mime=mime)
+
+
+def get_session_backup():
+    """Sistema di backup dei parametri riservato alla sessione Streamlit corrente"""
+    from src.steganografia import ParameterBackup, backup_system
+
+    # Ogni sessione ha i propri parametri recenti; l'indice è condiviso
+    if "parameter_backup" not in st.session_state:
+        st.session_state["parameter_backup"] = ParameterBackup(backup_system.index)
+    return st.session_state["parameter_backup"]
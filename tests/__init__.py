@@ -8,5 +8,16 @@ Test organizzati per modulo:
 - test_validator.py: Test per il sistema di validazione
 - test_backup.py: Test per il sistema di backup
 - test_file_utils.py: Test per le utility di file
+- test_buffers.py: Test per la gestione dei buffer delle immagini
+- test_tiles.py: Test per l'elaborazione a bande
+- test_memmap_host.py: Test per gli host mappati in memoria
+- test_batch.py: Test per l'esecuzione batch
+- test_parallel.py: Test per l'elaborazione a segmenti
+- test_header.py: Test per l'intestazione dei parametri nell'immagine
+- test_param_index.py: Test per l'indice persistente dei parametri
+- test_archive.py: Test per gli archivi in streaming delle directory
+- test_compression.py: Test per i codec di compressione dei payload
+- test_payload_reader.py: Test per l'accesso casuale al payload nascosto
+- test_capacity.py: Test per la pianificazione della capacità dell'host
 - test_error_handling.py: Test per gestione errori e edge cases
 """
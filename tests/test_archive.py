@@ -0,0 +1,171 @@
+"""Test per il modulo archive"""
+
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from config.constants import StreamingConfig
+from steganografia.archive import DirectoryPacker, DirectoryUnpacker, FileUnpacker
+
+CONTENTS = {
+    "a.txt": b"hello " * 1000,
+    os.path.join("sub", "b.bin"): bytes(range(256)) * 7,
+    os.path.join("sub", "deep", "empty.dat"): b"",
+}
+
+
+def _make_tree(root):
+    """Crea una directory con i file di CONTENTS"""
+    for name, data in CONTENTS.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def _unpack(data, output_path, step=None):
+    """Passa data all'unpacker a blocchi di step byte (tutto insieme se None)"""
+    with DirectoryUnpacker(output_path) as unpacker:
+        step = step or len(data) or 1
+        for start in range(0, len(data), step):
+            unpacker.write(data[start : start + step])
+    return unpacker
+
+
+def _assert_tree(root):
+    """Verifica che root contenga esattamente i file di CONTENTS"""
+    for name, data in CONTENTS.items():
+        with open(os.path.join(root, name), "rb") as f:
+            assert f.read() == data
+
+
+class TestArchive:
+    """Test per l'archivio in streaming delle directory"""
+
+    def test_packer_produces_valid_zip(self, monkeypatch):
+        """Test archivio leggibile da zipfile, prodotto a piccoli blocchi"""
+        monkeypatch.setattr(StreamingConfig, "CHUNK_SIZE", 100)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _make_tree(temp_dir)
+            packer = DirectoryPacker(temp_dir)
+            chunks = []
+            while chunk := packer.read(37):
+                assert len(chunk) <= 37
+                chunks.append(chunk)
+
+            with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+                assert zf.testzip() is None
+                for name, data in CONTENTS.items():
+                    assert zf.read(name.replace(os.path.sep, "/")) == data
+
+    @pytest.mark.parametrize("step", [None, 1, 1000])
+    def test_unpacker_roundtrip(self, step):
+        """Test estrazione dell'archivio ricevuto a blocchi di qualsiasi dimensione"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            _make_tree(source)
+            data = DirectoryPacker(source).read()
+
+            output = os.path.join(temp_dir, "output")
+            unpacker = _unpack(data, output, step)
+            _assert_tree(output)
+            assert len(unpacker.files) == len(CONTENTS)
+
+    def test_unpacker_reads_seekable_archives(self):
+        """Test archivi con dimensioni nelle intestazioni locali e cartelle vuote"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr("stored.txt", b"stored data")
+            zf.writestr("deflated.txt", b"x" * 5000, zipfile.ZIP_DEFLATED)
+            zf.writestr("empty/", b"")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _unpack(buffer.getvalue(), temp_dir, 7)
+            with open(os.path.join(temp_dir, "stored.txt"), "rb") as f:
+                assert f.read() == b"stored data"
+            with open(os.path.join(temp_dir, "deflated.txt"), "rb") as f:
+                assert f.read() == b"x" * 5000
+            assert os.path.isdir(os.path.join(temp_dir, "empty"))
+
+    def test_unpacker_stays_inside_output(self):
+        """Test nomi con percorsi assoluti o .. estratti dentro la destinazione"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr("../evil.txt", b"evil")
+            zf.writestr("/abs/file.txt", b"abs")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "output")
+            unpacker = _unpack(buffer.getvalue(), output)
+            assert not os.path.exists(os.path.join(temp_dir, "evil.txt"))
+            assert sorted(unpacker.files) == sorted(
+                [
+                    os.path.join(output, "evil.txt"),
+                    os.path.join(output, "abs", "file.txt"),
+                ]
+            )
+
+    def test_unpacker_rejects_invalid_archives(self):
+        """Test archivio troncato, CRC errato e dati non zip"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            _make_tree(source)
+            data = DirectoryPacker(source).read()
+
+            with pytest.raises(ValueError, match="troncato"):
+                _unpack(data[: len(data) // 2], os.path.join(temp_dir, "half"))
+
+            corrupted = bytearray(data)
+            # Altera il CRC nel data descriptor del primo file
+            descriptor = corrupted.index(b"PK\x07\x08")
+            corrupted[descriptor + 4] ^= 0xFF
+            with pytest.raises(ValueError, match="CRC"):
+                _unpack(bytes(corrupted), os.path.join(temp_dir, "crc"))
+
+            with pytest.raises(ValueError, match="non valido"):
+                _unpack(b"not a zip archive", os.path.join(temp_dir, "garbage"))
+
+    @pytest.mark.parametrize("compress_type", [zipfile.ZIP_STORED, zipfile.ZIP_LZMA])
+    def test_file_unpacker_writes_output_path(self, compress_type):
+        """Test singolo file scritto in output_path, qualunque sia il nome"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compress_type) as zf:
+            zf.writestr("/some/other/name.txt", b"payload" * 300)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "recovered.txt")
+            with FileUnpacker(output) as unpacker:
+                unpacker.write(buffer.getvalue())
+            with open(output, "rb") as f:
+                assert f.read() == b"payload" * 300
+            assert unpacker.files == [output]
+            assert os.listdir(temp_dir) == ["recovered.txt"]
+
+    def test_file_unpacker_rejects_other_archives(self):
+        """Test archivio con più file, con una cartella o senza file"""
+        many = io.BytesIO()
+        with zipfile.ZipFile(many, "w") as zf:
+            zf.writestr("a.txt", b"a")
+            zf.writestr("b.txt", b"b")
+        folder = io.BytesIO()
+        with zipfile.ZipFile(folder, "w") as zf:
+            zf.writestr("empty/", b"")
+        empty = io.BytesIO()
+        with zipfile.ZipFile(empty, "w"):
+            pass
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "out.txt")
+            for data in (many, folder, empty):
+                with pytest.raises(ValueError, match="non valido"):
+                    with FileUnpacker(output) as unpacker:
+                        unpacker.write(data.getvalue())
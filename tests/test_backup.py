@@ -1,8 +1,10 @@
 """Test per il modulo backup"""
 
 import os
+import pickle
 import sys
 import tempfile
+import threading
 from pathlib import Path
 
 import pytest
@@ -12,7 +14,12 @@ src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
 from config.constants import DataType
-from steganografia.backup import backup_system
+from steganografia.backup import (
+    ParameterBackup,
+    backup_session,
+    backup_system,
+    current_backup,
+)
 
 
 class TestBackupSystem:
@@ -82,3 +89,131 @@ class TestAdvancedBackup:
                     os.unlink(corrupted_file)
                 except OSError:
                     pass
+
+    def test_backup_multiple_records(self):
+        """Test più record in un solo file JSON lines"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backup_file = os.path.join(temp_dir, "params.dat")
+            for i in range(5):
+                backup_system.save_backup_data(
+                    DataType.BINARY,
+                    {"n": i + 1, "div": i / 3, "size": i * 100, "zipMode": 0},
+                    backup_file,
+                    append=True,
+                )
+
+            records = backup_system.load_backup_records(backup_file)
+            assert [r["params"]["n"] for r in records] == [1, 2, 3, 4, 5]
+            assert records[2]["params"]["div"] == 2 / 3
+
+            # load_backup_data restituisce l'ultimo record
+            loaded = backup_system.load_backup_data(backup_file)
+            assert loaded == records[-1]
+
+            # Senza append il file contiene solo il nuovo record
+            backup_system.save_backup_data(
+                DataType.IMAGE, {"lsb": 1}, backup_file, append=False
+            )
+            assert len(backup_system.load_backup_records(backup_file)) == 1
+
+    def test_legacy_pickle_backup(self):
+        """Test lettura e migrazione dei vecchi backup pickle"""
+        legacy = {"type": DataType.IMAGE, "params": {"lsb": 2, "size": (4, 5)}}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backup_file = os.path.join(temp_dir, "legacy.dat")
+            with open(backup_file, "wb") as f:
+                pickle.dump(legacy, f)
+
+            assert backup_system.load_backup_data(backup_file) == legacy
+
+            migrated = os.path.join(temp_dir, "migrated.dat")
+            assert backup_system.migrate_backup_file(backup_file, migrated) == 1
+            loaded = backup_system.load_backup_data(migrated)
+            assert loaded["params"] == {"lsb": 2, "size": [4, 5]}
+
+    def test_unsafe_pickle_rejected(self):
+        """Test pickle che tenta di importare oggetti arbitrari"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backup_file = os.path.join(temp_dir, "unsafe.dat")
+            with open(backup_file, "wb") as f:
+                pickle.dump({"type": DataType.IMAGE, "params": os.getcwd}, f)
+
+            with pytest.raises(ValueError, match="Errore nel caricamento backup"):
+                backup_system.load_backup_data(backup_file)
+
+    def test_backup_unsupported_version(self):
+        """Test versione del formato non supportata"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backup_file = os.path.join(temp_dir, "future.dat")
+            with open(backup_file, "w", encoding="utf-8") as f:
+                f.write('{"format":"steganografia-backup","version":99}\n')
+
+            with pytest.raises(ValueError, match="non supportata"):
+                backup_system.load_backup_data(backup_file)
+
+
+class TestBackupSessions:
+    """Test per le sessioni di backup per contesto"""
+
+    def test_session_scope(self):
+        """Test sessione attiva solo dentro il blocco with"""
+        assert current_backup() is backup_system
+
+        with backup_session() as outer:
+            assert current_backup() is outer
+            current_backup().save_backup_data(DataType.IMAGE, {"lsb": 7})
+            assert outer.get_last_params(DataType.IMAGE) == {"lsb": 7}
+
+            inner_backup = ParameterBackup()
+            with backup_session(inner_backup):
+                assert current_backup() is inner_backup
+                assert current_backup().get_last_params(DataType.IMAGE) is None
+            assert current_backup() is outer
+
+        assert current_backup() is backup_system
+        assert backup_system.get_last_params(DataType.IMAGE) != {"lsb": 7}
+
+    def test_sessions_isolated_across_threads(self):
+        """Test thread concorrenti che non si sovrascrivono i parametri"""
+        barrier = threading.Barrier(4)
+        results = {}
+
+        def work(worker):
+            with backup_session():
+                current_backup().save_backup_data(DataType.BINARY, {"n": worker})
+                barrier.wait()
+                results[worker] = current_backup().get_last_params(DataType.BINARY)
+
+        threads = [threading.Thread(target=work, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == {w: {"n": w} for w in range(4)}
+
+    def test_concurrent_append_to_backup_file(self):
+        """Test record aggiunti da più thread senza righe interleaved"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backup_file = os.path.join(temp_dir, "params.dat")
+            backup = ParameterBackup()
+            backup.save_backup_data(DataType.IMAGE, {"i": -1}, backup_file)
+
+            def work(worker):
+                for i in range(25):
+                    backup.save_backup_data(
+                        DataType.IMAGE, {"i": worker * 100 + i}, backup_file, True
+                    )
+
+            threads = [threading.Thread(target=work, args=(w,)) for w in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            records = backup.load_backup_records(backup_file)
+            assert len(records) == 101
+            assert sorted(r["params"]["i"] for r in records)[1:] == sorted(
+                w * 100 + i for w in range(4) for i in range(25)
+            )
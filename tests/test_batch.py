@@ -0,0 +1,175 @@
+"""Test per il modulo batch"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from steganografia import batch
+from steganografia.batch import load_manifest, main, run_batch, run_job
+from steganografia.core import get_bin_file, get_image, get_message
+
+
+def _write_jobs(temp_dir):
+    """Crea host, payload e i job di esempio per ciascuna modalità"""
+    rng = np.random.default_rng(0)
+    host_path = os.path.join(temp_dir, "host.png")
+    secret_path = os.path.join(temp_dir, "secret.png")
+    payload_path = os.path.join(temp_dir, "payload.bin")
+    Image.fromarray(rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)).save(host_path)
+    Image.fromarray(rng.integers(0, 256, (10, 12, 3), dtype=np.uint8)).save(secret_path)
+    with open(payload_path, "wb") as f:
+        f.write(b"payload batch" * 10)
+
+    return [
+        {"host": "host.png", "message": "ciao", "mode": "string", "output": "s.png"},
+        {
+            "host": "host.png",
+            "payload": "secret.png",
+            "mode": "image",
+            "output": "out/i.png",
+            "params": {"msb": 4},
+        },
+        {
+            "host": "host.png",
+            "payload": "payload.bin",
+            "mode": "binary",
+            "output": "out/b.png",
+            "params": {"compression_mode": 1, "n": 2},
+        },
+        {"host": "missing.png", "message": "x", "mode": "string", "output": "m.png"},
+    ]
+
+
+class TestBatch:
+    """Test per l'esecuzione batch"""
+
+    def test_load_manifest_json_lines(self):
+        """Test lettura JSON lines con percorsi relativi al manifest"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = os.path.join(temp_dir, "jobs.jsonl")
+            with open(manifest, "w", encoding="utf-8") as f:
+                f.write('{"host": "a.png", "mode": "string", "output": "b.png"}\n\n')
+
+            jobs = load_manifest(manifest)
+            assert jobs == [
+                {
+                    "host": os.path.join(temp_dir, "a.png"),
+                    "mode": "string",
+                    "output": os.path.join(temp_dir, "b.png"),
+                }
+            ]
+
+    def test_run_job_results(self):
+        """Test job riusciti e falliti senza eccezioni"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = os.path.join(temp_dir, "jobs.json")
+            with open(manifest, "w", encoding="utf-8") as f:
+                json.dump(_write_jobs(temp_dir), f)
+            jobs = load_manifest(manifest)
+
+            string_result = run_job(jobs[0])
+            assert string_result["status"] == "ok"
+            assert string_result["seconds"] >= 0
+            with Image.open(jobs[0]["output"]) as img:
+                assert get_message(img) == "ciao"
+
+            image_result = run_job(jobs[1])
+            assert image_result["status"] == "ok"
+            params = image_result["params"]
+            assert params["msb"] == 4 and params["lsb"] == 1
+            with Image.open(jobs[1]["output"]) as img:
+                recovered = get_image(
+                    img,
+                    os.path.join(temp_dir, "r.png"),
+                    params["lsb"],
+                    params["msb"],
+                    params["div"],
+                    params["width"],
+                    params["height"],
+                )
+            assert recovered.size == (12, 10)
+
+            failed = run_job(jobs[3])
+            assert failed["status"] == "error"
+            assert "missing.png" in failed["error"]
+
+            bad_params = run_job(dict(jobs[0], params={"n": 3}))
+            assert bad_params["status"] == "error"
+
+    def test_run_batch_process_pool(self, monkeypatch):
+        """Test pool di processi con isolamento dei job falliti"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.chdir(temp_dir)
+            manifest = os.path.join(temp_dir, "jobs.json")
+            with open(manifest, "w", encoding="utf-8") as f:
+                json.dump(_write_jobs(temp_dir), f)
+            jobs = load_manifest(manifest)
+
+            results = sorted(
+                run_batch(jobs, workers=2, max_in_flight=2), key=lambda r: r["index"]
+            )
+            assert [r["status"] for r in results] == ["ok", "ok", "ok", "error"]
+
+            assert not os.path.exists(os.path.join(temp_dir, "tmp.zip"))
+
+            params = results[2]["params"]
+            with Image.open(jobs[2]["output"]) as img:
+                get_bin_file(
+                    img, "payload.out", 1, params["n"], params["div"], params["size"]
+                )
+            with open("payload.out", "rb") as f:
+                assert f.read() == b"payload batch" * 10
+
+    def test_run_batch_survives_worker_crash(self, monkeypatch):
+        """Test job che termina il processo: il pool viene ricreato"""
+        hide = batch._hide
+
+        def crashing_hide(job):
+            if job.get("message") == "crash":
+                os._exit(1)
+            return hide(job)
+
+        # I processi del pool vengono creati con fork e vedono la sostituzione
+        monkeypatch.setattr(batch, "_hide", crashing_hide)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = os.path.join(temp_dir, "jobs.json")
+            jobs = _write_jobs(temp_dir)[:3]
+            crash = {"host": "host.png", "message": "crash", "mode": "string"}
+            jobs = [jobs[0], dict(crash, output="c.png"), *jobs[1:], jobs[0]]
+            with open(manifest, "w", encoding="utf-8") as f:
+                json.dump(jobs, f)
+
+            results = sorted(
+                run_batch(load_manifest(manifest), workers=2, max_in_flight=2),
+                key=lambda r: r["index"],
+            )
+            assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+            assert [r["status"] for r in results] == ["ok", "error", "ok", "ok", "ok"]
+            assert "BrokenProcessPool" in results[1]["error"]
+            assert results[1]["seconds"] is None
+            assert all(r["seconds"] >= 0 for r in results if r["status"] == "ok")
+
+    def test_main_writes_results(self):
+        """Test entry point da riga di comando"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = os.path.join(temp_dir, "jobs.jsonl")
+            results_path = os.path.join(temp_dir, "results.jsonl")
+            with open(manifest, "w", encoding="utf-8") as f:
+                for job in _write_jobs(temp_dir)[:2]:
+                    f.write(json.dumps(job) + "\n")
+
+            exit_code = main([manifest, "--workers", "1", "--results", results_path])
+            assert exit_code == 0
+            with open(results_path, "r", encoding="utf-8") as f:
+                results = [json.loads(line) for line in f]
+            assert len(results) == 2
+            assert all(r["status"] == "ok" for r in results)
@@ -3,8 +3,11 @@
 import os
 import sys
 import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import pytest
 from PIL import Image
 
@@ -12,9 +15,20 @@ from PIL import Image
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
-from config.constants import CompressionMode
+from config.constants import CompressionMode, StreamingConfig
 from steganografia.backup import backup_system
-from steganografia.core import get_bin_file, hide_bin_file
+from steganografia.core import (
+    get_bin_file,
+    get_bin_file_array,
+    get_bin_file_memmap,
+    get_bin_member,
+    get_bin_member_memmap,
+    hide_bin_file,
+    hide_bin_file_array,
+    hide_bin_file_memmap,
+    list_bin_members,
+    list_bin_members_memmap,
+)
 
 
 class TestBinaryOperations:
@@ -363,3 +377,485 @@ class TestBinaryOperationsAdvanced:
 
             # Verifica che l'immagine risultante sia RGB
             assert result_img.mode == "RGB"
+
+
+class TestBinaryOperationsEngine:
+    """Test per le modalità di elaborazione (blocchi, array, bande, memmap, thread)"""
+
+    def test_hide_streaming_chunk_boundaries(self, monkeypatch):
+        """Test che la lettura a blocchi non dipenda dalla dimensione del blocco"""
+        rng = np.random.default_rng(0)
+        img = Image.fromarray(rng.integers(0, 256, (120, 90, 3), dtype=np.uint8))
+        payload = rng.integers(0, 256, 300, dtype=np.uint8).tobytes()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tmp_input_path = os.path.join(temp_dir, "input.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            with open(tmp_input_path, "wb") as f:
+                f.write(payload)
+
+            reference, n, div, size = hide_bin_file(
+                img, tmp_input_path, CompressionMode.NO_ZIP, n=3
+            )
+
+            # Blocchi da 7 byte: 56 bit non multipli di n=3
+            monkeypatch.setattr(StreamingConfig, "CHUNK_SIZE", 7)
+            chunked, _, _, _ = hide_bin_file(
+                img, tmp_input_path, CompressionMode.NO_ZIP, n=3
+            )
+            assert np.array_equal(np.array(chunked), np.array(reference))
+
+            get_bin_file(chunked, output_path, CompressionMode.NO_ZIP, n, div, size)
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+
+    def test_recover_partial_last_group(self):
+        """Test recupero quando la dimensione in bit non è multipla di n"""
+        rng = np.random.default_rng(1)
+        img = Image.fromarray(rng.integers(0, 256, (60, 60, 3), dtype=np.uint8))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tmp_input_path = os.path.join(temp_dir, "input.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+
+            for size, n in [(5, 3), (7, 5), (1, 6), (1001, 7)]:
+                payload = rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+                with open(tmp_input_path, "wb") as f:
+                    f.write(payload)
+
+                result_img, n, div, size = hide_bin_file(
+                    img, tmp_input_path, CompressionMode.NO_ZIP, n=n
+                )
+                get_bin_file(
+                    result_img, output_path, CompressionMode.NO_ZIP, n, div, size
+                )
+
+                with open(output_path, "rb") as f:
+                    assert f.read() == payload
+
+    def test_hide_and_recover_binary_array(self):
+        """Test API su array NumPy RGBA"""
+        arr = np.zeros((50, 40, 4), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tmp_input_path = os.path.join(temp_dir, "input.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            with open(tmp_input_path, "wb") as f:
+                f.write(b"array payload" * 20)
+
+            result, params = hide_bin_file_array(arr, tmp_input_path)
+            assert result is not arr
+            assert params["channels"] == 4
+            assert params["payload_bits"] == 260 * 8
+
+            get_bin_file_array(
+                result,
+                output_path,
+                CompressionMode.NO_ZIP,
+                params["n"],
+                params["div"],
+                params["size"],
+            )
+            with open(output_path, "rb") as f:
+                assert f.read() == b"array payload" * 20
+
+    @pytest.mark.parametrize("size", [899, 900])
+    def test_hide_and_recover_full_capacity(self, size):
+        """Test payload che arriva all'ultimo campione dell'host"""
+        arr = np.random.default_rng(4).integers(0, 256, (30, 40, 3), np.uint8)
+        payload = np.random.default_rng(size).bytes(size)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "input.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            with open(input_path, "wb") as f:
+                f.write(payload)
+
+            # Con div < 1 due gruppi cadrebbero nello stesso campione
+            result, params = hide_bin_file_array(arr, input_path, n=2)
+            assert params["div"] >= 1.0
+
+            get_bin_file_array(
+                result, output_path, CompressionMode.NO_ZIP, 2, params["div"], size
+            )
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+
+    @pytest.mark.parametrize("extension", ["ppm", "bmp"])
+    def test_hide_and_recover_binary_memmap(self, extension):
+        """Test host mappato in memoria identico all'occultamento su immagine"""
+        rng = np.random.default_rng(5)
+        img = Image.fromarray(rng.integers(0, 256, (21, 31, 3), dtype=np.uint8))
+        payload = rng.integers(0, 256, 300, dtype=np.uint8).tobytes()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            host_path = os.path.join(temp_dir, f"host.{extension}")
+            result_path = os.path.join(temp_dir, f"result.{extension}")
+            tmp_input_path = os.path.join(temp_dir, "input.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            img.save(host_path)
+            with open(tmp_input_path, "wb") as f:
+                f.write(payload)
+
+            expected = hide_bin_file(img, tmp_input_path, CompressionMode.NO_ZIP, n=5)
+            params = hide_bin_file_memmap(
+                host_path,
+                tmp_input_path,
+                CompressionMode.NO_ZIP,
+                n=5,
+                output_path=result_path,
+            )
+            assert params["host_path"] == result_path
+            assert (params["n"], params["div"], params["size"]) == expected[1:]
+            with Image.open(result_path) as result_img:
+                assert np.array_equal(np.array(result_img), np.array(expected[0]))
+            with Image.open(host_path) as host_img:
+                assert np.array_equal(np.array(host_img), np.array(img))
+
+            get_bin_file_memmap(
+                result_path,
+                output_path,
+                CompressionMode.NO_ZIP,
+                params["n"],
+                params["div"],
+                params["size"],
+            )
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+
+    def test_binary_memmap_32bpp_bmp_matches_pil(self):
+        """Test BMP a 32 bit: stessi campioni per host mappato e immagine PIL"""
+        rng = np.random.default_rng(7)
+        arr = rng.integers(0, 256, (13, 17, 4), dtype=np.uint8)
+        payload = rng.integers(0, 256, 200, dtype=np.uint8).tobytes()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            host_path = os.path.join(temp_dir, "host.bmp")
+            result_path = os.path.join(temp_dir, "result.bmp")
+            pil_result_path = os.path.join(temp_dir, "pil_result.bmp")
+            tmp_input_path = os.path.join(temp_dir, "input.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            Image.fromarray(arr, "RGBA").save(host_path)
+            with open(tmp_input_path, "wb") as f:
+                f.write(payload)
+
+            # Memmap -> PIL
+            with Image.open(host_path) as host_img:
+                assert host_img.mode == "RGB"
+                expected = hide_bin_file(
+                    host_img, tmp_input_path, CompressionMode.NO_ZIP, n=3
+                )
+            params = hide_bin_file_memmap(
+                host_path,
+                tmp_input_path,
+                CompressionMode.NO_ZIP,
+                n=3,
+                output_path=result_path,
+            )
+            assert (params["n"], params["div"], params["size"]) == expected[1:]
+            with Image.open(result_path) as result_img:
+                assert np.array_equal(np.array(result_img), np.array(expected[0]))
+                get_bin_file(
+                    result_img,
+                    output_path,
+                    CompressionMode.NO_ZIP,
+                    params["n"],
+                    params["div"],
+                    params["size"],
+                )
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+            # Il quarto byte di ogni pixel resta intatto
+            stored = np.fromfile(result_path, dtype=np.uint8)
+            original = np.fromfile(host_path, dtype=np.uint8)
+            assert np.array_equal(
+                stored[3 - arr.size :: 4], original[3 - arr.size :: 4]
+            )
+
+            # PIL -> memmap, con il risultato salvato di nuovo a 32 bit
+            alpha = arr[:, :, 3:]
+            Image.fromarray(
+                np.concatenate((np.array(expected[0]), alpha), axis=2), "RGBA"
+            ).save(pil_result_path)
+            os.remove(output_path)
+            get_bin_file_memmap(
+                pil_result_path,
+                output_path,
+                CompressionMode.NO_ZIP,
+                *expected[1:],
+            )
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+
+    def test_hide_and_recover_binary_memmap_raw_in_place(self):
+        """Test host raw modificato sul posto"""
+        arr = np.zeros((16, 16, 4), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            host_path = os.path.join(temp_dir, "host.raw")
+            tmp_input_path = os.path.join(temp_dir, "input.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            arr.tofile(host_path)
+            with open(tmp_input_path, "wb") as f:
+                f.write(b"raw payload")
+
+            expected, _ = hide_bin_file_array(arr, tmp_input_path)
+            params = hide_bin_file_memmap(
+                host_path, tmp_input_path, raw_shape=(16, 16, 4)
+            )
+            stored = np.fromfile(host_path, dtype=np.uint8).reshape((16, 16, 4))
+            assert np.array_equal(stored, expected)
+
+            get_bin_file_memmap(
+                host_path,
+                output_path,
+                CompressionMode.NO_ZIP,
+                params["n"],
+                params["div"],
+                params["size"],
+                raw_shape=(16, 16, 4),
+            )
+            with open(output_path, "rb") as f:
+                assert f.read() == b"raw payload"
+
+    def test_hide_binary_workers_identical(self, monkeypatch):
+        """Test occultamento parallelo identico a quello sequenziale"""
+        monkeypatch.setattr(StreamingConfig, "MIN_SEGMENT_GROUPS", 16)
+        monkeypatch.setattr(StreamingConfig, "CHUNK_SIZE", 97)
+        rng = np.random.default_rng(6)
+        arr = rng.integers(0, 256, (30, 40, 3), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tmp_input_path = os.path.join(temp_dir, "input.bin")
+            with open(tmp_input_path, "wb") as f:
+                f.write(rng.integers(0, 256, 400, dtype=np.uint8).tobytes())
+
+            # div < 1 fa ricadere più gruppi sullo stesso campione
+            for n, div in [(3, 0), (2, 1.0), (4, 0.4)]:
+                expected, _ = hide_bin_file_array(arr, tmp_input_path, n=n, div=div)
+                for workers in [2, 5]:
+                    result, _ = hide_bin_file_array(
+                        arr, tmp_input_path, n=n, div=div, workers=workers
+                    )
+                    assert np.array_equal(result, expected)
+
+            with pytest.raises(ValueError, match="worker"):
+                hide_bin_file_array(arr, tmp_input_path, workers=0)
+
+    def test_recover_binary_workers_identical(self, monkeypatch):
+        """Test recupero parallelo identico a quello sequenziale"""
+        monkeypatch.setattr(StreamingConfig, "MIN_SEGMENT_GROUPS", 16)
+        monkeypatch.setattr(StreamingConfig, "CHUNK_SIZE", 61)
+        rng = np.random.default_rng(8)
+        arr = rng.integers(0, 256, (30, 40, 4), dtype=np.uint8)
+        payload = rng.integers(0, 256, 555, dtype=np.uint8).tobytes()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            tmp_input_path = os.path.join(temp_dir, "input.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            with open(tmp_input_path, "wb") as f:
+                f.write(payload)
+
+            for n, div in [(3, 0), (7, 0), (5, 2.3)]:
+                result, params = hide_bin_file_array(arr, tmp_input_path, n=n, div=div)
+                for workers in [1, 3, 8]:
+                    get_bin_file_array(
+                        result,
+                        output_path,
+                        CompressionMode.NO_ZIP,
+                        params["n"],
+                        params["div"],
+                        params["size"],
+                        workers=workers,
+                    )
+                    with open(output_path, "rb") as f:
+                        assert f.read() == payload
+
+    def test_concurrent_compressed_hide_and_recover(self, monkeypatch):
+        """Test occultamenti compressi concorrenti senza archivi temporanei condivisi"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.chdir(temp_dir)
+
+            def roundtrip(job):
+                source = os.path.join(temp_dir, f"source{job}")
+                os.makedirs(os.path.join(source, "sub"))
+                contents = {
+                    "a.txt": f"job {job} ".encode() * (50 + job),
+                    os.path.join("sub", "b.bin"): os.urandom(300 + job),
+                }
+                for name, data in contents.items():
+                    with open(os.path.join(source, name), "wb") as f:
+                        f.write(data)
+
+                img = Image.new("RGB", (120, 120), color=(job, 0, 0))
+                result_img, n, div, size = hide_bin_file(
+                    img, source, CompressionMode.DIR
+                )
+                output = os.path.join(temp_dir, f"output{job}")
+                get_bin_file(result_img, output, CompressionMode.DIR, n, div, size)
+
+                for name, data in contents.items():
+                    with open(os.path.join(output, name), "rb") as f:
+                        assert f.read() == data
+
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(roundtrip, range(8)))
+
+            assert not os.path.exists(os.path.join(temp_dir, "tmp.zip"))
+
+    def test_compressed_hide_without_temporary_files(self, monkeypatch):
+        """Test payload compresso passato all'occultamento senza file su disco"""
+        img = Image.new("RGB", (150, 150), color="white")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            os.makedirs(source)
+            with open(os.path.join(source, "data.txt"), "wb") as f:
+                f.write(b"compressible " * 400)
+            output = os.path.join(temp_dir, "output")
+
+            def no_temp_files(*args, **kwargs):
+                raise AssertionError("file temporaneo non previsto")
+
+            with monkeypatch.context() as patch:
+                patch.setattr(tempfile, "mkstemp", no_temp_files)
+                patch.setattr(tempfile, "TemporaryFile", no_temp_files)
+                result_img, n, div, size = hide_bin_file(
+                    img, source, CompressionMode.DIR
+                )
+
+            assert size < 400
+            get_bin_file(result_img, output, CompressionMode.DIR, n, div, size)
+            with open(os.path.join(output, "data.txt"), "rb") as f:
+                assert f.read() == b"compressible " * 400
+
+    def test_recover_file_mode_outside_cwd(self, monkeypatch):
+        """Test FILE compresso e recuperato in un percorso assoluto fuori dalla cwd"""
+        img = Image.new("RGB", (100, 100), color="white")
+
+        with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryDirectory() as cwd:
+            monkeypatch.chdir(cwd)
+            input_path = os.path.join(temp_dir, "input.txt")
+            with open(input_path, "wb") as f:
+                f.write(b"compressible " * 400)
+            output = os.path.join(temp_dir, "nested", "output.txt")
+
+            result_img, n, div, size = hide_bin_file(
+                img, input_path, CompressionMode.FILE
+            )
+            assert size < 400
+
+            get_bin_file(result_img, output, CompressionMode.FILE, n, div, size)
+            with open(output, "rb") as f:
+                assert f.read() == b"compressible " * 400
+            assert os.listdir(cwd) == []
+
+    def test_recover_legacy_stored_file_archive(self):
+        """Test archivi FILE non compressi con il percorso originale nel nome"""
+        img = Image.new("RGB", (100, 100), color="white")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            legacy = os.path.join(temp_dir, "legacy.zip")
+            with zipfile.ZipFile(legacy, "w") as zf:
+                zf.writestr("home/user/input.txt", b"legacy data " * 50)
+            output = os.path.join(temp_dir, "output.txt")
+
+            # Le versioni precedenti nascondevano lo zip così com'era
+            result_img, n, div, size = hide_bin_file(
+                img, legacy, CompressionMode.NO_ZIP
+            )
+            get_bin_file(result_img, output, CompressionMode.FILE, n, div, size)
+            with open(output, "rb") as f:
+                assert f.read() == b"legacy data " * 50
+
+    def test_list_and_get_single_member(self):
+        """Test elenco dei file e recupero di uno solo da una directory nascosta"""
+        img = Image.new("RGB", (120, 120), color="white")
+        contents = {
+            "a.txt": b"primo file " * 200,
+            os.path.join("conf", "app.ini"): b"[app]\nchiave=valore\n",
+            os.path.join("conf", "empty.dat"): b"",
+        }
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            for name, data in contents.items():
+                path = os.path.join(source, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+
+            result_img, n, div, size = hide_bin_file(
+                img, source, CompressionMode.DIR, header=True
+            )
+            members = list_bin_members(result_img)
+            assert sorted(members) == ["a.txt", "conf/app.ini", "conf/empty.dat"]
+
+            output = os.path.join(temp_dir, "out", "app.ini")
+            get_bin_member(
+                result_img,
+                os.path.join("conf", "app.ini"),
+                output,
+                CompressionMode.DIR,
+                n,
+                div,
+                size,
+            )
+            with open(output, "rb") as f:
+                assert f.read() == b"[app]\nchiave=valore\n"
+
+            with pytest.raises(ValueError, match="non presente"):
+                get_bin_member(result_img, "missing.txt", output)
+            with pytest.raises(ValueError, match="non presente"):
+                get_bin_member(result_img, "conf/", output)
+
+    def test_get_single_member_memmap(self):
+        """Test recupero di un file da un host mappato in memoria"""
+        host = np.random.default_rng(3).integers(0, 256, (60, 60, 3), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            os.makedirs(source)
+            for i in range(3):
+                with open(os.path.join(source, f"file{i}.txt"), "wb") as f:
+                    f.write(f"contenuto {i} ".encode() * 50)
+            host_path = os.path.join(temp_dir, "host.ppm")
+            Image.fromarray(host).save(host_path)
+            output = os.path.join(temp_dir, "file1.txt")
+
+            params = hide_bin_file_memmap(host_path, source, CompressionMode.DIR)
+            members = list_bin_members_memmap(
+                host_path,
+                CompressionMode.DIR,
+                params["n"],
+                params["div"],
+                params["size"],
+            )
+            assert sorted(members) == ["file0.txt", "file1.txt", "file2.txt"]
+
+            get_bin_member_memmap(
+                host_path,
+                "file1.txt",
+                output,
+                CompressionMode.DIR,
+                params["n"],
+                params["div"],
+                params["size"],
+            )
+            with open(output, "rb") as f:
+                assert f.read() == b"contenuto 1 " * 50
+
+    def test_member_access_requires_archive(self):
+        """Test accesso ai singoli file di un payload non compresso o errato"""
+        img = Image.new("RGB", (60, 60), color="white")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "input.txt")
+            with open(path, "wb") as f:
+                f.write(b"not an archive " * 20)
+
+            result_img, n, div, size = hide_bin_file(img, path)
+            with pytest.raises(ValueError, match="compresso"):
+                list_bin_members(result_img, CompressionMode.NO_ZIP, n, div, size)
+            with pytest.raises(ValueError, match="non valido"):
+                list_bin_members(result_img, CompressionMode.DIR, n, div, size)
@@ -3,11 +3,27 @@
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Aggiungi il percorso src al Python path
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
-from steganografia.bit_operations import binary_convert, binary_convert_back
+from steganografia.bit_operations import (
+    accumulate_positions,
+    binary_convert,
+    binary_convert_back,
+    get_low_bits,
+    group_targets,
+    pack_groups,
+    position_at,
+    regroup_bits,
+    set_last_bit,
+    set_last_n_bits,
+    set_low_bits,
+    string_to_bytes,
+    unpack_groups,
+)
 
 
 class TestBitOperations:
@@ -32,3 +48,65 @@ class TestBitOperations:
         binary = binary_convert(original)
         converted_back = binary_convert_back(binary)
         assert converted_back == original
+
+    def test_set_last_bits_helpers(self):
+        """Test helper su stringhe per la modifica dei bit meno significativi"""
+        assert set_last_bit(0b10101010, "1") == 0b10101011
+        assert set_last_n_bits(0b11111111, "010", 3) == 0b11111010
+        assert set_last_n_bits(0b00000000, "11", 8) == 0b00000011
+
+    def test_string_to_bytes(self):
+        """Test conversione stringa di bit -> bytes (bit finali incompleti ignorati)"""
+        assert string_to_bytes("0100100001101001101") == bytearray(b"Hi")
+
+
+class TestBitKernels:
+    """Test per i kernel vettoriali sui bit"""
+
+    def test_set_and_get_low_bits(self):
+        """Test scrittura e lettura degli ultimi n bit su indici arbitrari"""
+        buffer = np.full(10, 0b10110110, dtype=np.uint8)
+        indices = np.array([1, 4, 9])
+        set_low_bits(buffer, indices, np.array([0, 5, 7], dtype=np.uint8), 3)
+
+        assert list(buffer[indices]) == [0b10110000, 0b10110101, 0b10110111]
+        assert list(get_low_bits(buffer, indices, 3)) == [0, 5, 7]
+        assert buffer[0] == 0b10110110
+
+    def test_regroup_bits(self):
+        """Test riorganizzazione di un flusso da k bit in gruppi da m bit"""
+        values = np.array([0b101, 0b011], dtype=np.uint8)
+        assert list(unpack_groups(values, 3)) == [1, 0, 1, 0, 1, 1]
+        assert list(pack_groups(unpack_groups(values, 3), 2)) == [0b10, 0b10, 0b11]
+        # L'ultimo gruppo viene completato con zeri a destra
+        assert list(regroup_bits(values, 3, 4)) == [0b1010, 0b1100]
+
+    def test_accumulate_positions_matches_float_cursor(self):
+        """Test che le posizioni coincidano con il cursore accumulato in sequenza"""
+        for div, start in [(2.4, 0.0), (0.7, 3.1), (1.0000001, 0.0)]:
+            expected, ind = [], start
+            for _ in range(5000):
+                expected.append(ind)
+                ind += div
+            assert list(accumulate_positions(div, 5000, start)) == expected
+
+    def test_position_at_matches_float_cursor(self):
+        """Test valore del cursore dopo count somme senza accumulare in sequenza"""
+        for div, start in [(2.4, 0.0), (0.7, 3.1), (2.5, 0.0), (0.75, 2.0**40)]:
+            positions = accumulate_positions(div, 20001, start)
+            for count in [0, 1, 2, 3, 1000, 12345, 20000]:
+                assert position_at(div, count, start) == positions[count]
+
+    def test_group_targets_segments_match_full_run(self):
+        """Test posizioni di un segmento identiche a quelle del calcolo completo"""
+        div = 2.7
+        positions = accumulate_positions(div, 3000)
+        rounded = np.rint(positions).astype(np.int64)
+        assert np.array_equal(group_targets(div, 0, 3000), rounded)
+        assert np.array_equal(group_targets(div, 1000, 1500), rounded[1000:1500])
+        # Segmento contato da un cursore già avanzato di 200 gruppi
+        base = position_at(div, 200)
+        assert np.array_equal(group_targets(div, 100, 400, base=base), rounded[300:600])
+        # int(ind) delle immagini, solo le posizioni sotto il limite
+        floors = group_targets(div, 0, 3000, rounding=np.floor, limit=100)
+        assert np.array_equal(floors, positions[positions < 100].astype(np.int64))
@@ -0,0 +1,55 @@
+"""Test per il modulo buffers"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from steganografia.buffers import array_to_image, flat_view, image_to_array
+
+
+class TestBuffers:
+    """Test per la gestione dei buffer delle immagini"""
+
+    def test_image_to_array_read_only(self):
+        """Test vista in sola lettura senza copia esplicita"""
+        img = Image.new("RGB", (20, 10), color="red")
+        arr = image_to_array(img)
+
+        assert arr.shape == (10, 20, 3)
+        assert not arr.flags.writeable
+
+    def test_image_to_array_writable(self):
+        """Test buffer modificabile indipendente dall'immagine"""
+        img = Image.new("RGB", (20, 10), color="red")
+        arr = image_to_array(img, writable=True)
+        arr[0, 0] = (1, 2, 3)
+
+        assert arr.flags.writeable
+        assert img.getpixel((0, 0)) == (255, 0, 0)
+
+    def test_flat_view_shares_memory(self):
+        """Test vista piatta senza copie"""
+        arr = np.zeros((4, 5, 3), dtype=np.uint8)
+        flat = flat_view(arr)
+        flat[7] = 9
+
+        assert np.shares_memory(flat, arr)
+        assert arr[0, 2, 1] == 9
+
+        with pytest.raises(ValueError):
+            flat_view(arr[:, ::2])
+
+    def test_array_to_image_roundtrip(self):
+        """Test conversione array -> immagine"""
+        arr = np.arange(60, dtype=np.uint8).reshape(4, 5, 3)
+        img = array_to_image(arr)
+
+        assert img.size == (5, 4)
+        assert np.array_equal(np.asarray(img), arr)
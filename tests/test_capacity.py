@@ -0,0 +1,114 @@
+"""Test per il modulo capacity"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from steganografia.capacity import CapacityPlanner
+
+
+def _loop_n(samples, bits):
+    """n minimo calcolato incrementando n come nelle versioni precedenti"""
+    n = 1
+    while samples * n < bits:
+        n += 1
+        if n > 8:
+            return 0
+    return n
+
+
+class TestCapacityPlanner:
+    """Test per la pianificazione della capacità"""
+
+    @pytest.mark.parametrize("channels", [1, 3, 4])
+    @pytest.mark.parametrize("reserved", [0, 288])
+    def test_plan_file_matches_loop(self, channels, reserved):
+        """Test n e div identici al calcolo incrementale"""
+        for side in (20, 37, 100):
+            samples = side * side * channels - reserved
+            for size in (1, 50, 499, 500, 2000, samples, samples + 1):
+                expected = _loop_n(samples, size * 8)
+                if expected == 0:
+                    with pytest.raises(ValueError, match="troppo piccola"):
+                        CapacityPlanner.plan_file(
+                            side, side, channels, size, 0, reserved
+                        )
+                    continue
+
+                plan = CapacityPlanner.plan_file(
+                    side, side, channels, size, 0, reserved
+                )
+                assert plan["n"] == expected
+                assert plan["div"] == max(1.0, (samples - 1) * expected / (size * 8))
+                assert plan["headroom_bits"] == samples * expected - size * 8
+                assert 0 < plan["modified_fraction"] < plan["used_fraction"] <= 1
+
+    def test_plan_image_matches_loop(self):
+        """Test lsb minimo e div per le immagini"""
+        for host in ((10, 10), (50, 40), (64, 64)):
+            for secret in ((10, 10), (30, 30), (64, 64)):
+                for msb in (1, 4, 8):
+                    samples = host[0] * host[1] * 3
+                    bits = secret[0] * secret[1] * 3 * msb
+                    expected = _loop_n(samples, bits)
+                    if expected == 0:
+                        with pytest.raises(ValueError, match="troppo piccola"):
+                            CapacityPlanner.plan_image(host, secret, msb)
+                        continue
+
+                    plan = CapacityPlanner.plan_image(host, secret, msb)
+                    assert plan["lsb"] == expected
+                    assert plan["div"] == (samples * expected) / bits
+                    assert plan["headroom_bits"] == samples * expected - bits
+
+    def test_plan_with_fixed_n(self):
+        """Test n indicato: verifica della capacità senza cambiarlo"""
+        plan = CapacityPlanner.plan_file(100, 100, 3, 1000, n=4)
+        assert plan["n"] == 4
+        assert plan["used_fraction"] == 2000 / 30000
+        assert plan["modified_fraction"] == pytest.approx(2000 / 30000 * 15 / 16)
+        with pytest.raises(ValueError, match="troppo piccola"):
+            CapacityPlanner.plan_file(10, 10, 3, 100, n=2)
+
+    def test_plan_files_matches_scalar(self):
+        """Test valutazione vettoriale identica a quella del singolo host"""
+        rng = np.random.default_rng(0)
+        widths = rng.integers(1, 400, 2000)
+        heights = rng.integers(1, 400, 2000)
+        channels = rng.choice([3, 4], 2000)
+
+        plans = CapacityPlanner.plan_files(widths, heights, channels, 30000, 288)
+        for i, shape in enumerate(zip(widths, heights, channels)):
+            args = (*map(int, shape), 30000, 0, 288)
+            if not plans["fits"][i]:
+                assert plans["n"][i] == 0
+                with pytest.raises(ValueError):
+                    CapacityPlanner.plan_file(*args)
+                continue
+            plan = CapacityPlanner.plan_file(*args)
+            assert plans["n"][i] == plan["n"]
+            assert plans["div"][i] == plan["div"]
+            assert plans["headroom_bits"][i] == plan["headroom_bits"]
+            assert plans["modified_fraction"][i] == pytest.approx(
+                plan["modified_fraction"]
+            )
+
+    def test_plan_images_picks_host(self):
+        """Test scelta dell'host che modifica meno campioni"""
+        widths = np.array([10, 64, 128, 256])
+        heights = np.array([10, 64, 128, 256])
+
+        plans = CapacityPlanner.plan_images(widths, heights, (64, 64), msb=4)
+        assert plans["fits"].tolist() == [False, True, True, True]
+        assert plans["lsb"].tolist() == [0, 4, 1, 1]
+        assert np.isnan(plans["div"][0])
+        best = int(np.nanargmin(plans["modified_fraction"]))
+        assert best == 3
+        plan = CapacityPlanner.plan_image((256, 256), (64, 64), 4)
+        assert plans["div"][best] == plan["div"]
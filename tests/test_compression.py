@@ -0,0 +1,181 @@
+"""Test per il modulo compression"""
+
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from config.constants import CodecConfig, CompressionCodec, CompressionMode, DataType
+from steganografia import get_bin_file, get_last_params, hide_bin_file
+from steganografia.compression import (
+    choose_codec,
+    estimate_codecs,
+    resolve_codec,
+    zip_method,
+)
+from steganografia.file_utils import open_payload
+
+
+def _write_tree(root, compressible=True):
+    """Crea una directory con alcuni file di testo (o casuali)"""
+    os.makedirs(os.path.join(root, "sub"))
+    for i in range(5):
+        name = os.path.join(root, "sub" if i % 2 else "", f"file{i}.txt")
+        with open(name, "wb") as f:
+            if compressible:
+                f.write(f"riga {i} del file di prova\n".encode() * 400)
+            else:
+                f.write(os.urandom(4000))
+
+
+class TestCompression:
+    """Test per i codec di compressione"""
+
+    def test_resolve_codec_defaults(self):
+        """Test codec predefiniti per ciascuna modalità"""
+        assert resolve_codec(None, "x", CompressionMode.NO_ZIP, 100) is None
+        assert (
+            resolve_codec(None, "x", CompressionMode.FILE, 100)
+            == CompressionCodec.DEFLATE
+        )
+        assert (
+            resolve_codec(None, "x", CompressionMode.DIR, 100)
+            == CompressionCodec.DEFLATE
+        )
+        assert (
+            resolve_codec(CompressionCodec.LZMA, "x", CompressionMode.DIR, 100)
+            == CompressionCodec.LZMA
+        )
+
+    def test_stored_directory_records_applied_codec(self):
+        """Test STORED per le directory registrato come il deflate-0 applicato"""
+        stored = CompressionCodec.STORED
+        assert resolve_codec(stored, "x", CompressionMode.FILE, 100) == stored
+        codec = resolve_codec(stored, "x", CompressionMode.DIR, 100)
+        assert codec == CompressionCodec.DEFLATE_STORE
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _write_tree(temp_dir)
+            with open_payload(temp_dir, CompressionMode.DIR, stored) as (stream, _):
+                with zipfile.ZipFile(stream) as zf:
+                    methods = {info.compress_type for info in zf.infolist()}
+            assert methods == {zip_method(codec)[0]}
+
+    @pytest.mark.parametrize("codec", CompressionCodec.ALL)
+    def test_archive_with_codec(self, codec):
+        """Test archivio FILE scritto con il metodo zip del codec"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "input.txt")
+            with open(path, "wb") as f:
+                f.write(b"abc" * 1000)
+
+            with open_payload(path, CompressionMode.FILE, codec) as (stream, _):
+                with zipfile.ZipFile(stream) as zf:
+                    info = zf.infolist()[0]
+                    assert info.compress_type == zip_method(codec)[0]
+                    assert zf.read(info) == b"abc" * 1000
+
+    def test_estimate_codecs(self, monkeypatch):
+        """Test stima su un campione di payload comprimibile e casuale"""
+        monkeypatch.setattr(CodecConfig, "SAMPLE_SIZE", 4096)
+        monkeypatch.setattr(CodecConfig, "SAMPLE_BLOCK", 512)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            text_dir = os.path.join(temp_dir, "text")
+            random_dir = os.path.join(temp_dir, "random")
+            _write_tree(text_dir)
+            _write_tree(random_dir, compressible=False)
+
+            text = estimate_codecs(text_dir, CompressionMode.DIR)
+            noise = estimate_codecs(random_dir, CompressionMode.DIR)
+
+        assert set(text) == set(CompressionCodec.ALL)
+        assert text[CompressionCodec.STORED][0] > 5 * 400 * 20
+        assert text[CompressionCodec.DEFLATE][0] < text[CompressionCodec.STORED][0] / 4
+        assert noise[CompressionCodec.DEFLATE][0] >= 5 * 4000
+
+    def test_choose_codec_minimizes_n(self, monkeypatch):
+        """Test codec scelto per ridurre n, solo tra quelli entro il tempo"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _write_tree(temp_dir)
+            stored = estimate_codecs(temp_dir, CompressionMode.DIR)[
+                CompressionCodec.STORED
+            ][0]
+            # Senza compressione servirebbero 3 bit per campione
+            capacity = stored * 8 // 3
+
+            codec = choose_codec(temp_dir, CompressionMode.DIR, capacity)
+            assert codec != CompressionCodec.STORED
+
+            monkeypatch.setattr(CodecConfig, "TIME_BUDGET", -1.0)
+            codec = choose_codec(temp_dir, CompressionMode.DIR, capacity)
+            assert codec == CompressionCodec.STORED
+
+    @pytest.mark.parametrize("codec", [*CompressionCodec.ALL, CompressionCodec.AUTO])
+    def test_hide_and_recover_directory_with_codec(self, codec):
+        """Test occultamento e recupero di una directory con ogni codec"""
+        img = Image.new("RGB", (200, 200), color="white")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            _write_tree(source)
+            output = os.path.join(temp_dir, "output")
+
+            result_img, n, div, size = hide_bin_file(
+                img, source, CompressionMode.DIR, codec=codec
+            )
+            params = get_last_params(DataType.BINARY)
+            assert params["codec"] in CompressionCodec.ALL
+            assert params["codec"] != CompressionCodec.STORED
+            if codec == CompressionCodec.STORED:
+                assert params["codec"] == CompressionCodec.DEFLATE_STORE
+            elif codec != CompressionCodec.AUTO:
+                assert params["codec"] == codec
+
+            get_bin_file(result_img, output, CompressionMode.DIR, n, div, size)
+            for root, _, files in os.walk(source):
+                for name in files:
+                    path = os.path.join(root, name)
+                    recovered = os.path.join(output, os.path.relpath(path, source))
+                    with open(path, "rb") as f, open(recovered, "rb") as g:
+                        assert f.read() == g.read()
+
+    def test_hide_file_with_codec(self):
+        """Test FILE con codec: payload compresso e recupero corretto"""
+        img = Image.new("RGB", (100, 100), color="white")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "input.txt")
+            with open(path, "wb") as f:
+                f.write(b"contenuto ripetuto " * 500)
+
+            _, _, _, stored_size = hide_bin_file(
+                img, path, CompressionMode.FILE, codec=CompressionCodec.STORED
+            )
+            result_img, n, div, size = hide_bin_file(
+                img, path, CompressionMode.FILE, codec=CompressionCodec.BZIP2
+            )
+            assert size < stored_size / 10
+
+            output = os.path.join(temp_dir, "output.txt")
+            get_bin_file(result_img, output, CompressionMode.FILE, n, div, size)
+            with open(output, "rb") as f:
+                assert f.read() == b"contenuto ripetuto " * 500
+
+    def test_invalid_codec(self):
+        """Test codec sconosciuto o usato senza compressione"""
+        img = Image.new("RGB", (50, 50))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "input.txt")
+            with open(path, "wb") as f:
+                f.write(b"data")
+
+            with pytest.raises(ValueError, match="Codec"):
+                hide_bin_file(img, path, CompressionMode.FILE, codec="zstd")
+            with pytest.raises(ValueError, match="Codec"):
+                hide_bin_file(img, path, codec=CompressionCodec.DEFLATE)
@@ -15,6 +15,7 @@ sys.path.insert(0, str(src_path))
 from config.constants import CompressionMode, DataType
 from steganografia.backup import backup_system
 from steganografia.bit_operations import set_last_n_bits
+from steganografia.capacity import CapacityPlanner
 from steganografia.core import (
     get_last_params,
     get_message,
@@ -55,7 +56,7 @@ class TestErrorHandling:
 
         # Test immagine troppo piccola per file
         with pytest.raises(ValueError):
-            ParameterValidator.validate_image_size_for_file(small_img, 10000, 1, 3)
+            CapacityPlanner.plan_file(small_img.width, small_img.height, 3, 10000, 1)
 
     def test_core_api_functions(self):
         """Test funzioni API del core"""
@@ -11,13 +11,8 @@ from PIL import Image
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
-from config.constants import CompressionMode
-from steganografia.file_utils import (
-    _save_image,
-    cleanup_temp_files,
-    compress_file,
-    find_div,
-)
+from config.constants import CompressionMode, StreamingConfig
+from steganografia.file_utils import _save_image, open_payload
 
 
 class TestFileUtils:
@@ -51,49 +46,29 @@ class TestFileUtils:
 class TestFileUtilsAdvanced:
     """Test avanzati per file utils"""
 
-    def test_compression_operations(self):
-        """Test operazioni di compressione"""
-        # Crea file temporaneo
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as tmp:
-            tmp.write("Test content for compression")
-            test_file = tmp.name
-
-        try:
-            # Test compressione NO_ZIP (dovrebbe restituire il file originale)
-            result = compress_file(test_file, CompressionMode.NO_ZIP)
-            assert result == test_file
-
-            # Test compressione FILE
-            compressed = compress_file(test_file, CompressionMode.FILE)
-            assert compressed != test_file
-            assert compressed.endswith(".zip")
-            assert os.path.exists(compressed)
-
-            # Test cleanup
-            cleanup_temp_files()
-
-        finally:
-            # Cleanup manuale
-            for file in [test_file]:
-                if os.path.exists(file):
-                    try:
-                        os.unlink(file)
-                    except OSError:
-                        pass
-
-    def test_find_div_function(self):
-        """Test funzione find_div"""
-        # Crea un piccolo file test
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as tmp:
-            tmp.write("small test content")
-            test_file = tmp.name
-
-        try:
-            total_pixels = 10000
-            n = 2
-
-            div = find_div(total_pixels, test_file, n)
-            assert div > 0
-        finally:
-            if os.path.exists(test_file):
-                os.unlink(test_file)
+    def test_open_payload_in_memory(self, monkeypatch):
+        """Test payload compresso in memoria con dimensione nota"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_file = os.path.join(temp_dir, "input.txt")
+            with open(test_file, "wb") as f:
+                f.write(b"payload " * 500)
+
+            with open_payload(test_file, CompressionMode.NO_ZIP) as (stream, size):
+                assert size == 4000
+                assert stream.read() == b"payload " * 500
+
+            for mode, path in [
+                (CompressionMode.FILE, test_file),
+                (CompressionMode.DIR, temp_dir),
+            ]:
+                with open_payload(path, mode) as (stream, size):
+                    data = stream.read()
+                    assert len(data) == size
+                    assert data.startswith(b"PK")
+                    assert not stream._rolled
+
+            # Oltre SPOOL_SIZE il buffer passa su disco senza cambiare il contenuto
+            monkeypatch.setattr(StreamingConfig, "SPOOL_SIZE", 16)
+            with open_payload(temp_dir, CompressionMode.DIR) as (stream, spilled):
+                assert stream._rolled
+                assert len(stream.read()) == spilled == size
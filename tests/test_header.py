@@ -0,0 +1,179 @@
+"""Test per il modulo header"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from config.constants import CompressionCodec, CompressionMode, DataType
+from steganografia import (
+    get_bin_file,
+    get_bin_file_array,
+    get_bin_file_memmap,
+    get_image,
+    hide_bin_file,
+    hide_bin_file_array,
+    hide_bin_file_memmap,
+    hide_image,
+)
+from steganografia.backup import backup_system
+from steganografia.header import (
+    HEADER_SAMPLES,
+    HEADER_SIZE,
+    pack_header,
+    read_header,
+    unpack_header,
+    write_header,
+)
+
+IMAGE_PARAMS = {"lsb": 2, "msb": 6, "div": 1.7320508075688772, "width": 31, "height": 7}
+BINARY_PARAMS = {"n": 3, "div": 2.5, "size": 123456789, "zipMode": 1}
+
+
+def _forget_params(monkeypatch):
+    """Simula una sessione nuova: nessun parametro in memoria"""
+    monkeypatch.setattr(backup_system, "_last_image_params", None)
+    monkeypatch.setattr(backup_system, "_last_binary_params", None)
+
+
+class TestHeader:
+    """Test per l'intestazione dei parametri"""
+
+    def test_pack_unpack_roundtrip(self):
+        """Test serializzazione e lettura dei parametri"""
+        data = pack_header(DataType.IMAGE, IMAGE_PARAMS)
+        assert len(data) == HEADER_SIZE
+        assert unpack_header(data) == {"type": DataType.IMAGE, "params": IMAGE_PARAMS}
+
+        data = pack_header(DataType.BINARY, BINARY_PARAMS)
+        assert unpack_header(data) == {
+            "type": DataType.BINARY,
+            "params": BINARY_PARAMS,
+        }
+
+    def test_pack_unpack_codec(self):
+        """Test codec di compressione registrato nell'intestazione"""
+        params = dict(BINARY_PARAMS, codec=CompressionCodec.LZMA)
+        data = pack_header(DataType.BINARY, params)
+        assert len(data) == HEADER_SIZE
+        assert unpack_header(data)["params"] == params
+
+    def test_unpack_rejects_corrupted_data(self):
+        """Test CRC e magic non validi"""
+        data = bytearray(pack_header(DataType.IMAGE, IMAGE_PARAMS))
+        data[10] ^= 0x01
+        assert unpack_header(bytes(data)) is None
+        assert unpack_header(bytes(HEADER_SIZE)) is None
+        assert unpack_header(b"SQ") is None
+
+    def test_write_read_header_in_buffer(self):
+        """Test intestazione negli ultimi bit dei primi campioni"""
+        rng = np.random.default_rng(1)
+        buffer = rng.integers(0, 256, HEADER_SAMPLES + 50, dtype=np.uint8)
+        original = buffer.copy()
+
+        write_header(buffer, DataType.BINARY, BINARY_PARAMS)
+
+        assert np.array_equal(buffer >> 1, original >> 1)
+        assert np.array_equal(buffer[HEADER_SAMPLES:], original[HEADER_SAMPLES:])
+        header = read_header(buffer, DataType.BINARY)
+        assert header is not None and header["params"] == BINARY_PARAMS
+        assert read_header(buffer, DataType.IMAGE) is None
+        assert read_header(original, DataType.BINARY) is None
+        assert read_header(buffer[:100], DataType.BINARY) is None
+
+    def test_write_read_header_with_index_map(self):
+        """Test intestazione su indici tradotti"""
+        buffer = np.zeros(2 * HEADER_SAMPLES, dtype=np.uint8)
+
+        def reverse(indices):
+            return len(buffer) - 1 - indices
+
+        write_header(buffer, DataType.IMAGE, IMAGE_PARAMS, reverse)
+
+        assert not buffer[:HEADER_SAMPLES].any()
+        assert read_header(buffer, DataType.IMAGE) is None
+        header = read_header(buffer, DataType.IMAGE, reverse)
+        assert header is not None and header["params"] == IMAGE_PARAMS
+
+    def test_recover_image_without_params(self, monkeypatch):
+        """Test recupero immagine solo dall'intestazione"""
+        rng = np.random.default_rng(2)
+        host = Image.fromarray(rng.integers(0, 256, (40, 50, 3), dtype=np.uint8))
+        secret = Image.fromarray(rng.integers(0, 256, (20, 25, 3), dtype=np.uint8))
+
+        result_img, lsb, msb, *_ = hide_image(host, secret, msb=4, header=True)
+        _forget_params(monkeypatch)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "secret.png")
+            recovered = get_image(result_img, output_path)
+
+        mask = np.uint8((0xFF << (8 - msb)) & 0xFF)
+        assert lsb == 2
+        assert np.array_equal(np.asarray(recovered), np.asarray(secret) & mask)
+
+    def test_header_reserves_host_capacity(self):
+        """Test lsb automatico che tiene conto dei campioni dell'intestazione"""
+        host = Image.new("RGB", (20, 20))
+        secret = Image.new("RGB", (20, 20))
+
+        _, lsb, *_ = hide_image(host, secret, msb=1)
+        assert lsb == 1
+        _, lsb, *_ = hide_image(host, secret, msb=1, header=True)
+        assert lsb == 2
+
+    def test_recover_binary_without_params(self, monkeypatch):
+        """Test recupero file solo dall'intestazione"""
+        payload = os.urandom(3001)
+        img = Image.new("RGBA", (64, 48), color=(10, 20, 30, 255))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "payload.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            with open(input_path, "wb") as f:
+                f.write(payload)
+
+            result_img, *_ = hide_bin_file(img, input_path, n=3, header=True)
+            _forget_params(monkeypatch)
+            get_bin_file(result_img, output_path)
+
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+
+    def test_recover_binary_array_and_memmap_without_params(self, monkeypatch):
+        """Test recupero da array e da host BMP mappato solo dall'intestazione"""
+        payload = os.urandom(2000)
+        host = np.random.default_rng(3).integers(0, 256, (30, 41, 3), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "payload.bin")
+            host_path = os.path.join(temp_dir, "host.bmp")
+            with open(input_path, "wb") as f:
+                f.write(payload)
+            Image.fromarray(host).save(host_path)
+
+            result, _ = hide_bin_file_array(
+                host, input_path, CompressionMode.NO_ZIP, header=True
+            )
+            hide_bin_file_memmap(host_path, input_path, header=True)
+            _forget_params(monkeypatch)
+
+            array_output = os.path.join(temp_dir, "array.bin")
+            memmap_output = os.path.join(temp_dir, "memmap.bin")
+            get_bin_file_array(result, array_output)
+            get_bin_file_memmap(host_path, memmap_output)
+
+            with Image.open(host_path) as img:
+                assert np.array_equal(np.asarray(img), result)
+            for path in (array_output, memmap_output):
+                with open(path, "rb") as f:
+                    assert f.read() == payload
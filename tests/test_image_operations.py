@@ -5,6 +5,7 @@ import sys
 import tempfile
 from pathlib import Path
 
+import numpy as np
 import pytest
 from PIL import Image
 
@@ -12,8 +13,16 @@ from PIL import Image
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
+from config.constants import StreamingConfig
 from steganografia.backup import backup_system
-from steganografia.core import get_image, hide_image
+from steganografia.core import (
+    get_image,
+    get_image_array,
+    get_image_memmap,
+    hide_image,
+    hide_image_array,
+    hide_image_memmap,
+)
 
 
 class TestImageOperations:
@@ -180,3 +189,131 @@ class TestImageOperations:
 
             assert recovered_img is not None
             assert recovered_img.size == (10, 10)
+
+    def test_roundtrip_preserves_most_significant_bits(self):
+        """Test che il recupero restituisca esattamente i msb bit dei pixel segreti"""
+        rng = np.random.default_rng(0)
+        host_img = Image.fromarray(rng.integers(0, 256, (61, 47, 3), dtype=np.uint8))
+        secret = rng.integers(0, 256, (13, 17, 3), dtype=np.uint8)
+        secret_img = Image.fromarray(secret)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "recovered.png")
+            for lsb, msb, div in [(0, 8, 0), (2, 5, 0), (3, 7, 2.5)]:
+                result_img, lsb, msb, div, w, h = hide_image(
+                    host_img, secret_img, lsb, msb, div
+                )
+                recovered = get_image(result_img, output_path, lsb, msb, div, w, h)
+
+                mask = (0xFF << (8 - msb)) & 0xFF
+                assert np.array_equal(np.array(recovered), secret & mask)
+
+    def test_recover_large_secret_image(self):
+        """Test recupero di un'immagine segreta grande in tempi ridotti"""
+        rng = np.random.default_rng(1)
+        host_img = Image.fromarray(rng.integers(0, 256, (900, 1200, 3), dtype=np.uint8))
+        secret = rng.integers(0, 256, (450, 600, 3), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "recovered.png")
+            result_img, lsb, msb, div, w, h = hide_image(
+                host_img, Image.fromarray(secret)
+            )
+            recovered = get_image(result_img, output_path, lsb, msb, div, w, h)
+
+            assert np.array_equal(np.array(recovered), secret)
+
+    def test_hide_and_recover_image_array(self):
+        """Test API su array NumPy con modifica sul posto"""
+        rng = np.random.default_rng(2)
+        host = rng.integers(0, 256, (40, 60, 3), dtype=np.uint8)
+        secret = rng.integers(0, 256, (20, 30, 3), dtype=np.uint8)
+
+        result, params = hide_image_array(host, secret, msb=6, in_place=True)
+        assert result is host
+        assert params["lsb"] == 2 and params["msb"] == 6
+        assert params["capacity_bits"] == 40 * 60 * 3 * 2
+        assert params["payload_bits"] == 20 * 30 * 3 * 6
+
+        recovered = get_image_array(
+            host, params["lsb"], 6, params["div"], params["width"], params["height"]
+        )
+        assert recovered.shape == (20, 30, 3)
+        assert np.array_equal(recovered, secret & 0xFC)
+
+    @pytest.mark.parametrize("extension", ["ppm", "bmp"])
+    def test_hide_and_recover_image_memmap(self, extension):
+        """Test host mappato elaborato a bande identico all'API su immagini PIL"""
+        rng = np.random.default_rng(3)
+        pixels = rng.integers(0, 256, (45, 70, 3), dtype=np.uint8)
+        secret = rng.integers(0, 256, (20, 25, 3), dtype=np.uint8)
+        expected = hide_image(Image.fromarray(pixels), Image.fromarray(secret), msb=5)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            host_path = os.path.join(temp_dir, f"host.{extension}")
+            result_path = os.path.join(temp_dir, f"result.{extension}")
+            output_path = os.path.join(temp_dir, "recovered.png")
+            Image.fromarray(pixels).save(host_path)
+
+            for band_rows in [1, 7, 64]:
+                params = hide_image_memmap(
+                    host_path,
+                    Image.fromarray(secret),
+                    msb=5,
+                    output_path=result_path,
+                    band_rows=band_rows,
+                )
+                assert params["host_path"] == result_path
+                assert (params["lsb"], params["msb"], params["div"]) == expected[1:4]
+                with Image.open(result_path) as result_img:
+                    assert np.array_equal(np.array(result_img), np.array(expected[0]))
+
+                recovered = get_image_memmap(
+                    result_path, output_path, *expected[1:], band_rows=band_rows
+                )
+                assert np.array_equal(np.array(recovered), secret & 0xF8)
+
+            # L'host originale non viene modificato quando c'è output_path
+            with Image.open(host_path) as host_img:
+                assert np.array_equal(np.array(host_img), pixels)
+
+    def test_hide_image_memmap_requires_rgb_host(self):
+        """Test errore per host mappato senza 3 canali"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            host_path = os.path.join(temp_dir, "host.raw")
+            np.zeros((10, 10, 4), dtype=np.uint8).tofile(host_path)
+
+            with pytest.raises(ValueError):
+                hide_image_memmap(
+                    host_path, Image.new("RGB", (2, 2)), raw_shape=(10, 10, 4)
+                )
+
+    def test_hide_image_workers_identical(self, monkeypatch):
+        """Test occultamento parallelo identico a quello sequenziale"""
+        monkeypatch.setattr(StreamingConfig, "MIN_SEGMENT_GROUPS", 32)
+        rng = np.random.default_rng(7)
+        host = rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)
+        secret = rng.integers(0, 256, (15, 20, 3), dtype=np.uint8)
+
+        for msb, div in [(8, 0), (3, 1.7)]:
+            expected, _ = hide_image_array(host, secret, msb=msb, div=div)
+            for workers in [2, 6]:
+                result, _ = hide_image_array(
+                    host, secret, msb=msb, div=div, workers=workers
+                )
+                assert np.array_equal(result, expected)
+
+    def test_recover_image_workers_identical(self, monkeypatch):
+        """Test recupero parallelo identico a quello sequenziale"""
+        monkeypatch.setattr(StreamingConfig, "MIN_SEGMENT_GROUPS", 32)
+        rng = np.random.default_rng(9)
+        host = rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)
+        secret = rng.integers(0, 256, (15, 20, 3), dtype=np.uint8)
+
+        for msb, div in [(8, 0), (5, 1.3)]:
+            result, params = hide_image_array(host, secret, msb=msb, div=div)
+            args = (params["lsb"], msb, params["div"], 20, 15)
+            expected = get_image_array(result, *args)
+            for workers in [2, 5]:
+                recovered = get_image_array(result, *args, workers=workers)
+                assert np.array_equal(recovered, expected)
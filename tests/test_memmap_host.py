@@ -0,0 +1,99 @@
+"""Test per il modulo memmap_host"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from steganografia.memmap_host import open_memmap_host
+
+
+class TestMemmapHost:
+    """Test per gli host non compressi mappati in memoria"""
+
+    @pytest.mark.parametrize(
+        "extension,mode", [("ppm", "RGB"), ("bmp", "RGB"), ("bmp", "RGBA")]
+    )
+    def test_translate_matches_decoded_pixels(self, extension, mode):
+        """Test corrispondenza tra indici logici e pixel decodificati da PIL"""
+        rng = np.random.default_rng(0)
+        arr = rng.integers(0, 256, (7, 5, len(mode)), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, f"host.{extension}")
+            Image.fromarray(arr, mode).save(path)
+            with Image.open(path) as img:
+                decoded = np.array(img)
+
+            # I BMP a 32 bit vengono decodificati come RGB, anche qui
+            host = open_memmap_host(path)
+            assert (host.height, host.width, host.channels) == decoded.shape
+            assert np.array_equal(decoded, arr[:, :, :3])
+            assert len(host) == decoded.size
+
+            indices = np.arange(len(host))
+            assert np.array_equal(host.buffer[host.translate(indices)], decoded.ravel())
+            assert np.array_equal(host.rows(2, 5), decoded[2:5])
+            del host
+
+    @pytest.mark.parametrize("extension", ["ppm", "bmp"])
+    def test_write_rows(self, extension):
+        """Test scrittura di una banda di righe sul file mappato"""
+        rng = np.random.default_rng(1)
+        arr = rng.integers(0, 256, (6, 5, 3), dtype=np.uint8)
+        band = rng.integers(0, 256, (3, 5, 3), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, f"host.{extension}")
+            Image.fromarray(arr).save(path)
+
+            host = open_memmap_host(path, writable=True)
+            host.write_rows(2, band)
+            assert np.array_equal(host.rows(2, 5), band)
+            host.flush()
+            del host
+
+            arr[2:5] = band
+            with Image.open(path) as img:
+                assert np.array_equal(np.array(img), arr)
+
+    def test_raw_shape(self):
+        """Test file raw senza intestazione"""
+        arr = np.arange(4 * 3 * 4, dtype=np.uint8).reshape(4, 3, 4)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "host.raw")
+            arr.tofile(path)
+
+            host = open_memmap_host(path, raw_shape=(4, 3, 4))
+            assert host.contiguous
+            assert np.array_equal(
+                host.buffer[host.translate(np.arange(48))], arr.ravel()
+            )
+            del host
+
+    def test_unsupported_format(self):
+        """Test errore per formati compressi o sconosciuti"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "host.png")
+            Image.new("RGB", (4, 4)).save(path)
+
+            with pytest.raises(ValueError, match="Formato host non supportato"):
+                open_memmap_host(path)
+
+    def test_raw_too_short(self):
+        """Test errore se il file è più corto delle dimensioni indicate"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "host.raw")
+            np.zeros(10, dtype=np.uint8).tofile(path)
+
+            with pytest.raises(ValueError, match="più corto"):
+                open_memmap_host(path, raw_shape=(2, 2, 3))
@@ -0,0 +1,132 @@
+"""Test per il modulo parallel"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from config.constants import StreamingConfig
+from steganografia.bit_operations import (
+    accumulate_positions,
+    get_low_bits,
+    position_at,
+    set_low_bits,
+)
+from steganografia.parallel import (
+    gather_low_bits,
+    run_segments,
+    scatter_low_bits,
+    split_segments,
+)
+
+
+class TestParallel:
+    """Test per l'elaborazione a segmenti"""
+
+    def test_split_segments(self, monkeypatch):
+        """Test segmenti contigui che coprono tutti i gruppi"""
+        monkeypatch.setattr(StreamingConfig, "MIN_SEGMENT_GROUPS", 10)
+
+        assert split_segments(0, 4) == []
+        assert split_segments(25, 4) == [(0, 12), (12, 25)]
+        assert split_segments(100, 3) == [(0, 33), (33, 66), (66, 100)]
+        assert split_segments(100, 1) == [(0, 100)]
+
+    def test_run_segments_keeps_order(self, monkeypatch):
+        """Test risultati nell'ordine dei segmenti"""
+        monkeypatch.setattr(StreamingConfig, "MIN_SEGMENT_GROUPS", 1)
+
+        assert run_segments(lambda start, stop: (start, stop), 9, 3) == [
+            (0, 3),
+            (3, 6),
+            (6, 9),
+        ]
+
+    def test_scatter_low_bits_overlapping_boundaries(self, monkeypatch):
+        """Test indici ripetuti a cavallo dei segmenti: vince l'ultimo gruppo"""
+        monkeypatch.setattr(StreamingConfig, "MIN_SEGMENT_GROUPS", 1)
+        rng = np.random.default_rng(0)
+        targets = np.repeat(np.arange(40), 3)
+        values = rng.integers(0, 8, len(targets), dtype=np.uint8)
+
+        expected = np.full(40, 0xFF, dtype=np.uint8)
+        set_low_bits(expected, targets, values, 3)
+
+        for workers in [2, 7, 16]:
+            buffer = np.full(40, 0xFF, dtype=np.uint8)
+            scatter_low_bits(
+                buffer, values, 3, lambda start, stop: targets[start:stop], workers
+            )
+            assert np.array_equal(buffer, expected)
+
+    def test_gather_low_bits_matches_sequential(self, monkeypatch):
+        """Test lettura a segmenti identica alla lettura in un colpo solo"""
+        monkeypatch.setattr(StreamingConfig, "MIN_SEGMENT_GROUPS", 1)
+        rng = np.random.default_rng(1)
+        buffer = rng.integers(0, 256, 500, dtype=np.uint8)
+        targets = np.sort(rng.integers(0, 500, 300))
+
+        expected = get_low_bits(buffer, targets, 5)
+        for workers in [1, 4, 300]:
+            result = gather_low_bits(
+                buffer, 300, 5, lambda start, stop: targets[start:stop], workers
+            )
+            assert np.array_equal(result, expected)
+
+
+class TestSegmentEquivalence:
+    """Equivalenza tra inizio dei segmenti calcolato e cursore accumulato"""
+
+    @pytest.mark.parametrize(
+        "div,start",
+        [
+            (0.1, 0.0),
+            (1 / 3, 0.0),
+            (2.5, 0.0),  # passo a metà dell'ulp: arrotondamento al pari
+            (0.75, 2.0**40),
+            (1.0000000001, 0.0),
+            (123.456, 7.5),
+            (3.0, 2.0**52 - 10),  # attraversa 2^52, dove l'ulp diventa 1
+            (1e-12, 1.0),  # passo più piccolo dell'ulp: il cursore si ferma
+        ],
+    )
+    def test_segment_starts_match_accumulation(self, div, start):
+        """Test ogni inizio di segmento uguale al cursore sommato in sequenza"""
+        total = 50000
+        positions = accumulate_positions(div, total + 1, start)
+
+        for workers in [2, 3, 7, 64]:
+            for segment_start, _ in split_segments(total, workers):
+                assert (
+                    position_at(div, segment_start, start) == positions[segment_start]
+                )
+        assert position_at(div, total, start) == positions[total]
+
+    def test_random_divisors(self):
+        """Test su divisori casuali e indici arbitrari"""
+        rng = np.random.default_rng(2)
+        for div in rng.uniform(0.01, 40.0, 40):
+            positions = accumulate_positions(float(div), 30001)
+            for count in rng.integers(0, 30001, 25):
+                assert position_at(float(div), int(count)) == positions[count]
+
+    def test_accumulation_differs_from_product(self):
+        """Test che il cursore accumulato non coincida con count * div"""
+        # 0.1 sommato dieci volte non vale 1.0: position_at deve riprodurre la
+        # somma e non il prodotto, altrimenti int()/round() cambierebbero indice
+        assert 10 * 0.1 == 1.0
+        assert position_at(0.1, 10) == accumulate_positions(0.1, 11)[10]
+        assert position_at(0.1, 10) != 1.0
+        assert int(position_at(0.1, 10)) == 0
+
+        positions = accumulate_positions(1 / 3, 100001)
+        products = np.arange(100001) * (1 / 3)
+        mismatched = np.flatnonzero(positions != products)
+        assert len(mismatched) > 0
+        for count in mismatched[:: max(1, len(mismatched) // 50)]:
+            assert position_at(1 / 3, int(count)) == positions[count]
@@ -0,0 +1,307 @@
+"""Test per il modulo param_index"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from config.constants import DataType
+from steganografia import (
+    binary_operations,
+    get_bin_file,
+    get_bin_file_array,
+    get_bin_file_memmap,
+    get_image_array,
+    hide_bin_file,
+    hide_bin_file_array,
+    hide_bin_file_memmap,
+    hide_image_array,
+    image_operations,
+)
+from steganografia.backup import backup_system
+from steganografia.memmap_host import open_memmap_host
+from steganografia.param_index import ParamIndex, array_key, memmap_key
+
+
+@pytest.fixture(name="index_path")
+def fixture_index_path():
+    """Database temporaneo attivato come indice del sistema di backup"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "params.sqlite")
+        backup_system.open_index(path)
+        try:
+            yield path
+        finally:
+            backup_system.open_index(None)
+
+
+def _forget_params(monkeypatch):
+    """Simula una sessione nuova: nessun parametro in memoria"""
+    monkeypatch.setattr(backup_system, "_last_image_params", None)
+    monkeypatch.setattr(backup_system, "_last_binary_params", None)
+
+
+class TestParamIndex:
+    """Test per l'indice dei parametri"""
+
+    def test_put_get_and_persistence(self):
+        """Test record salvati e riletti da una nuova connessione"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "params.sqlite")
+            index = ParamIndex(path)
+            index.put("abc", DataType.IMAGE, '{"lsb":1}')
+            index.put("abc", DataType.BINARY, '{"n":2}')
+            index.put("abc", DataType.IMAGE, '{"lsb":3}')
+            assert index.get("abc", DataType.IMAGE) == '{"lsb":3}'
+            assert index.get("missing", DataType.IMAGE) is None
+            index.close()
+
+            reopened = ParamIndex(path)
+            assert len(reopened) == 2
+            assert reopened.get("abc", DataType.BINARY) == '{"n":2}'
+            reopened.close()
+
+    def test_lru_cache_eviction(self):
+        """Test cache limitata ai record usati più di recente"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = ParamIndex(os.path.join(temp_dir, "params.sqlite"), cache_size=2)
+            for key in ["a", "b", "c"]:
+                index.put(key, DataType.IMAGE, key)
+            index.get("b", DataType.IMAGE)
+
+            assert list(index._cache) == [
+                ("c", DataType.IMAGE),
+                ("b", DataType.IMAGE),
+            ]
+            # I record eliminati dalla cache restano nel database
+            assert index.get("a", DataType.IMAGE) == "a"
+            index.close()
+
+    def test_concurrent_put_get(self):
+        """Test scritture e letture da più thread sulla stessa connessione"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = ParamIndex(os.path.join(temp_dir, "params.sqlite"), cache_size=8)
+
+            def work(worker):
+                for i in range(50):
+                    key = f"{worker}-{i}"
+                    index.put(key, DataType.BINARY, key)
+                    assert index.get(key, DataType.BINARY) == key
+
+            threads = [threading.Thread(target=work, args=(w,)) for w in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert len(index) == 200
+            index.close()
+
+    def test_keys_match_across_sources(self):
+        """Test stessa chiave per array e host BMP mappato"""
+        pixels = np.random.default_rng(0).integers(0, 256, (300, 7, 3), np.uint8)
+        img = Image.fromarray(pixels)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            host_path = os.path.join(temp_dir, "host.bmp")
+            img.save(host_path)
+            key = array_key(pixels)
+            assert memmap_key(open_memmap_host(host_path)) == key
+
+        pixels[0, 0, 0] ^= 1
+        assert array_key(pixels) != key
+
+    @pytest.mark.usefixtures("index_path")
+    def test_recover_image_from_index(self, monkeypatch):
+        """Test recupero immagine senza parametri grazie all'indice"""
+        rng = np.random.default_rng(1)
+        host = rng.integers(0, 256, (30, 30, 3), dtype=np.uint8)
+        secret = rng.integers(0, 256, (10, 12, 3), dtype=np.uint8)
+
+        result, params = hide_image_array(host, secret, msb=5)
+        _forget_params(monkeypatch)
+
+        recovered = get_image_array(result)
+        assert recovered.shape == (10, 12, 3)
+        assert np.array_equal(recovered >> 3, secret >> 3)
+        assert len(backup_system.index) == 1
+        assert params["lsb"] >= 1
+
+    @pytest.mark.usefixtures("index_path")
+    def test_recover_binary_from_index(self, monkeypatch):
+        """Test recupero file senza parametri dopo il salvataggio in PNG"""
+        payload = os.urandom(700)
+        img = Image.new("RGB", (40, 30), color="teal")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "payload.bin")
+            image_path = os.path.join(temp_dir, "stego.png")
+            output_path = os.path.join(temp_dir, "output.bin")
+            with open(input_path, "wb") as f:
+                f.write(payload)
+
+            result_img, *_ = hide_bin_file(img, input_path)
+            result_img.save(image_path)
+            _forget_params(monkeypatch)
+
+            with Image.open(image_path) as reopened:
+                get_bin_file(reopened, output_path)
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+
+    @pytest.mark.usefixtures("index_path")
+    def test_recover_memmap_from_index(self, monkeypatch):
+        """Test recupero da host PPM mappato senza parametri grazie all'indice"""
+        payload = os.urandom(500)
+        host = np.random.default_rng(2).integers(0, 256, (25, 33, 3), np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "payload.bin")
+            host_path = os.path.join(temp_dir, "host.ppm")
+            output_path = os.path.join(temp_dir, "output.bin")
+            with open(input_path, "wb") as f:
+                f.write(payload)
+            Image.fromarray(host).save(host_path)
+
+            hide_bin_file_memmap(host_path, input_path, n=2)
+            _forget_params(monkeypatch)
+            get_bin_file_memmap(host_path, output_path)
+
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+
+    @pytest.mark.usefixtures("index_path")
+    def test_backup_file_takes_precedence_over_index(self):
+        """Test parametri del file di backup indicato preferiti a quelli dell'indice"""
+        rng = np.random.default_rng(7)
+        host = rng.integers(0, 256, (40, 40, 3), dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            backup_path = os.path.join(temp_dir, "other.dat")
+            result, _ = hide_image_array(
+                host, rng.integers(0, 256, (10, 12, 3), np.uint8)
+            )
+            hide_image_array(
+                host,
+                rng.integers(0, 256, (6, 8, 3), np.uint8),
+                backup_file=backup_path,
+            )
+
+            # L'indice ha un record valido per result, ma il backup indicato vince
+            assert get_image_array(result, backup_file=backup_path).shape == (6, 8, 3)
+            assert get_image_array(result).shape == (10, 12, 3)
+
+    @pytest.mark.usefixtures("index_path")
+    def test_binary_backup_file_takes_precedence_over_index(self):
+        """Test stesso ordine di ricerca per i file binari"""
+        host = np.random.default_rng(9).integers(0, 256, (30, 40, 3), np.uint8)
+        payload = os.urandom(700)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "payload.bin")
+            other_path = os.path.join(temp_dir, "other.bin")
+            backup_path = os.path.join(temp_dir, "other.dat")
+            output_path = os.path.join(temp_dir, "output.bin")
+            with open(input_path, "wb") as f:
+                f.write(payload)
+            with open(other_path, "wb") as f:
+                f.write(os.urandom(300))
+
+            result, _ = hide_bin_file_array(host, input_path)
+            hide_bin_file_array(host, other_path, backup_file=backup_path)
+
+            get_bin_file_array(result, output_path, backup_file=backup_path)
+            assert os.path.getsize(output_path) == 300
+            get_bin_file_array(result, output_path)
+            with open(output_path, "rb") as f:
+                assert f.read() == payload
+
+    @pytest.mark.usefixtures("index_path")
+    def test_index_takes_precedence_over_last_params(self):
+        """Test parametri dell'indice preferiti a quelli dell'ultimo occultamento"""
+        rng = np.random.default_rng(8)
+        host = rng.integers(0, 256, (40, 40, 3), dtype=np.uint8)
+        secret = rng.integers(0, 256, (10, 12, 3), dtype=np.uint8)
+
+        result, _ = hide_image_array(host, secret, msb=4)
+        hide_image_array(host, rng.integers(0, 256, (6, 8, 3), np.uint8))
+
+        assert np.array_equal(get_image_array(result), secret & 0xF0)
+
+    def test_key_covers_every_row(self):
+        """Test chiave diversa per risultati che differiscono in una sola riga"""
+        pixels = np.random.default_rng(3).integers(0, 256, (400, 20, 3), np.uint8)
+        other = pixels.copy()
+        other[201, 7, 1] ^= 1
+
+        assert array_key(pixels) != array_key(other)
+
+    @pytest.mark.usefixtures("index_path")
+    def test_binary_key_collision_is_ignored(self, monkeypatch):
+        """Test record dell'indice scartato quando il CRC del payload non corrisponde"""
+        monkeypatch.setattr(binary_operations, "array_key", lambda arr: "collisione")
+        host = np.random.default_rng(4).integers(0, 256, (30, 40, 3), np.uint8)
+        payload_a, payload_b = os.urandom(600), os.urandom(800)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path_a = os.path.join(temp_dir, "a.bin")
+            path_b = os.path.join(temp_dir, "b.bin")
+            output_path = os.path.join(temp_dir, "output.bin")
+            for path, payload in [(path_a, payload_a), (path_b, payload_b)]:
+                with open(path, "wb") as f:
+                    f.write(payload)
+
+            result_a, _ = hide_bin_file_array(host, path_a, n=2)
+            result_b, _ = hide_bin_file_array(host, path_b, n=2)
+            _forget_params(monkeypatch)
+
+            # Stessa chiave: il record di B non restituisce byte sbagliati per A
+            with pytest.raises(ValueError, match="Parametri mancanti"):
+                get_bin_file_array(result_a, output_path)
+
+            get_bin_file_array(result_b, output_path)
+            with open(output_path, "rb") as f:
+                assert f.read() == payload_b
+
+    @pytest.mark.usefixtures("index_path")
+    def test_image_key_collision_is_ignored(self, monkeypatch):
+        """Test record dell'indice scartato quando il CRC dei pixel non corrisponde"""
+        monkeypatch.setattr(image_operations, "array_key", lambda arr: "collisione")
+        rng = np.random.default_rng(5)
+        host = rng.integers(0, 256, (30, 30, 3), dtype=np.uint8)
+        secret_a = rng.integers(0, 256, (10, 12, 3), dtype=np.uint8)
+        secret_b = rng.integers(0, 256, (10, 12, 3), dtype=np.uint8)
+
+        result_a, _ = hide_image_array(host, secret_a, msb=5)
+        result_b, _ = hide_image_array(host, secret_b, msb=5)
+        _forget_params(monkeypatch)
+
+        with pytest.raises(ValueError, match="Parametri mancanti"):
+            get_image_array(result_a)
+        assert np.array_equal(get_image_array(result_b) >> 3, secret_b >> 3)
+
+    @pytest.mark.usefixtures("index_path")
+    def test_record_without_crc_is_ignored(self, monkeypatch):
+        """Test record registrati senza CRC non usati per il recupero"""
+        rng = np.random.default_rng(6)
+        host = rng.integers(0, 256, (30, 30, 3), dtype=np.uint8)
+        secret = rng.integers(0, 256, (10, 12, 3), dtype=np.uint8)
+
+        result, params = hide_image_array(host, secret, msb=5)
+        backup_system.index.put(
+            array_key(result), DataType.IMAGE, json.dumps({"params": params})
+        )
+        _forget_params(monkeypatch)
+
+        with pytest.raises(ValueError, match="Parametri mancanti"):
+            get_image_array(result)
@@ -0,0 +1,86 @@
+"""Test per il modulo payload_reader"""
+
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from steganografia.binary_operations import BinarySteganography
+from steganografia.payload_reader import PayloadReader, read_payload_range
+
+
+def _embed(data, n, samples=20000, seed=0):
+    """Nasconde data in un buffer casuale con il div massimo"""
+    rng = np.random.default_rng(seed)
+    buffer = rng.integers(0, 256, samples, dtype=np.uint8)
+    groups = -(-len(data) * 8 // n)
+    div = (samples - 1) / groups
+    BinarySteganography._embed_stream(buffer, io.BytesIO(data), n, div)
+    return buffer, div
+
+
+class TestPayloadReader:
+    """Test per l'accesso casuale al payload nascosto"""
+
+    @pytest.mark.parametrize("n", range(1, 9))
+    @pytest.mark.parametrize("size", [1, 7, 999])
+    def test_read_payload_range(self, n, size):
+        """Test intervalli qualsiasi, anche con l'ultimo gruppo parziale"""
+        data = np.random.default_rng(n).integers(0, 256, size, dtype=np.uint8)
+        data = data.tobytes()
+        buffer, div = _embed(data, n)
+
+        ranges = [(0, size), (0, 1), (size - 1, size), (size // 3, size // 2 + 1)]
+        for start, stop in ranges:
+            assert read_payload_range(buffer, n, div, size, start, stop) == (
+                data[start:stop]
+            )
+        assert read_payload_range(buffer, n, div, size, size, size + 10) == b""
+
+    def test_reader_seek_and_read(self):
+        """Test file in sola lettura con seek relativo e dalla fine"""
+        data = bytes(range(256)) * 4
+        buffer, div = _embed(data, 3)
+        reader = PayloadReader(buffer, 3, div, len(data))
+
+        assert reader.seek(-10, io.SEEK_END) == len(data) - 10
+        assert reader.read() == data[-10:]
+        assert reader.read(5) == b""
+        reader.seek(100)
+        reader.seek(20, io.SEEK_CUR)
+        assert reader.read(30) == data[120:150]
+        assert reader.tell() == 150
+        with pytest.raises(ValueError):
+            reader.seek(-1)
+
+    def test_zip_member_reads_only_its_samples(self):
+        """Test lettura di un file dell'archivio senza toccare gli altri"""
+        rng = np.random.default_rng(1)
+        buffer_zip = io.BytesIO()
+        with zipfile.ZipFile(buffer_zip, "w") as zf:
+            for i in range(20):
+                zf.writestr(f"big{i}.bin", rng.bytes(4000))
+            zf.writestr("config.txt", b"chiave=valore\n")
+        data = buffer_zip.getvalue()
+        buffer, div = _embed(data, 2, samples=400000)
+
+        touched = []
+
+        def record(indices):
+            touched.append(len(indices))
+            return indices
+
+        reader = PayloadReader(buffer, 2, div, len(data), record)
+        with zipfile.ZipFile(reader) as zf:
+            assert len(zf.namelist()) == 21
+            assert zf.read("config.txt") == b"chiave=valore\n"
+
+        # Servono i campioni della directory centrale e di config.txt
+        assert sum(touched) < len(data) * 4 // 10
@@ -3,6 +3,7 @@
 import sys
 from pathlib import Path
 
+import numpy as np
 import pytest
 from PIL import Image
 
@@ -10,7 +11,12 @@ from PIL import Image
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
 
-from steganografia.core import get_message, hide_message
+from steganografia.core import (
+    get_message,
+    get_message_array,
+    hide_message,
+    hide_message_array,
+)
 
 
 class TestStringOperations:
@@ -45,3 +51,61 @@ class TestStringOperations:
         img_with_message = hide_message(img, message)
         recovered = get_message(img_with_message)
         assert recovered == message
+
+    def test_hide_message_column_major_layout(self):
+        """Test ordine dei bit: colonna per colonna (x esterno, y interno, canale)"""
+        rng = np.random.default_rng(0)
+        original = rng.integers(0, 256, (7, 9, 3), dtype=np.uint8)
+        img = Image.fromarray(original)
+        message = "Hi"
+
+        result = np.array(hide_message(img, message))
+
+        expected_bits = "1010101011110000" + format(len(message), "032b")
+        expected_bits += format(ord("H") ^ ord("i"), "016b")
+        expected_bits += "".join(format(ord(c), "08b") for c in message) + "00000000"
+
+        pos = 0
+        for x in range(img.width):
+            for y in range(img.height):
+                for z in range(3):
+                    value = int(original[y, x, z])
+                    if pos < len(expected_bits):
+                        value = (value & 0xFE) | int(expected_bits[pos])
+                    assert result[y, x, z] == value
+                    pos += 1
+
+    def test_recover_message_from_large_image(self):
+        """Test recupero da immagine grande leggendo solo i bit necessari"""
+        img = Image.new("RGB", (4000, 3000), color="white")
+        message = "token-1234"
+
+        img_with_message = hide_message(img, message)
+        assert get_message(img_with_message) == message
+
+    def test_hide_and_recover_message_array(self):
+        """Test API su array NumPy con e senza modifica sul posto"""
+        arr = np.full((40, 50, 4), 200, dtype=np.uint8)
+        message = "Array API!"
+
+        result, params = hide_message_array(arr, message)
+        assert result is not arr
+        assert np.all(arr == 200)
+        assert params["payload_bits"] == 72 + len(message) * 8
+        assert params["capacity_bits"] == 40 * 50 * 3
+        assert np.all(result[..., 3] == 200)
+        assert get_message_array(result) == message
+
+        result, _ = hide_message_array(arr, message, in_place=True)
+        assert result is arr
+        assert get_message_array(arr) == message
+
+    def test_message_array_validation(self):
+        """Test errori per array non validi"""
+        with pytest.raises(ValueError):
+            hide_message_array(np.zeros((10, 10), dtype=np.uint8), "x")
+
+        read_only = np.zeros((10, 10, 3), dtype=np.uint8)
+        read_only.flags.writeable = False
+        with pytest.raises(ValueError):
+            hide_message_array(read_only, "x", in_place=True)
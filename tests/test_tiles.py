@@ -0,0 +1,100 @@
+"""Test per il modulo tiles"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Aggiungi il percorso src al Python path
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+from steganografia.bit_operations import accumulate_positions
+from steganografia.core import hide_image_array
+from steganografia.memmap_host import open_memmap_host
+from steganografia.tiles import (
+    GroupCursor,
+    SecretImageSink,
+    SecretImageSource,
+    band_ranges,
+    embed_bands,
+    extract_bands,
+)
+
+
+class TestTiles:
+    """Test per l'elaborazione a bande"""
+
+    def test_band_ranges(self):
+        """Test copertura completa delle righe"""
+        assert list(band_ranges(10, 4)) == [(0, 4), (4, 8), (8, 10)]
+        assert list(band_ranges(3, 0)) == [(0, 1), (1, 2), (2, 3)]
+
+    def test_group_cursor_matches_full_accumulation(self):
+        """Test posizioni per banda identiche a quelle calcolate in un colpo solo"""
+        for div, count, rounding in [(1.37, 500, np.floor), (2.5, 333, np.rint)]:
+            expected = rounding(accumulate_positions(div, count)).astype(np.int64)
+            cursor = GroupCursor(div, count, rounding)
+
+            parts = [cursor.take_until(limit) for limit in range(50, 1000, 50)]
+            assert np.array_equal(np.concatenate(parts), expected)
+            assert cursor.remaining == 0
+
+    def test_group_cursor_stops_at_limit(self):
+        """Test nessun gruppo oltre il limite della banda"""
+        cursor = GroupCursor(3.0, 10, np.floor)
+
+        assert cursor.take_until(7).tolist() == [0, 3, 6]
+        assert cursor.take_until(7).tolist() == []
+        assert cursor.take_until(100).tolist() == [9, 12, 15, 18, 21, 24, 27]
+
+    @pytest.mark.parametrize("band_rows", [1, 8, 100])
+    def test_bands_match_single_buffer(self, band_rows):
+        """Test bande sull'host mappato identiche all'elaborazione in un colpo solo"""
+        rng = np.random.default_rng(2)
+        pixels = rng.integers(0, 256, (37, 23, 3), dtype=np.uint8)
+        secret = rng.integers(0, 256, (10, 12, 3), dtype=np.uint8)
+        expected, params = hide_image_array(pixels, secret, msb=4)
+        lsb, div = params["lsb"], params["div"]
+        total = -(-secret.size * 4 // lsb)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "host.raw")
+            pixels.tofile(path)
+
+            host = open_memmap_host(path, pixels.shape, writable=True)
+            source = SecretImageSource(secret.reshape(-1), 4, lsb)
+            embed_bands(host, GroupCursor(div, total, np.floor), source, band_rows)
+            assert np.array_equal(host.rows(0, 37), expected)
+
+            sink = SecretImageSink(secret.size, 4, lsb)
+            extract_bands(host, GroupCursor(div, total, np.floor), sink, band_rows)
+            assert np.array_equal(sink.res, (secret & 0xF0).reshape(-1))
+            del host
+
+    def test_bands_without_groups_are_skipped(self, monkeypatch):
+        """Test nessuna lettura delle bande oltre l'ultimo gruppo"""
+        pixels = np.zeros((20, 10, 3), dtype=np.uint8)
+        secret = np.full(30, 0xFF, dtype=np.uint8)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "host.raw")
+            pixels.tofile(path)
+            host = open_memmap_host(path, pixels.shape, writable=True)
+            bands = []
+            rows = host.rows
+            monkeypatch.setattr(
+                host, "rows", lambda top, bottom: bands.append(top) or rows(top, bottom)
+            )
+
+            embed_bands(
+                host,
+                GroupCursor(1.0, 240, np.floor),
+                SecretImageSource(secret, 8, 1),
+                4,
+            )
+            assert bands == [0, 4]
+            del host
@@ -196,6 +196,73 @@ class TestCreateDownloadButton:
         assert call_kwargs["file_name"] == "test.txt"
 
 
+class TestSessionBackup:
+    """Test per l'isolamento dei parametri tra sessioni Streamlit"""
+
+    def test_get_session_backup_per_session(self, monkeypatch):
+        """Ogni sessione ha il proprio ParameterBackup, stabile tra i rerun"""
+        from src.ui.components import get_session_backup
+
+        session_a, session_b = {}, {}
+
+        monkeypatch.setattr(st, "session_state", session_a)
+        backup_a = get_session_backup()
+        assert get_session_backup() is backup_a
+
+        monkeypatch.setattr(st, "session_state", session_b)
+        backup_b = get_session_backup()
+
+        assert backup_b is not backup_a
+        assert session_a["parameter_backup"] is backup_a
+        assert session_b["parameter_backup"] is backup_b
+
+    def test_sessions_do_not_share_last_params(self, monkeypatch):
+        """Gli ultimi parametri di una sessione non sono visibili nell'altra"""
+        from config.constants import DataType
+        from src.steganografia import backup_session, get_last_params, hide_image
+        from src.ui.components import get_session_backup
+
+        session_a, session_b = {}, {}
+        host = Image.new("RGB", (32, 32), color=(120, 80, 40))
+        secret = Image.new("RGB", (4, 4), color=(200, 10, 90))
+
+        monkeypatch.setattr(st, "session_state", session_a)
+        with backup_session(get_session_backup()):
+            hide_image(host, secret)
+            params_a = get_last_params(DataType.IMAGE)
+        assert params_a is not None
+
+        monkeypatch.setattr(st, "session_state", session_b)
+        with backup_session(get_session_backup()):
+            assert get_last_params(DataType.IMAGE) is None
+
+        monkeypatch.setattr(st, "session_state", session_a)
+        with backup_session(get_session_backup()):
+            assert get_last_params(DataType.IMAGE) == params_a
+
+    def test_main_routes_pages_inside_session_backup(self, monkeypatch):
+        """La main esegue le pagine con il backup della sessione corrente"""
+        import app
+        from src.steganografia import current_backup
+
+        seen = []
+        hide_pages = MagicMock()
+        hide_pages.hide_image_page.side_effect = lambda: seen.append(current_backup())
+        monkeypatch.setattr(app, "AppLayout", MagicMock())
+        app.AppLayout.setup_sidebar.return_value = ("Nascondere dati", "Immagini")
+        monkeypatch.setattr(app, "DynamicInstructions", MagicMock())
+        monkeypatch.setattr(app, "HideDataPages", MagicMock(return_value=hide_pages))
+
+        session_a, session_b = {}, {}
+        monkeypatch.setattr(st, "session_state", session_a)
+        app.main()
+        monkeypatch.setattr(st, "session_state", session_b)
+        app.main()
+
+        assert seen == [session_a["parameter_backup"], session_b["parameter_backup"]]
+        assert seen[0] is not seen[1]
+
+
 # ============================================
 # Test per layout.py
 # ============================================